@@ -1,7 +1,13 @@
 import streamlit as st
 import time, json
-from db import register_profile, login_profile
-from mypages import inbox, compose, rejected_requests, dashboard, utils_llm
+from mypages import utils_profile
+utils_profile.start()   # COLLABNOTE_STARTUP_PROFILE=1 일 때만 import 트리/첫 렌더 시간 기록
+from db import register_profile, login_profile, start_job_workers
+start_job_workers()     # JOB_WORKER_MODE=inprocess(기본)면 승인 요약 워커 스레드를 이 프로세스에서 실행
+
+def _page(name: str):
+    """페이지 모듈은 처음 열 때 import (로그인 화면이 대시보드/검색 의존성 비용을 내지 않도록)"""
+    return utils_profile.import_module(f"mypages.{name}")
 
 # PAGES = {
 #     # 이제 compose는 라우팅에 포함시키지 않습니다.
@@ -80,9 +86,9 @@ def show_main():
         page = st.sidebar.radio("대표 메뉴", ("📬 문서 승인 처리", "📬  승인 문서함"))
         if page == "📬 문서 승인 처리":
             st.sidebar.info("대표님용 문서 승인 처리 페이지입니다.")
-            inbox.app(user)
+            _page("inbox").app(user)
         else:
-            dashboard.app(user)
+            _page("dashboard").app(user)
             st.sidebar.info("대표님용 문서 후속 처리 대시보드 페이지입니다.")
 
     else:
@@ -95,9 +101,9 @@ def show_main():
         )
         
         if selected_page == "📝 새 문서 요청":
-            compose.run_compose_page(st.session_state.user)
+            _page("compose").run_compose_page(st.session_state.user)
         elif selected_page == "📊 내 문서함":
-            dashboard.app(user)
+            _page("dashboard").app(user)
             st.sidebar.info("내 문서 현황을 확인할 수 있습니다.")
 
     if st.sidebar.button("로그아웃"):
@@ -115,3 +121,5 @@ else:
         st.session_state.page = "login"
         st.rerun()
     show_main()
+
+utils_profile.finish(st.session_state.page)
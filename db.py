@@ -1,22 +1,46 @@
 import os
 import streamlit as st
 from typing import Dict, List, Optional, Any
+import threading
 # from dotenv import load_dotenv
-from supabase import create_client
 import bcrypt
 from datetime import datetime, timedelta, timezone
-from potens_client import generate_approval_summary
+from mypages.utils_jobs import get_queue
+from mypages.utils_config import secret as _secret   # st.secrets → 환경변수 (벤치마크/대역 실행 시 환경변수 사용)
 
 # .env 불러오기
 # load_dotenv()
 
-SUPABASE_URL = st.secrets["SUPABASE_URL"]
-SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
+SUPABASE_URL = _secret("SUPABASE_URL")
+SUPABASE_KEY = _secret("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
+_USE_STANDIN = bool(SUPABASE_URL) and SUPABASE_URL.startswith("standin:")
+if not _USE_STANDIN and (not SUPABASE_URL or not SUPABASE_KEY):
     raise RuntimeError("SUPABASE_URL / SUPABASE_KEY not configured")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def _create_supabase_client():
+    if _USE_STANDIN:
+        # 오프라인 벤치마크/테스트: 메모리 대역 클라이언트 (tools/supabase_standin.py)
+        from tools.supabase_standin import create_standin_client
+        return create_standin_client()
+    from supabase import create_client
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+class _LazySupabase:
+    """첫 쿼리 때 클라이언트 생성 (supabase 패키지 import/접속 준비를 첫 화면 렌더 뒤로 미룸)"""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = _create_supabase_client()
+        return getattr(self._client, name)
+
+supabase = _LazySupabase()
 
 # ---------- 공통 ----------
 def now_utc_iso():
@@ -118,24 +142,107 @@ def submit_draft(draft_id: str, confirm_text: str, assignee: str, due_date: str,
     # 1) draft 상태 업데이트
     supabase.table("drafts").update({"status": "submitted"}).eq("draft_id", draft_id).execute()
 
-    # 2) LLM 요약 생성
-    summary_obj = generate_approval_summary(confirm_text) or {}
-    title = summary_obj.get("title", "제목없음")
-    summary = summary_obj.get("summary", "")
-
-    # 3) approvals 생성
+    # 2) approvals 생성 (제목/요약은 임시값 → 작업 큐가 LLM 요약으로 채움)
     response = supabase.table("approvals").insert({
         "draft_id": draft_id,
-        "title": title,
-        "summary": summary,
+        "title": SUMMARY_PENDING_TITLE,
+        "summary": "",
         "confirm_text": confirm_text,
         "assignee": assignee,
         "due_date": due_date,
         "status": "대기중",
         "creator_id": creator_id
     }).execute()
+
+    # 3) LLM 요약 생성 예약 (큐에 못 넣으면 예전처럼 바로 생성)
+    if response.data:
+        payload = {"approval_id": response.data[0]["approval_id"], "confirm_text": confirm_text}
+        try:
+            get_queue().enqueue(SUMMARY_JOB, payload)
+        except Exception as e:
+            print(f"❌ 요약 작업 등록 실패, 즉시 생성: {e}")
+            try:
+                _summarize_approval_job(payload)
+            except Exception:
+                _summarize_approval_failed(payload, "")
     return response.data
 
+# ---------- 승인 요약 백그라운드 작업 ----------
+SUMMARY_JOB = "approval_summary"
+SUMMARY_PENDING_TITLE = "요약 생성 중"
+JOB_WORKER_MODE = _secret("JOB_WORKER_MODE", "inprocess").lower()
+
+def _summarize_approval_job(payload: Dict[str, Any]):
+    from potens_client import generate_approval_summary  # LLM 클라이언트는 작업 실행 시점에 로드
+    summary_obj = generate_approval_summary(payload["confirm_text"]) or {}
+    if not summary_obj.get("title"):
+        raise RuntimeError("승인 요약 생성 실패")  # → 큐가 재시도
+    update_approval_summary(payload["approval_id"], summary_obj["title"], summary_obj.get("summary", ""))
+
+def _summarize_approval_failed(payload: Dict[str, Any], error: str):
+    # 재시도를 모두 소진하면 예전 동작과 같은 기본 제목으로 확정
+    update_approval_summary(payload["approval_id"], "제목없음", "")
+
+# 핸들러 등록만 import 시점에 (워커 스레드는 앱이 start_job_workers()로, 또는 별도 워커 프로세스가 띄움)
+get_queue().register(SUMMARY_JOB, _summarize_approval_job, on_failure=_summarize_approval_failed)
+
+def start_job_workers() -> bool:
+    """앱 프로세스 안에서 요약 워커 스레드 시작 (JOB_WORKER_MODE=inprocess일 때만, 여러 번 불러도 한 번만 뜸)"""
+    if JOB_WORKER_MODE != "inprocess":
+        return False
+    get_queue().start_workers(int(_secret("JOB_WORKER_THREADS", "1")))
+    return True
+
+def get_approvals_between(start_date: str, end_date: str, tz_hours: int = 9) -> List[Dict[str, Any]]:
+    """
+    created_at이 로컬 날짜 [start_date, end_date] (둘 다 포함, 'YYYY-MM-DD') 범위인 승인 요청
+    요약 백필용: approval_id, title, summary, confirm_text, created_at
+    """
+    start_utc, _ = _local_day_bounds_to_utc(start_date, tz_hours)
+    _, end_utc = _local_day_bounds_to_utc(end_date, tz_hours)
+    res = (
+        supabase.table("approvals")
+        .select("approval_id, title, summary, confirm_text, created_at")
+        .gte("created_at", start_utc)
+        .lt("created_at", end_utc)
+        .order("created_at")
+        .execute()
+    )
+    return res.data or []
+
+def get_approved_confirm_texts(decided_since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    로컬 지식 인덱스용: 승인완료된 요청의 confirm_text
+    decided_since(UTC iso)가 있으면 그 이후(포함) 결정된 건만 (증분 갱신)
+    """
+    q = (
+        supabase.table("approvals")
+        .select("approval_id, title, confirm_text, decided_at, creator_id, assignee")   # 열람 권한(기안자/결재자)
+        .eq("status", "승인완료")
+    )
+    if decided_since:
+        q = q.gte("decided_at", decided_since)
+    res = q.order("decided_at").execute()
+    return res.data or []
+
+def update_approval_summary(approval_id: str, title: str, summary: str):
+    res = supabase.table("approvals").update({"title": title, "summary": summary}).eq("approval_id", approval_id).execute()
+    return res.data
+
+def get_doc_type_training_rows() -> List[tuple]:
+    """
+    로컬 doc_type 분류기 학습용 (텍스트, type) 목록.
+    drafts에는 첫 발화가 없으므로 제출된 문서의 입력값(filled)을 이어 붙여 텍스트로 사용
+    """
+    res = supabase.table("drafts").select("type, filled").eq("status", "submitted").execute()
+    rows = []
+    for d in res.data or []:
+        filled = d.get("filled") or {}
+        text = " ".join(str(v) for v in filled.values()) if isinstance(filled, dict) else str(filled)
+        if d.get("type") and text.strip():
+            rows.append((text, d["type"]))
+    return rows
+
 def get_draft(draft_id: str) -> Optional[Dict[str, Any]]:
     res = supabase.table("drafts").select("*").eq("draft_id", draft_id).limit(1).execute()
     return res.data[0] if res.data else None
@@ -209,6 +316,10 @@ def set_todo_done(todo_id: str, done: bool = True):
     res = supabase.table("todos").update({"done": done}).eq("todo_id", todo_id).execute()
     return res.data
 
+def update_todo_title(todo_id: str, title: str):
+    res = supabase.table("todos").update({"title": title}).eq("todo_id", todo_id).execute()
+    return res.data
+
 # (레거시 호환) 완전 삭제가 필요한 경우 호출될 수 있어 유지
 def delete_todo(todo_id: str):
     response = supabase.table("todos").delete().eq("todo_id", todo_id).execute()
@@ -295,6 +406,10 @@ def create_notification(user_id: str, message: str):
     }).execute()
     return response.data
 
+def update_notification_message(notification_id: str, message: str):
+    res = supabase.table("notifications").update({"message": message}).eq("notification_id", notification_id).execute()
+    return res.data
+
 def get_notifications(user_id: str, only_unread: bool = True) -> List[Dict[str, Any]]:
     """
     특정 직원(user_id)의 알림 목록을 가져옵니다.
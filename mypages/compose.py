@@ -5,12 +5,18 @@ import streamlit as st
 import db
 from potens_client import (
     infer_doc_type,
+    classify_and_analyze,
     analyze_request_and_ask,
-    generate_confirm_text,
+    stream_confirm_text,
 )
 import potens_client
 # ✅ 범용 검색 유틸 임포트
-from mypages.utils_search import search_general_narrow, render_answer_from_hits
+from mypages.utils_config import secret
+from mypages.utils_search import SearchBudget, plan_search, render_answer_from_hits
+from mypages.utils_knowledge import lookup as knowledge_lookup, render_answer as render_knowledge_answer
+from mypages.utils_classifier import record_sample
+from mypages.utils_llm import try_parse_json
+from mypages.utils_validation import validate_filled
 
 
 _TEMPLATE_META_TRIGGERS = ("필수", "항목", "field", "가이드", "무엇이", "뭐가", "어떤 항목")
@@ -78,73 +84,61 @@ _PRICE_TRIGGERS = re.compile(r"(가격|얼마|비용|시세|price|cost|krw|₩)"
 def _is_price_intent(text: str) -> bool:
     return bool(_PRICE_TRIGGERS.search(text or ""))
 
-# 2) 메인: 범용 Q&A (정제 → 단계적 재검색 → LLM 보강)
-def answer_any_question(msg: str):
-    original = msg or ""
-    clean_q = _clean_query(original)
-    price_intent = _is_price_intent(original)
-
-    # 1차: 정제된 쿼리로 시도
-    tried_datas = []   # [(query, data_dict)]
-    data = search_general_narrow(clean_q)
-    tried_datas.append((clean_q, data))
-    if data["results"]:
-        return render_answer_from_hits(data["results"], data.get("intent", ""))
+# 2) 메인: 범용 Q&A (정제 → 재작성 질의 계획 → 예산 안에서 검색 → LLM 보강)
+ANSWER_DEADLINE_SEC = float(secret("ANSWER_DEADLINE_SEC", "12"))   # 질문 하나 전체 제한 시간
+ANSWER_MAX_CALLS = int(secret("ANSWER_MAX_CALLS", "12"))              # 질문 하나 최대 DDG 네트워크 호출 수
+ANSWER_LLM_MIN_SEC = 3.0                                              # 남은 시간이 이보다 짧으면 LLM 보강 생략
 
-    # 2차: 가격 의도면 '가격' 변형들로 재검색
-    candidates = []
+def _rewrites_for(clean_q: str, price_intent: bool) -> List[str]:
+    """우선순위 순 재작성 질의 (중복은 plan_search가 제거)"""
+    rewrites = [clean_q]
     if price_intent:
-        candidates.extend([
-            f"{clean_q} 가격",
-            f"{clean_q} price",
-            f"{clean_q} KRW",
-            f"{clean_q} ₩",
-        ])
+        rewrites += [f"{clean_q} 가격", f"{clean_q} price", f"{clean_q} KRW", f"{clean_q} ₩"]
         # 아이폰/애플 계열 히트 강화 (공홈)
         if re.search(r"(아이폰|iphone)", clean_q, re.I):
-            candidates.append(f"site:apple.com/kr {clean_q} 가격")
+            rewrites.append(f"site:apple.com/kr {clean_q} 가격")
     else:
-        # 비가격 질문이면 위키/공식문서/뉴스 쪽으로 좁힘 시도
-        candidates.extend([
-            f"{clean_q} site:wikipedia.org",
-            f"{clean_q} 공식",
-            f"{clean_q} 소개",
-        ])
-
-    # 2차 시도 루프
-    for q in candidates:
-        data2 = search_general_narrow(q)
-        tried_datas.append((q, data2))
-        if data2["results"]:
-            return render_answer_from_hits(data2["results"], data2.get("intent", ""))
-
-    # 3차: 그래도 없으면 마지막 완화(국제/영문 일반)
-    last_candidates = [
-        clean_q,                       # 다시 한 번 원 쿼리
-        re.sub(r"[가-힣]", "", clean_q).strip() or clean_q,  # 한글 제거 버전(영문 키워드만)
-    ]
-    for q in last_candidates:
-        if not q:
-            continue
-        data3 = search_general_narrow(q)
-        tried_datas.append((q, data3))
-        if data3["results"]:
-            return render_answer_from_hits(data3["results"], data3.get("intent", ""))
-
-    # 4차: LLM 보강 (검색 실패 요약 + 간결 답변 요청)
-    #     - 가격 의도면 "최신 가격은 변동 가능, 공홈/리셀러 참조" 가이드 포함
-    tried_lines = []
-    for q, d in tried_datas:
-        attempts = d.get("attempts") or []
-        if attempts:
-            # attempts는 [(query, hits, note), ...]
-            for tq, hits, note in attempts:
-                tried_lines.append(f"- {tq}  (결과 {hits}건, 전략={note})")
-        else:
-            tried_lines.append(f"- {q}  (시도, 결과 0건)")
+        # 비가격 질문이면 위키/공식문서 쪽으로 좁힘 시도
+        rewrites += [f"{clean_q} site:wikipedia.org", f"{clean_q} 공식", f"{clean_q} 소개"]
+    # 마지막 완화: 한글 제거 버전(영문 키워드만)
+    rewrites.append(re.sub(r"[가-힣]", "", clean_q).strip() or clean_q)
+    return rewrites
+
+def answer_any_question_planned(msg: str, deadline_sec: Optional[float] = None,
+                                max_calls: Optional[int] = None, viewer_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    {answer, source('knowledge'|'search'|'llm'|'partial'), tried, complete, calls, elapsed_ms}
+    예산(시간/호출 수)이 떨어지면 그때까지의 시도 기록과 함께 부분 답변을 반환
+    viewer_id: 질문한 직원 (본인이 기안/결재한 승인 문서만 사내 자료로 참고)
+    """
+    original = msg or ""
+    # 0차: 사내 자료(가이드/승인 문서)에서 먼저 찾기 → 있으면 웹 검색/LLM 생략
+    local_hits = knowledge_lookup(original, viewer_id=viewer_id)
+    if local_hits:
+        return {"answer": render_knowledge_answer(local_hits), "source": "knowledge",
+                "tried": [], "complete": True, "calls": 0, "elapsed_ms": 0.0}
 
+    clean_q = _clean_query(original)
+    price_intent = _is_price_intent(original)
+    budget = SearchBudget(ANSWER_DEADLINE_SEC if deadline_sec is None else deadline_sec,
+                          ANSWER_MAX_CALLS if max_calls is None else max_calls)
+    plan = plan_search(_rewrites_for(clean_q, price_intent), budget)
+    out = {k: plan[k] for k in ("tried", "complete", "calls", "elapsed_ms")}
+    if plan["results"]:
+        return {**out, "answer": render_answer_from_hits(plan["results"], plan["intent"]), "source": "search"}
+
+    tried_lines = [f"- {tq}  (결과 {hits}건, 전략={note})" for tq, hits, note in plan["tried"]]
     tried_block = "\n".join(tried_lines) if tried_lines else "- (시도 기록 없음)"
 
+    # 예산 소진: LLM 보강할 시간이 없으면 시도 기록만으로 부분 답변
+    if budget.remaining() < ANSWER_LLM_MIN_SEC:
+        ans = "제한 시간 안에 검색 결과를 찾지 못했습니다. 시도한 검색:\n" + tried_block
+        if price_intent:
+            ans += "\n공식 사이트나 공인 리셀러 페이지에서 최신 가격을 확인해주세요."
+        return {**out, "answer": ans, "source": "partial", "complete": False}
+
+    # 마지막: LLM 보강 (검색 실패 요약 + 간결 답변 요청)
+    #     - 가격 의도면 "최신 가격은 변동 가능, 공홈/리셀러 참조" 가이드 포함
     llm_prompt = f"""
     사용자가 다음 질문을 했습니다:
     Q: "{original}"
@@ -166,7 +160,10 @@ def answer_any_question(msg: str):
         if price_intent:
             ans += " (예: Apple 공홈, 통신사/오픈마켓 상품 페이지)"
 
-    return ans
+    return {**out, "answer": ans, "source": "llm"}
+
+def answer_any_question(msg: str, viewer_id: Optional[str] = None) -> str:
+    return answer_any_question_planned(msg, viewer_id=viewer_id)["answer"]
 
 
 
@@ -196,7 +193,7 @@ def _is_user_question(text: str) -> bool:
     return t.endswith("?") or any(k in t for k in QUESTION_TRIGGERS)
 
 # --- NEW: 질문에 바로 답해주기 ---
-def _answer_user_question(user_q: str, template_obj: dict, filled: dict) -> str:
+def _answer_user_question(user_q: str, template_obj: dict, filled: dict, viewer_id: Optional[str] = None) -> str:
     # 템플릿 필수 항목 정리
     required = _template_fields_list(template_obj)
     missing = [k for k in required if k not in filled]
@@ -215,6 +212,11 @@ def _answer_user_question(user_q: str, template_obj: dict, filled: dict) -> str:
             f"**남은 항목(미기입)**\n{missing_view}\n\n"
             f"**가이드(요약)**\n{guide}"
         )
+    # 1.5단계: 사내 자료(이 문서 종류 가이드 우선)에 점수 높은 문단이 있으면 바로 답변
+    local_hits = knowledge_lookup(user_q, doc_type=template_obj.get("type"), viewer_id=viewer_id)
+    if local_hits:
+        return render_knowledge_answer(local_hits)
+
     # 2단계: LLM으로 답변 시도
     # 그 외 일반 질문은 LLM로 간단 Q&A (컨텍스트 = 템플릿/가이드/이미 채운 값)
     prompt = f"""
@@ -228,20 +230,32 @@ def _answer_user_question(user_q: str, template_obj: dict, filled: dict) -> str:
     답변 규칙:
     - 한국어로, 3~6줄 내외로 간결하게.
     - 목록이 적절하면 bullet로.
-    """ 
-    ans = potens_client._call_potens_llm(prompt).strip()
+    """
+    query = user_q
+    if any(x in ql for x in ["가격","비용","얼마","시세"]):
+        query += " 평균 가격 원화"
+
+    # 질문 키워드만으로 검색이 필요하다고 판단되면 LLM 답변과 웹검색을 동시에 실행
+    keyword_needs_search = any(x in ql for x in ["가격", "얼마", "비용", "시세", "최신", "뉴스", "법", "규정", "알려", "찾아"])
+    search_results = None
+    if keyword_needs_search:
+        ans, search_results = potens_client.run_concurrently(
+            potens_client.async_call_potens_llm(prompt),
+            potens_client.aweb_search_duckduckgo(query, max_results=3),
+        )
+        ans = ans.strip()
+    else:
+        ans = potens_client._call_potens_llm(prompt).strip()
 
     # 3단계: 외부 지식 필요 여부 판단
     needs_search = (
         not ans or len(ans) < 20 or
-        any(x in ql for x in ["가격", "얼마", "비용", "시세", "최신", "뉴스", "법", "규정", "알려", "찾아"]) or
+        keyword_needs_search or
         any(x in ans for x in ["모르", "없습니다", "찾지 못"])
     )
     if needs_search:
-        query = user_q
-        if any(x in ql for x in ["가격","비용","얼마","시세"]):
-            query += " 평균 가격 원화"
-        search_results = potens_client.web_search_duckduckgo(query, max_results=3)
+        if search_results is None:
+            search_results = potens_client.web_search_duckduckgo(query, max_results=3)
 
         if search_results:
             ctx = "\n".join([
@@ -328,6 +342,7 @@ def run_compose_page(user: Dict[str, Any]):
             "questions_to_ask": [],
             "last_asked": None,
             "prefill": None,
+            "doc_type_source": None,   # "prefill" / "llm" / "local" (로컬 분류기 단독 판단)
             "confirm_rendered": False,
         }
         # ✅ 여기서는 new_request만 False로 되돌림
@@ -411,30 +426,45 @@ def run_compose_page(user: Dict[str, Any]):
                 # 1) 전체 템플릿 목록
                 templates = db.get_templates()
                 # 2) 반려 재작성 프리필에 doc_type이 있으면 우선
+                #    없으면 분류 + 첫 발화 분석을 LLM 한 번으로 처리 (검증 실패 시에만 2단계 경로)
                 pref = state.get("prefill") or {}
+                analysis = None
                 if pref.get("doc_type"):
                     doc_type = pref["doc_type"]
+                    state["doc_type_source"] = "prefill"
                 else:
-                    doc_type = infer_doc_type(user_input, templates)
-
-                # 3) 템플릿 객체 조회
-                template_obj = db.get_templates_by_type(doc_type)
+                    # 로컬 분류기가 확신하면 분류용 LLM 호출 없이 바로 진행
+                    doc_type = potens_client.fast_doc_type(user_input, templates)
+                    state["doc_type_source"] = "local" if doc_type else "llm"
+                    if not doc_type:
+                        analysis = classify_and_analyze(user_input, templates)
+                        if analysis:
+                            doc_type = analysis["doc_type"]
+                            potens_client.record_llm_doc_type(user_input, templates, doc_type)
+                        else:
+                            doc_type = infer_doc_type(user_input, templates)
+
+                # 3) 템플릿 객체 조회 (이미 받은 목록에 있으면 재조회 생략)
+                template_obj = next((dict(t) for t in templates if t.get("type") == doc_type), None) \
+                    or db.get_templates_by_type(doc_type)
                 if not template_obj:
                     err = f"'{doc_type}'에 해당하는 템플릿을 찾지 못했습니다. 관리자에게 문의하세요."
                     state["chat_history"].append({"role": "assistant", "content": err})
                     st.rerun()
 
                 # guide_md 추가
-                guide_md = db.get_rag_context(doc_type)
-                if guide_md:
-                    template_obj["guide_md"] = guide_md
+                if not template_obj.get("guide_md"):
+                    guide_md = db.get_rag_context(doc_type)
+                    if guide_md:
+                        template_obj["guide_md"] = guide_md
 
 
                 state["template"] = template_obj
                 template_fields = _template_fields_list(template_obj)
 
-                # 4) 첫 발화 분석 + 질문 생성(LLM)
-                analysis = analyze_request_and_ask(user_input, template_obj) or {}
+                # 4) 첫 발화 분석 + 질문 생성(LLM) — 통합 호출 결과가 없을 때만
+                if analysis is None:
+                    analysis = analyze_request_and_ask(user_input, template_obj) or {}
                 filled = dict(analysis.get("filled_fields", {}))
 
                 # 5) 반려 재작성 프리필 병합
@@ -489,10 +519,11 @@ def run_compose_page(user: Dict[str, Any]):
                 if _is_user_question(user_input):
                     if _is_template_meta_question(user_input):
                         # 템플릿/필드/가이드 관련 내부 질문 → 규칙/LLM로 빠르게
-                        ans = _answer_user_question(user_input, state["template"], state["filled_fields"])
+                        ans = _answer_user_question(user_input, state["template"], state["filled_fields"],
+                                                    viewer_id=user["user_id"])
                     else:
                         # 그 외 모든 일반 질문 → 범용 축소 검색(사실/최신/브랜드/가격/수명 등)
-                        ans = answer_any_question(user_input)
+                        ans = answer_any_question(user_input, viewer_id=user["user_id"])
                     state["chat_history"].append({"role": "assistant", "content": ans})
                     st.rerun()
 
@@ -533,22 +564,52 @@ def run_compose_page(user: Dict[str, Any]):
 
     # ---------------- confirm 단계: 최종 보고서 + 버튼 UI ----------------
     if state["stage"] == "confirm" and not state.get("confirm_rendered"):
-        with st.spinner("최종 보고서를 생성 중입니다..."):
-            doc_type = state["template"]["type"] if state.get("template") else "문서"
-            final_text = generate_confirm_text(state["filled_fields"], doc_type)
-
-            # confirm_text를 state에 저장 (DB 제출용)
-            state["confirm_text"] = final_text
-
-            response = (
-                "모든 정보가 수집되었습니다. 아래 내용으로 제출할까요?\n\n"
-                "---\n"
-                f"{final_text}\n"
-                "---\n\n"
-                "하단 버튼을 눌러주세요."
-            )
-            st.text_area("📄 최종 보고서", response, height=300)
-            state["confirm_rendered"] = True
+        doc_type = state["template"]["type"] if state.get("template") else "문서"
+
+        # 보고서를 토큰 단위로 받아 바로바로 그려줌 (전체 완료까지 기다리지 않음)
+        report_area = st.empty()
+        report_area.caption("최종 보고서를 생성 중입니다...")
+        parts = []
+        stream = stream_confirm_text(state["filled_fields"], doc_type)
+        try:
+            while True:
+                try:
+                    delta = next(stream)
+                except StopIteration as done:
+                    final_text = done.value   # 끝까지 받은 전체 텍스트 (오류로 끊겼으면 None)
+                    break
+                parts.append(delta)
+                report_area.markdown("".join(parts) + "▌")
+        finally:
+            stream.close()   # 사용자가 중간에 이동(rerun)해도 스트림/슬롯을 바로 정리
+        report_area.empty()
+
+        if final_text is None:
+            # 중간에 끊긴 보고서는 제출용으로 저장하지 않음 → 다음 실행 때 다시 생성
+            st.warning("최종 보고서 생성이 중간에 끊겼습니다. 잠시 후 다시 시도해주세요.")
+            if st.button("🔄 보고서 다시 생성"):
+                st.rerun()
+            st.stop()
+
+        # confirm_text를 state에 저장 (DB 제출용)
+        state["confirm_text"] = final_text
+
+        response = (
+            "모든 정보가 수집되었습니다. 아래 내용으로 제출할까요?\n\n"
+            "---\n"
+            f"{final_text}\n"
+            "---\n\n"
+            "하단 버튼을 눌러주세요."
+        )
+        st.text_area("📄 최종 보고서", response, height=300)
+
+        # 규칙 기반 사전 검증 (LLM 호출 없음): 누락/날짜 순서/금액 문제를 제출 전에 안내
+        if state.get("template"):
+            check, _ = validate_filled(state["filled_fields"], _template_fields_list(state["template"]), doc_type)
+            if not check["is_valid"]:
+                missing = ", ".join(check["missing"])
+                st.warning(" ".join(x for x in (f"누락된 항목: {missing}." if missing else "", check["suggestion"]) if x))
+        state["confirm_rendered"] = True
 
     # ---------------- 버튼 UI (항상 confirm일 때는 보이도록) ----------------
     if state["stage"] == "confirm":
@@ -593,15 +654,13 @@ def run_compose_page(user: Dict[str, Any]):
                     """
                     edit_raw = potens_client._call_potens_llm(edit_prompt)
 
-                    import re, json
                     if edit_raw:
-                        match = re.search(r"\{.*\}", edit_raw, re.S)
-                        if match:
-                            try:
-                                edit_result = json.loads(match.group(0))
-                            except json.JSONDecodeError:
-                                st.error("❌ 수정 결과 파싱 실패. 다시 시도해주세요.")
-                                edit_result = {}
+                        ok, parsed = try_parse_json(edit_raw, schema=potens_client.LLM_JSON_SCHEMAS["edit_field"], op="edit_field")
+                        if ok:
+                            edit_result = parsed
+                        else:
+                            st.error("❌ 수정 결과 파싱 실패. 다시 시도해주세요.")
+                            edit_result = {}
 
                 # --- 수정 적용 ---
                 if edit_result and "key" in edit_result:
@@ -626,6 +685,12 @@ def run_compose_page(user: Dict[str, Any]):
                 )
                 print(f"[DEBUG] draft_id={draft_id}")
                 if draft_id:
+                    # 로컬 doc_type 분류기 학습 샘플 (첫 발화 → 최종 문서 종류)
+                    # LLM/사용자가 정한 종류만 기록 — 모델 자신의 예측을 다시 학습하면 오분류가 굳어짐
+                    if state.get("doc_type_source") in ("llm", "prefill"):
+                        first_msg = next((m["content"] for m in state["chat_history"] if m["role"] == "user"), "")
+                        record_sample(first_msg, state["template"]["type"])
+
                     # 대표 ID 가져오기
                     rep_id = db.get_rep_user_id()
                     print(f"[DEBUG] rep_id={rep_id}")
@@ -1,6 +1,3 @@
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 import streamlit as st
 import db
 from typing import Dict, List, Any
@@ -45,6 +42,11 @@ def render_rep_dashboard(user: Dict[str, Any]):
     with tab_summary:
         st.info("요약 탭은 추후 개발 예정입니다.")
 
+        # 차트 라이브러리는 요약 탭을 그릴 때만 로드 (import 비용이 큼)
+        import numpy as np
+        import pandas as pd
+        import matplotlib.pyplot as plt
+
         # ✅ 한글 폰트 설정 (Mac 기본: AppleGothic)
         plt.rc("font", family="AppleGothic")
         plt.rcParams["axes.unicode_minus"] = False  # 마이너스 기호 깨짐 방지
@@ -2,6 +2,7 @@ import time
 import streamlit as st
 import db
 import potens_client
+from mypages.utils_messages import render_message, polish_in_background
 from datetime import datetime, timedelta, timezone
 
 # ---------------------------
@@ -113,51 +114,73 @@ def app(user):
                     confirm_text = (draft.get("confirm_text") or "").strip()
 
                     due_at_str = due_date.isoformat()
+                    doc_type = draft.get("type") if draft else None
 
-                    # LLM 기반 후속 조치 문구
-                    alert_msg = potens_client.generate_next_step_alert({
-                        "type": title,
+                    # 후속 조치 문구: 템플릿으로 즉시 생성 (LLM 다듬기는 아래에서 백그라운드로)
+                    alert_msg = render_message("next_step_alert", doc_type, {
                         "creator_name": creator_name,
-                        "title": title,
-                        "due_date": due_at_str
-                    }) or f"'{title}' 승인 완료 – 후속 조치 필요"
+                        "doc_title": title,
+                        "due_date": due_at_str,
+                    }, loader=db.get_templates_by_type)
+
+                    # 문구를 뺀 앞/뒤 부분 (백그라운드 교체 때 같은 형식으로 다시 조립)
+                    todo_prefix = f"{creator_name}님의 요청 – " if selected_assignees else "[대표 Todo] "
+                    noti_head = f"📌 {creator_name}님이 제출한 '{title}' 요청이 대표 승인되었습니다.\n\n➡️ 후속업무: "
+                    noti_tail = f"\n📅 마감일: {due_at_str}"
 
+                    todo_ids, notification_ids = [], []
                     if selected_assignees:
                         employee_map = {e["name"]: e["user_id"] for e in staff_employees}
                         for assignee in selected_assignees:
                             assignee_id = employee_map[assignee]
 
                             # ✅ 직원 Todo
-                            db.create_todo(
+                            todo_rows = db.create_todo(
                                 approval_id=approval_id,
                                 owner=assignee_id,
                                 # 제목에 후속업무(alert_msg)를 직접 넣음
-                                title=f"{creator_name}님의 요청 – {alert_msg}",
+                                title=todo_prefix + alert_msg,
                                 due_at=due_at_str
                             )
 
                             # 알림 전송
-                            db.create_notification(
+                            noti_rows = db.create_notification(
                                 user_id=assignee_id,
-                                message=(
-                                    f"📌 {creator_name}님이 제출한 '{title}' 요청이 대표 승인되었습니다.\n\n"
-                                    f"➡️ 후속업무: {alert_msg}\n"
-                                    f"📅 마감일: {due_at_str}"
-                                )
+                                message=noti_head + alert_msg + noti_tail
                             )
+                            todo_ids += [r["todo_id"] for r in todo_rows or []]
+                            notification_ids += [r["notification_id"] for r in noti_rows or []]
 
                         st.success(f"✅ 승인 완료! {', '.join(selected_assignees)}에게 후속업무가 전달되었습니다.")
 
                     else:
                         # ✅ 담당자 없으면 대표 Todo만 생성
-                        db.create_todo(
+                        todo_rows = db.create_todo(
                             approval_id=approval_id,
                             owner=user["user_id"],  # 대표 본인
-                            title=f"[대표 Todo] {alert_msg}",
+                            title=todo_prefix + alert_msg,
                             due_at=due_at_str
                         )
+                        todo_ids += [r["todo_id"] for r in todo_rows or []]
                         st.success(f"✅ 승인 완료! 후속 담당자가 없어 대표님 Todo로 등록되었습니다.")
 
+                    # LLM 다듬기: 기한 안에 끝나면 Todo 제목/알림 문구를 교체
+                    # (콜백은 나중에 실행되므로 반복문 변수는 기본 인자로 고정)
+                    def _apply_alert(msg: str, todo_ids=todo_ids, notification_ids=notification_ids,
+                                     todo_prefix=todo_prefix, noti_head=noti_head, noti_tail=noti_tail):
+                        for tid in todo_ids:
+                            db.update_todo_title(tid, todo_prefix + msg)
+                        for nid in notification_ids:
+                            db.update_notification_message(nid, noti_head + msg + noti_tail)
+
+                    alert_input = {
+                        "type": doc_type or title,
+                        "creator_name": creator_name,
+                        "title": title,
+                        "due_date": due_at_str
+                    }
+                    polish_in_background(lambda data=alert_input: potens_client.generate_next_step_alert(data, quiet=True), _apply_alert)
+
                 # --- 반려 버튼 ---
                 reject_reason = st.text_input("반려 사유 입력", key=f"reason-{approval_id}")
                 if st.button("❌ 반려", key=f"reject-btn-{approval_id}"):
@@ -165,15 +188,26 @@ def app(user):
                         st.warning("반려 사유를 입력해주세요.")
                     else:
                         db.update_approval_status(approval_id, "반려", reject_reason.strip())
-                        rejection_note = potens_client.generate_rejection_note(
-                            rejection_memo=reject_reason,
-                            creator_name=approval.get("creator_name", "담당 직원"),
-                            doc_title=title
-                        )
-                        db.create_notification(
+                        creator_name = approval.get("creator_name", "담당 직원")
+                        draft = db.get_draft(approval["draft_id"]) if approval.get("draft_id") else None
+
+                        # 반려 안내문: 템플릿으로 즉시 발송 → LLM 다듬기가 기한 안에 끝나면 문구 교체
+                        rejection_note = render_message("rejection_note", (draft or {}).get("type"), {
+                            "creator_name": creator_name,
+                            "doc_title": title,
+                            "memo": reject_reason.strip(),
+                        }, loader=db.get_templates_by_type)
+                        noti_rows = db.create_notification(
                             user_id=approval["creator_id"],
                             message=rejection_note
                         )
+                        noti_ids = [r["notification_id"] for r in noti_rows or []]
+                        polish_in_background(
+                            lambda memo=reject_reason, name=creator_name, doc_title=title:
+                                potens_client.generate_rejection_note(rejection_memo=memo, creator_name=name, doc_title=doc_title,
+                                                                     quiet=True),
+                            lambda msg, ids=noti_ids: [db.update_notification_message(nid, msg) for nid in ids],
+                        )
                         st.error("❌ 반려 완료!")
 
     else:
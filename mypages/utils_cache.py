@@ -0,0 +1,129 @@
+# mypages/utils_cache.py
+import os, json, time, sqlite3, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 프로세스 공용 캐시 디렉터리 (SQLite 파일 등)
+CACHE_DIR = os.getenv("COLLABNOTE_CACHE_DIR", ".cache")
+
+def cache_path(filename: str) -> str:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+class TTLCache:
+    """
+    2단 캐시: 메모리 LRU(1차) + SQLite(2차, 선택)
+    - 값은 JSON 직렬화 가능한 것만 저장
+    - ttl(초)은 항목마다 지정, 만료 항목은 조회 시 제거
+    - 모든 메서드는 스레드 안전 (Streamlit 세션 간 공유용)
+    """
+
+    def __init__(self, name: str, max_entries: int = 512, db_path: Optional[str] = None, max_disk_entries: int = 5000):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._mem: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, Any] = {"hits_mem": 0, "hits_disk": 0, "misses": 0, "sets": 0, "evictions": 0, "by_tag": {}}
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " ns TEXT, key TEXT, value TEXT, expires_at REAL, accessed_at REAL,"
+                " PRIMARY KEY (ns, key))"
+            )
+
+    # ---------- 조회/저장 ----------
+    def get(self, key: str, tag: Optional[str] = None) -> Tuple[bool, Any]:
+        """(hit 여부, 값) 반환"""
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._mem.move_to_end(key)
+                    self._count("hits_mem", tag)
+                    return True, value
+                del self._mem[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM cache WHERE ns=? AND key=?", (self.name, key)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._db.execute(
+                        "UPDATE cache SET accessed_at=? WHERE ns=? AND key=?", (now, self.name, key)
+                    )
+                    self._mem_put(key, row[1], value)
+                    self._count("hits_disk", tag)
+                    return True, value
+                if row:
+                    self._db.execute("DELETE FROM cache WHERE ns=? AND key=?", (self.name, key))
+
+            self._count("misses", tag)
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: float):
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._mem_put(key, expires_at, value)
+            self._stats["sets"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (ns, key, value, expires_at, accessed_at) VALUES (?,?,?,?,?)",
+                    (self.name, key, json.dumps(value, ensure_ascii=False), expires_at, now),
+                )
+                self._trim_disk(now)
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE ns=?", (self.name,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self._stats.items()}
+            out["by_tag"] = {t: dict(c) for t, c in self._stats["by_tag"].items()}
+            out["mem_entries"] = len(self._mem)
+            if self._db is not None:
+                out["disk_entries"] = self._db.execute(
+                    "SELECT COUNT(*) FROM cache WHERE ns=?", (self.name,)
+                ).fetchone()[0]
+        hits = out["hits_mem"] + out["hits_disk"]
+        total = hits + out["misses"]
+        out["hit_rate"] = round(hits / total, 3) if total else 0.0
+        return out
+
+    # ---------- 내부 ----------
+    def _mem_put(self, key: str, expires_at: float, value: Any):
+        self._mem[key] = (expires_at, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _trim_disk(self, now: float):
+        self._db.execute("DELETE FROM cache WHERE ns=? AND expires_at<=?", (self.name, now))
+        n = self._db.execute("SELECT COUNT(*) FROM cache WHERE ns=?", (self.name,)).fetchone()[0]
+        if n > self.max_disk_entries:
+            # 가장 오래 안 쓰인 항목부터 제거
+            self._db.execute(
+                "DELETE FROM cache WHERE ns=? AND key IN ("
+                " SELECT key FROM cache WHERE ns=? ORDER BY accessed_at ASC LIMIT ?)",
+                (self.name, self.name, n - self.max_disk_entries),
+            )
+            self._stats["evictions"] += n - self.max_disk_entries
+
+    def _count(self, field: str, tag: Optional[str]):
+        self._stats[field] += 1
+        if tag:
+            per = self._stats["by_tag"].setdefault(tag, {"hits": 0, "misses": 0})
+            per["misses" if field == "misses" else "hits"] += 1
@@ -0,0 +1,248 @@
+# mypages/utils_classifier.py
+"""
+문서 종류(doc_type) 로컬 빠른 분류기
+- 문자 n-gram 나이브 베이즈 (외부 의존성 없음)
+- 학습 데이터: 제출된 drafts.type + 첫 발화(로컬 샘플 저장소, LLM/사용자가 정한 종류만)
+- 후보 종류가 모두 DOC_TYPE_MIN_SAMPLES개 이상 학습되기 전에는 예측하지 않음, 확률은 과신 보정
+- 재학습: python -m mypages.utils_classifier retrain
+"""
+import os, re, json, math, sqlite3, threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mypages.utils_cache import cache_path
+from mypages.utils_config import secret
+
+MODEL_PATH = secret("DOC_TYPE_MODEL_PATH") or cache_path("doc_type_nb.json")
+SAMPLES_PATH = secret("DOC_TYPE_SAMPLES_PATH") or cache_path("doc_type_samples.sqlite3")
+NGRAM_RANGE = (1, 3)
+# 후보 종류마다 최소 이 개수의 샘플이 쌓이기 전에는 모델을 믿지 않음 (LLM으로)
+MIN_SAMPLES_PER_CLASS = int(secret("DOC_TYPE_MIN_SAMPLES", "5"))
+# 겹치는 n-gram은 서로 독립이 아니라 나이브 베이즈 확률이 0/1로 쏠림
+# → 우도를 "특징 수"가 아니라 이 개수만큼의 독립 증거로 환산해서 보정
+EVIDENCE_FEATURES = float(secret("DOC_TYPE_EVIDENCE_FEATURES", "8"))
+
+# ------------------------------
+# 0) 전처리/특징
+# ------------------------------
+def _normalize(text: str) -> str:
+    t = (text or "").lower()
+    t = re.sub(r"\d+", "0", t)          # 금액/날짜 숫자는 하나로 묶음
+    t = re.sub(r"[^\w가-힣 ]+", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+def _features(text: str) -> Counter:
+    t = f" {_normalize(text)} "
+    feats: Counter = Counter()
+    lo, hi = NGRAM_RANGE
+    for n in range(lo, hi + 1):
+        for i in range(len(t) - n + 1):
+            g = t[i:i + n]
+            if g.strip():
+                feats[g] += 1
+    return feats
+
+# ------------------------------
+# 1) 나이브 베이즈 모델
+# ------------------------------
+class DocTypeClassifier:
+    def __init__(self, alpha: float = 0.5):
+        self.alpha = alpha
+        self.class_docs: Dict[str, int] = {}
+        self.class_tokens: Dict[str, int] = {}
+        self.feature_counts: Dict[str, Dict[str, int]] = {}
+        self.vocab_size = 0
+
+    def fit(self, samples: Iterable[Tuple[str, str]]) -> "DocTypeClassifier":
+        class_docs: Counter = Counter()
+        feats_by_class: Dict[str, Counter] = defaultdict(Counter)
+        vocab = set()
+        for text, label in samples:
+            if not text or not label:
+                continue
+            f = _features(text)
+            class_docs[label] += 1
+            feats_by_class[label].update(f)
+            vocab.update(f)
+        self.class_docs = dict(class_docs)
+        self.feature_counts = {c: dict(fc) for c, fc in feats_by_class.items()}
+        self.class_tokens = {c: sum(fc.values()) for c, fc in feats_by_class.items()}
+        self.vocab_size = len(vocab)
+        return self
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.class_docs)
+
+    def predict_proba(self, text: str, allowed: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        [(label, prob)] 확률 내림차순. allowed가 있으면 그 종류 전체로 정규화
+        (학습 데이터에 없는 종류도 사전분포만으로 후보에 포함 → 아는 종류가 하나뿐이어도 1.0이 나오지 않음)
+        """
+        classes = list(dict.fromkeys(allowed)) if allowed is not None else list(self.class_docs)
+        if not classes:
+            return []
+        feats = _features(text)
+        n_feats = sum(feats.values())
+        scale = min(1.0, EVIDENCE_FEATURES / n_feats) if n_feats else 1.0
+        total_docs = sum(self.class_docs.get(c, 0) for c in classes)
+        v = self.vocab_size + 1
+        log_scores = {}
+        for c in classes:
+            fc = self.feature_counts.get(c, {})
+            denom = math.log(self.class_tokens.get(c, 0) + self.alpha * v)
+            loglik = sum(n * (math.log(fc.get(g, 0) + self.alpha) - denom) for g, n in feats.items())
+            prior = math.log((self.class_docs.get(c, 0) + 1) / (total_docs + len(classes)))
+            log_scores[c] = prior + scale * loglik
+        m = max(log_scores.values())
+        exp = {c: math.exp(s - m) for c, s in log_scores.items()}
+        z = sum(exp.values())
+        return sorted(((c, e / z) for c, e in exp.items()), key=lambda x: x[1], reverse=True)
+
+    def is_ready_for(self, allowed: Optional[Iterable[str]] = None) -> bool:
+        """후보 종류가 모두 MIN_SAMPLES_PER_CLASS개 이상 학습됐는지"""
+        classes = list(allowed) if allowed is not None else list(self.class_docs)
+        return bool(classes) and all(self.class_docs.get(c, 0) >= MIN_SAMPLES_PER_CLASS for c in classes)
+
+    def predict(self, text: str, allowed: Optional[Iterable[str]] = None) -> Tuple[Optional[str], float]:
+        ranked = self.predict_proba(text, allowed)
+        return ranked[0] if ranked else (None, 0.0)
+
+    # ---------- 직렬화 ----------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "ngram_range": list(NGRAM_RANGE),
+            "class_docs": self.class_docs,
+            "class_tokens": self.class_tokens,
+            "feature_counts": self.feature_counts,
+            "vocab_size": self.vocab_size,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "DocTypeClassifier":
+        m = cls(alpha=d.get("alpha", 0.5))
+        m.class_docs = d.get("class_docs", {})
+        m.class_tokens = d.get("class_tokens", {})
+        m.feature_counts = d.get("feature_counts", {})
+        m.vocab_size = d.get("vocab_size", 0)
+        return m
+
+    def save(self, path: str = MODEL_PATH):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "DocTypeClassifier":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+# ------------------------------
+# 2) 학습 샘플 저장소 (첫 발화 + 최종 doc_type)
+# ------------------------------
+_samples_lock = threading.Lock()
+
+def _samples_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(SAMPLES_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS samples ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT, doc_type TEXT,"
+        " created_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+    )
+    return conn
+
+def record_sample(text: str, doc_type: str):
+    """제출된 문서의 첫 발화와 최종 doc_type을 학습 샘플로 저장"""
+    if not text or not doc_type:
+        return
+    with _samples_lock:
+        conn = _samples_db()
+        try:
+            with conn:
+                conn.execute("INSERT INTO samples (text, doc_type) VALUES (?, ?)", (text.strip(), doc_type))
+        finally:
+            conn.close()
+
+def load_samples() -> List[Tuple[str, str]]:
+    with _samples_lock:
+        conn = _samples_db()
+        try:
+            return [(t, d) for t, d in conn.execute("SELECT text, doc_type FROM samples")]
+        finally:
+            conn.close()
+
+# ------------------------------
+# 3) 프로세스 공용 모델 + 지표
+# ------------------------------
+_model: Optional[DocTypeClassifier] = None
+_model_mtime: Optional[float] = None
+_model_lock = threading.Lock()
+_stats = {"decisions": 0, "llm_skipped": 0, "llm_compared": 0, "disagreements": 0}
+_stats_lock = threading.Lock()
+
+def get_model() -> Optional[DocTypeClassifier]:
+    """디스크의 모델을 읽어 캐시 (파일이 바뀌면 다시 읽음)"""
+    global _model, _model_mtime
+    try:
+        mtime = os.path.getmtime(MODEL_PATH)
+    except OSError:
+        return None
+    if _model is None or mtime != _model_mtime:
+        with _model_lock:
+            if _model is None or mtime != _model_mtime:
+                try:
+                    _model = DocTypeClassifier.load(MODEL_PATH)
+                    _model_mtime = mtime
+                except Exception as e:
+                    print(f"❌ doc_type 모델 로드 실패: {e}")
+                    return None
+    return _model
+
+def retrain(extra_samples: Optional[Iterable[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """로컬 샘플(+추가 샘플)로 재학습하고 모델 파일을 교체합니다."""
+    samples = load_samples() + list(extra_samples or [])
+    model = DocTypeClassifier().fit(samples)
+    model.save(MODEL_PATH)
+    return {"samples": len(samples), "classes": model.class_docs, "vocab_size": model.vocab_size, "path": MODEL_PATH}
+
+def predict_doc_type(text: str, allowed: Optional[Iterable[str]] = None) -> Tuple[Optional[str], float]:
+    """(label, 보정된 확률). 모델이 없거나 후보 중 샘플이 부족한 종류가 있으면 (None, 0.0)"""
+    allowed = list(allowed) if allowed is not None else None
+    model = get_model()
+    if model is None or not model.is_trained or not model.is_ready_for(allowed):
+        return None, 0.0
+    return model.predict(text, allowed)
+
+def record_decision(local_label: Optional[str], llm_label: Optional[str]):
+    """최종 분류 1건 기록. llm_label이 None이면 로컬 모델이 LLM 호출을 대신한 경우"""
+    with _stats_lock:
+        _stats["decisions"] += 1
+        if llm_label is None:
+            _stats["llm_skipped"] += 1
+        elif local_label is not None:
+            _stats["llm_compared"] += 1
+            if local_label != llm_label:
+                _stats["disagreements"] += 1
+
+def get_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        s = dict(_stats)
+    s["llm_skip_rate"] = round(s["llm_skipped"] / s["decisions"], 3) if s["decisions"] else 0.0
+    s["disagreement_rate"] = round(s["disagreements"] / s["llm_compared"], 3) if s["llm_compared"] else 0.0
+    return s
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] != "retrain":
+        print("usage: python -m mypages.utils_classifier retrain [--from-db]")
+        sys.exit(1)
+    extra: List[Tuple[str, str]] = []
+    if "--from-db" in sys.argv:
+        # 첫 발화가 없는 과거 제출분은 입력값(filled)을 대체 텍스트로 사용
+        import db
+        extra = db.get_doc_type_training_rows()
+    print(json.dumps(retrain(extra), ensure_ascii=False, indent=2))
@@ -0,0 +1,19 @@
+# mypages/utils_config.py
+"""
+설정 값 조회 — st.secrets → 환경변수 순 (모든 모듈 공용)
+secrets.toml 없이 대역 서버/벤치마크/워커 CLI로 실행할 때는 환경변수만 사용됨
+"""
+import os
+from typing import Any
+
+def secret(key: str, default: Any = None) -> Any:
+    try:
+        import streamlit as st   # 유틸 모듈/CLI가 streamlit을 import 시점에 끌어오지 않도록 여기서
+        value = st.secrets.get(key)
+    except Exception:
+        value = None
+    return os.getenv(key, default) if value is None else value
+
+def secret_flag(key: str, default: str = "false") -> bool:
+    """'1'/'true'/'yes' (대소문자 무관, secrets의 bool 포함)면 True"""
+    return str(secret(key, default)).lower() in ("1", "true", "yes")
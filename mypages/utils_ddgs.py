@@ -0,0 +1,187 @@
+# mypages/utils_ddgs.py
+"""
+DDGS 검색 클라이언트 풀 (프로세스 공용)
+- 질의마다 DDGS()를 새로 만들지 않고 오래 사는 클라이언트를 빌려 씀 (엔진/HTTP 세션 재사용)
+- 한 클라이언트는 한 번에 한 스레드만 사용 (DDGS 인스턴스는 스레드 안전이 보장되지 않음)
+- 재활용 기준 (빌릴 때 확인): 사용 횟수(DDGS_MAX_USES) / 나이(DDGS_MAX_AGE_SEC) 초과,
+  또는 최근 DDGS_SLOW_WINDOW회 검색 지연 중앙값이 DDGS_SLOW_MS 이상(느려진 세션)이면 버리고 새로 만듦
+- 검색 중 오류가 나면 그 클라이언트는 바로 버림 (DDGS 세션 상태를 직접 점검할 방법은 없어서 결과로 판단)
+- 검색 호출은 pool.text(...) 하나로 통일 (ddgs 인자 규칙을 여기서만 맞춤)
+"""
+import time, threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from mypages.utils_config import secret
+
+DDGS_POOL_SIZE = int(secret("DDGS_POOL_SIZE", "6"))
+DDGS_MAX_USES = int(secret("DDGS_MAX_USES", "200"))
+DDGS_MAX_AGE_SEC = float(secret("DDGS_MAX_AGE_SEC", "900"))
+DDGS_TIMEOUT_SEC = int(secret("DDGS_TIMEOUT_SEC", "5"))
+DDGS_ACQUIRE_TIMEOUT_SEC = float(secret("DDGS_ACQUIRE_TIMEOUT_SEC", "10"))
+DDGS_SLOW_MS = float(secret("DDGS_SLOW_MS", "4000"))      # 0이면 지연 기준 재활용 끔
+DDGS_SLOW_WINDOW = int(secret("DDGS_SLOW_WINDOW", "5"))
+
+def _default_factory():
+    from ddgs import DDGS  # 첫 검색 때만 로드 (import 비용이 큼)
+    return DDGS(timeout=DDGS_TIMEOUT_SEC)
+
+class _PooledClient:
+    __slots__ = ("id", "client", "created_at", "uses", "errors", "latencies")
+
+    def __init__(self, cid: int, client: Any):
+        self.id = cid
+        self.client = client
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.errors = 0
+        self.latencies: Deque[float] = deque(maxlen=100)
+
+class DDGSPool:
+    def __init__(self, size: int = DDGS_POOL_SIZE, max_uses: int = DDGS_MAX_USES,
+                 max_age: float = DDGS_MAX_AGE_SEC, slow_ms: float = DDGS_SLOW_MS,
+                 factory: Optional[Callable[[], Any]] = None):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.slow_ms = slow_ms
+        self._factory = factory or _default_factory
+        self._idle: List[_PooledClient] = []
+        self._live: Dict[int, _PooledClient] = {}     # 현재 살아 있는 클라이언트 (대여 중 포함)
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._stats: Dict[str, Any] = {
+            "created": 0, "checkouts": 0, "waits": 0, "wait_ms_total": 0.0, "acquire_timeouts": 0,
+            "recycled": {"error": 0, "max_uses": 0, "max_age": 0, "slow": 0},
+        }
+
+    # ---------- 대여/반납 ----------
+    def _recycle_reason(self, pc: _PooledClient) -> Optional[str]:
+        if self.max_uses and pc.uses >= self.max_uses:
+            return "max_uses"
+        if self.max_age and time.monotonic() - pc.created_at >= self.max_age:
+            return "max_age"
+        if self.slow_ms and len(pc.latencies) >= DDGS_SLOW_WINDOW:
+            recent = sorted(list(pc.latencies)[-DDGS_SLOW_WINDOW:])
+            if recent[len(recent) // 2] >= self.slow_ms:
+                return "slow"
+        return None
+
+    def _acquire(self, timeout: float) -> _PooledClient:
+        started = time.monotonic()
+        with self._cond:
+            waited = False
+            while True:
+                while self._idle:
+                    pc = self._idle.pop()
+                    reason = self._recycle_reason(pc)
+                    if reason is None:
+                        break
+                    self._discard(pc, reason)
+                else:
+                    pc = None
+                if pc is not None:
+                    break
+                if len(self._live) < self.size:
+                    pc = self._create()
+                    break
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["acquire_timeouts"] += 1
+                    raise TimeoutError(f"DDGS 클라이언트 대기 시간 초과 ({timeout:.1f}s)")
+                waited = True
+                self._cond.wait(remaining)
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += (time.monotonic() - started) * 1000
+            return pc
+
+    def _create(self) -> _PooledClient:
+        # _cond 보유 상태에서 호출. DDGS() 생성은 가벼움(네트워크 없음)
+        self._next_id += 1
+        pc = _PooledClient(self._next_id, self._factory())
+        self._live[pc.id] = pc
+        self._stats["created"] += 1
+        return pc
+
+    def _discard(self, pc: _PooledClient, reason: str):
+        self._live.pop(pc.id, None)
+        self._stats["recycled"][reason] += 1
+        self._cond.notify()
+
+    def _release(self, pc: _PooledClient, ok: bool):
+        with self._cond:
+            if not ok:
+                self._discard(pc, "error")
+                return
+            self._idle.append(pc)
+            self._cond.notify()
+
+    @contextmanager
+    def client(self, timeout: float = DDGS_ACQUIRE_TIMEOUT_SEC) -> Iterator[Any]:
+        """with pool.client() as ddgs: ddgs.text(...)  — 블록에서 예외가 나면 그 클라이언트는 폐기"""
+        pc = self._acquire(timeout)
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield pc.client
+            ok = True
+        finally:
+            with self._cond:
+                pc.uses += 1
+                pc.latencies.append((time.perf_counter() - t0) * 1000)
+                if not ok:
+                    pc.errors += 1
+            self._release(pc, ok)
+
+    def text(self, query: str, region: Optional[str] = None, timelimit: Optional[str] = None,
+             max_results: int = 10, safesearch: str = "moderate") -> List[Dict[str, Any]]:
+        """
+        풀의 클라이언트로 텍스트 검색. ddgs 9.x는 질의를 위치 인자로 받음 (keywords=는 query 없이 쓰면 TypeError)
+        None인 옵션은 넘기지 않음 → ddgs 기본값 사용
+        """
+        opts = {k: v for k, v in (("region", region), ("timelimit", timelimit)) if v}
+        with self.client() as ddgs:
+            return list(ddgs.text(query, max_results=max_results, safesearch=safesearch, **opts))
+
+    # ---------- 지표 ----------
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            out = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self._stats.items()}
+            out["wait_ms_total"] = round(out["wait_ms_total"], 1)
+            out["live"] = len(self._live)
+            out["idle"] = len(self._idle)
+            out["in_use"] = len(self._live) - len(self._idle)
+            clients = []
+            for pc in self._live.values():
+                lat = sorted(pc.latencies)
+                clients.append({
+                    "id": pc.id,
+                    "age_sec": round(now - pc.created_at, 1),
+                    "uses": pc.uses,
+                    "errors": pc.errors,
+                    "latency_ms_p50": round(lat[len(lat) // 2], 1) if lat else 0.0,
+                    "latency_ms_max": round(lat[-1], 1) if lat else 0.0,
+                })
+        out["clients"] = clients
+        # 재사용률: 대여 중 새로 만들 필요가 없었던 비율
+        out["reuse_rate"] = round(1 - out["created"] / out["checkouts"], 3) if out["checkouts"] else 0.0
+        return out
+
+_pool: Optional[DDGSPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> DDGSPool:
+    """프로세스 공용 풀 (utils_search, potens_client 검색이 함께 사용)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DDGSPool()
+    return _pool
+
+def get_stats() -> Dict[str, Any]:
+    return get_pool().stats()
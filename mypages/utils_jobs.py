@@ -0,0 +1,270 @@
+# mypages/utils_jobs.py
+"""
+내구성 작업 큐 (SQLite)
+- enqueue(kind, payload) → jobs 테이블에 저장 (프로세스가 죽어도 남음)
+- 핸들러는 register(kind, handler, on_failure)로 등록, 실패 시 지수 백오프로 재시도
+- 마지막 시도까지 실패하면 status='failed' + on_failure(payload, error) 호출
+  (실행 중 워커가 죽어 리스가 지난 작업도 시도를 다 썼으면 다시 돌리지 않고 같은 처리)
+- 실행 방식
+  * 앱 프로세스 안의 워커 스레드 (JOB_WORKER_MODE=inprocess, 기본 — app.py가 db.start_job_workers() 호출)
+  * 별도 워커 프로세스: python -m mypages.utils_jobs worker  (앱은 JOB_WORKER_MODE=external)
+"""
+import os, json, time, uuid, sqlite3, threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mypages.utils_cache import cache_path
+from mypages.utils_config import secret
+
+JOB_QUEUE_PATH = secret("JOB_QUEUE_PATH") or cache_path("jobs.sqlite3")
+JOB_MAX_ATTEMPTS = int(secret("JOB_MAX_ATTEMPTS", "4"))
+JOB_RETRY_BASE_SEC = float(secret("JOB_RETRY_BASE_SEC", "2"))
+JOB_LEASE_SEC = float(secret("JOB_LEASE_SEC", "120"))      # running 상태로 이보다 오래 있으면 워커가 죽은 것으로 보고 재실행
+JOB_POLL_SEC = float(secret("JOB_POLL_SEC", "1"))
+
+Handler = Callable[[Dict[str, Any]], Any]
+FailureHandler = Callable[[Dict[str, Any], str], Any]
+
+class JobQueue:
+    def __init__(self, path: str = JOB_QUEUE_PATH, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 retry_base: float = JOB_RETRY_BASE_SEC, lease: float = JOB_LEASE_SEC):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.lease = lease
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._handlers: Dict[str, Tuple[Handler, Optional[FailureHandler]]] = {}
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL,"
+                " status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL, run_at REAL NOT NULL, created_at REAL NOT NULL,"
+                " started_at REAL, finished_at REAL, locked_by TEXT, last_error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # 스레드마다 연결 하나 (sqlite3 연결은 스레드 간 공유 불가)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- 등록/추가 ----------
+    def register(self, kind: str, handler: Handler, on_failure: Optional[FailureHandler] = None):
+        self._handlers[kind] = (handler, on_failure)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0.0) -> int:
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO jobs (kind, payload, max_attempts, run_at, created_at) VALUES (?,?,?,?,?)",
+            (kind, json.dumps(payload, ensure_ascii=False), max_attempts or self.max_attempts, now + delay, now),
+        )
+        self._wake.set()
+        return cur.lastrowid
+
+    # ---------- 실행 ----------
+    def _claim(self) -> Tuple[Optional[Tuple[int, str, Dict[str, Any], int, int, str]], List[Tuple[int, str, Dict[str, Any], str]]]:
+        """
+        실행 가능한 가장 오래된 작업 하나를 running으로 바꾸고 반환 (여러 워커/프로세스 간 원자적)
+        locked_by에는 이번 점유 토큰을 기록 → 리스가 지나 다른 워커가 다시 가져가면 토큰이 바뀜
+        리스가 지났는데 시도를 다 쓴 작업(실행 중 워커가 죽음: OOM 등)은 다시 돌리지 않고 같은 트랜잭션에서 failed 처리
+        반환: (점유한 작업 또는 None, 이번에 failed로 바꾼 [(id, kind, payload, error)])
+        """
+        now = time.time()
+        token = f"{self.worker_id}:{uuid.uuid4().hex[:8]}"   # 같은 프로세스의 워커 스레드끼리도 구분
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = []
+            for job_id, kind, payload, attempts in conn.execute(
+                "SELECT id, kind, payload, attempts FROM jobs"
+                " WHERE status='running' AND started_at<? AND attempts>=max_attempts",
+                (now - self.lease,),
+            ).fetchall():
+                err = f"리스 만료: 실행 중 워커가 중단됨 ({attempts}회 시도)"
+                conn.execute(
+                    "UPDATE jobs SET status='failed', finished_at=?, last_error=?, locked_by=NULL WHERE id=?",
+                    (now, err, job_id),
+                )
+                expired.append((job_id, kind, json.loads(payload), err))
+            row = conn.execute(
+                "SELECT id, kind, payload, attempts, max_attempts FROM jobs"
+                " WHERE (status='queued' AND run_at<=?) OR (status='running' AND started_at<?)"
+                " ORDER BY run_at LIMIT 1",
+                (now, now - self.lease),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status='running', attempts=attempts+1, started_at=?, locked_by=? WHERE id=?",
+                    (now, token, row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None, expired
+        job_id, kind, payload, attempts, max_attempts = row
+        return (job_id, kind, json.loads(payload), attempts + 1, max_attempts, token), expired
+
+    def _finish(self, job_id: int, token: str, sql: str, params: tuple) -> bool:
+        """아직 이 워커가 점유 중일 때만 결과 기록. 리스를 잃었으면 False (새 점유자의 결과를 덮어쓰지 않음)"""
+        cur = self._conn().execute(f"{sql} WHERE id=? AND locked_by=?", (*params, job_id, token))
+        return cur.rowcount == 1
+
+    def run_once(self) -> bool:
+        """작업 하나 실행. 실행할 작업이 없으면 False"""
+        job, expired = self._claim()
+        for job_id, kind, payload, err in expired:
+            print(f"❌ 작업 {kind}#{job_id} 최종 실패: {err}")
+            self._on_failure(kind, job_id, payload, err)
+        if job is None:
+            return bool(expired)
+        job_id, kind, payload, attempt, max_attempts, token = job
+        handler, _ = self._handlers.get(kind, (None, None))
+        try:
+            if handler is None:
+                raise RuntimeError(f"등록되지 않은 작업 종류: {kind}")
+            handler(payload)
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+            retry = attempt < max_attempts and handler is not None
+            if retry:
+                delay = self.retry_base * (2 ** (attempt - 1))
+                kept = self._finish(job_id, token, "UPDATE jobs SET status='queued', run_at=?, last_error=?, locked_by=NULL",
+                                    (time.time() + delay, err))
+            else:
+                kept = self._finish(job_id, token, "UPDATE jobs SET status='failed', finished_at=?, last_error=?",
+                                    (time.time(), err))
+            if not kept:
+                print(f"⚠️ 작업 {kind}#{job_id} 실패했지만 리스 만료로 다른 워커가 다시 가져감 → 결과 버림: {err}")
+            elif retry:
+                print(f"⚠️ 작업 {kind}#{job_id} 실패 ({attempt}/{max_attempts}), {delay:.1f}초 후 재시도: {err}")
+            else:
+                print(f"❌ 작업 {kind}#{job_id} 최종 실패: {err}")
+                self._on_failure(kind, job_id, payload, err)
+        else:
+            if not self._finish(job_id, token, "UPDATE jobs SET status='done', finished_at=?, last_error=NULL", (time.time(),)):
+                print(f"⚠️ 작업 {kind}#{job_id} 완료했지만 리스 만료로 다른 워커가 다시 가져감 → 결과 기록 안 함")
+        return True
+
+    def _on_failure(self, kind: str, job_id: int, payload: Dict[str, Any], err: str):
+        _, on_failure = self._handlers.get(kind, (None, None))
+        if on_failure:
+            try:
+                on_failure(payload, err)
+            except Exception as fe:
+                print(f"❌ 작업 {kind}#{job_id} 실패 처리 오류: {fe}")
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        실행 가능한 작업을 이 스레드에서 처리하면서 대기/실행 중인 작업이 모두 끝날 때까지 기다림 (테스트/CLI용).
+        다른 워커가 실행 중인 작업도 끝나야 True. 시간 내 못 끝나면 False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            if self.run_once():
+                continue
+            depth = self.stats()["depth"]
+            if depth["queued"] == 0 and depth["running"] == 0:
+                return True
+            time.sleep(min(JOB_POLL_SEC, 0.1))   # 재시도 대기 중이거나 다른 워커가 실행 중인 작업만 남음
+        return False
+
+    def _work_loop(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                print(f"❌ 작업 워커 오류: {e}")
+            self._wake.wait(JOB_POLL_SEC)
+
+    def start_workers(self, n: int = 1):
+        """프로세스 내 워커 스레드 시작 (이미 떠 있으면 그대로)"""
+        with self._lock:
+            self._workers = [t for t in self._workers if t.is_alive()]
+            for i in range(len(self._workers), n):
+                t = threading.Thread(target=self._work_loop, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def stop_workers(self):
+        self._stop.set()
+        self._wake.set()
+
+    # ---------- 지표 ----------
+    def stats(self, window: int = 200) -> Dict[str, Any]:
+        """상태별 건수(depth), 가장 오래 기다린 작업 나이, 최근 완료 작업의 대기/처리/전체 지연(ms)"""
+        now = time.time()
+        conn = self._conn()
+        depth = {s: 0 for s in ("queued", "running", "done", "failed")}
+        for status, n in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            depth[status] = n
+        oldest = conn.execute("SELECT MIN(created_at) FROM jobs WHERE status IN ('queued','running')").fetchone()[0]
+        rows = conn.execute(
+            "SELECT started_at - created_at, finished_at - started_at, finished_at - created_at FROM jobs"
+            " WHERE status='done' ORDER BY finished_at DESC LIMIT ?", (window,)
+        ).fetchall()
+        retried = conn.execute("SELECT COUNT(*) FROM jobs WHERE attempts > 1").fetchone()[0]
+        return {
+            "depth": depth,
+            "oldest_pending_sec": round(now - oldest, 3) if oldest else 0.0,
+            "retried": retried,
+            "latency_ms": {
+                name: _percentiles([r[i] for r in rows])
+                for i, name in enumerate(("wait", "run", "total"))
+            },
+            "workers": sum(t.is_alive() for t in self._workers),
+        }
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    data = sorted(v * 1000 for v in values if v is not None)
+    if not data:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    pick = lambda p: data[min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))]
+    return {"n": len(data), "p50": round(pick(50), 1), "p95": round(pick(95), 1), "max": round(data[-1], 1)}
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+def get_queue() -> JobQueue:
+    """프로세스 공용 큐"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("worker", "stats"):
+        print("usage: python -m mypages.utils_jobs worker [--threads N] | stats")
+        sys.exit(1)
+    if sys.argv[1] == "stats":
+        print(json.dumps(get_queue().stats(), ensure_ascii=False, indent=2))
+        sys.exit(0)
+    # 핸들러는 db 모듈이 import 시 등록 (워커 스레드는 여기서만 띄움)
+    import db  # noqa: F401
+    threads = int(sys.argv[sys.argv.index("--threads") + 1]) if "--threads" in sys.argv else 1
+    q = get_queue()
+    q.start_workers(threads)
+    print(f"작업 워커 시작: {q.path} (threads={threads})")
+    try:
+        while True:
+            time.sleep(30)
+            print(json.dumps(q.stats()["depth"], ensure_ascii=False))
+    except KeyboardInterrupt:
+        q.stop_workers()
@@ -0,0 +1,301 @@
+# mypages/utils_knowledge.py
+"""
+사내 지식 로컬 검색 (웹 검색/LLM 전에 먼저 확인)
+- 자료: templates.guide_md (문서 종류별 가이드) + 승인완료된 approvals.confirm_text
+- 문단 단위 passage로 나눠 메모리 BM25 인덱스 구성, 한글은 글자 2-gram으로 토큰화 (조사/어미가 붙어도 매칭)
+- 증분 갱신: 가이드는 내용 해시가 바뀐 종류만 다시 색인, 승인 문서는 마지막 decided_at 이후 건만 추가
+  갱신은 백그라운드 스레드에서 (조회는 기다리지 않고 지금 인덱스로 답함, 처음 한 번만 짧게 기다림)
+- 승인 문서 문단은 그 문서의 기안자/결재자에게만 보임 (lookup(viewer_id=...), viewer가 없으면 가이드만)
+- 점수는 질의어가 모두 한 번씩 나오는 문단의 점수 대비 비율(0~1)로 정규화 → KNOWLEDGE_MIN_SCORE 이상이면 바로 답변
+"""
+import re, math, time, hashlib, threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mypages.utils_config import secret, secret_flag
+
+KNOWLEDGE_ENABLED = secret_flag("KNOWLEDGE_ENABLED", "true")
+KNOWLEDGE_MIN_SCORE = float(secret("KNOWLEDGE_MIN_SCORE", "0.6"))
+KNOWLEDGE_REFRESH_SEC = float(secret("KNOWLEDGE_REFRESH_SEC", "300"))
+KNOWLEDGE_FIRST_BUILD_WAIT_SEC = float(secret("KNOWLEDGE_FIRST_BUILD_WAIT_SEC", "0.5"))   # 첫 색인만 이만큼 기다림
+PASSAGE_MAX_CHARS = 500
+BM25_K1, BM25_B = 1.2, 0.75
+
+# ------------------------------
+# 0) 토큰화
+# ------------------------------
+_HANGUL_WORD = re.compile(r"[가-힣]+")
+_TOKEN_RX = re.compile(r"[가-힣]+|[a-z0-9]+(?:\.[0-9]+)?")
+# 단어 끝 조사/어미 (긴 것부터). 3글자 이상 단어에서만 떼어냄
+_JOSA = re.compile(r"(으로|에서|에게|까지|부터|이나|이랑|하고|인가요|인가|나요|는데|은|는|이|가|을|를|에|의|로|도|만|야|요|해)$")
+# 질문에 흔한 말 (검색어가 아님)
+_QUESTION_NOISE = re.compile(r"(얼마야|얼마예요|얼마인가요|뭐야|뭘|뭐가|무엇을|어떻게|써야\s*해|해야\s*해|알려줘|알려주세요|궁금해|있어|있나요|되나요)")
+
+def tokenize(text: str) -> List[str]:
+    t = _QUESTION_NOISE.sub(" ", (text or "").lower())
+    tokens: List[str] = []
+    for w in _TOKEN_RX.findall(t):
+        if not _HANGUL_WORD.fullmatch(w):
+            tokens.append(w)
+            continue
+        if len(w) >= 3:
+            w = _JOSA.sub("", w) or w
+        if len(w) == 1:
+            tokens.append(w)
+        else:
+            tokens.extend(w[i:i + 2] for i in range(len(w) - 1))
+    return tokens
+
+# ------------------------------
+# 1) 문단 나누기
+# ------------------------------
+def split_passages(text: str) -> List[str]:
+    """마크다운 제목/빈 줄 기준으로 문단 분리. 제목은 아래 문단 앞에 붙여 문맥 유지, 긴 문단은 줄 단위로 자름"""
+    out: List[str] = []
+    heading = ""
+    for block in re.split(r"\n\s*\n|\n(?=#)", (text or "").strip()):
+        block = block.strip()
+        if not block:
+            continue
+        lines = block.splitlines()
+        if lines[0].lstrip().startswith("#"):
+            heading = lines[0].lstrip("# ").strip()
+            lines = lines[1:]
+            if not lines:
+                continue
+        chunk = ""
+        for line in lines:
+            if chunk and len(chunk) + len(line) > PASSAGE_MAX_CHARS:
+                out.append(f"{heading}: {chunk}" if heading else chunk)
+                chunk = ""
+            chunk = f"{chunk}\n{line}" if chunk else line
+        if chunk:
+            out.append(f"{heading}: {chunk}" if heading else chunk)
+    return out
+
+# ------------------------------
+# 2) BM25 인덱스 (추가/삭제 가능)
+# ------------------------------
+class KnowledgeIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()               # 갱신은 한 번에 하나 (검색은 막지 않음)
+        self.passages: Dict[str, Dict[str, Any]] = {}      # pid → {text, source, doc_type, title}
+        self._tf: Dict[str, Counter] = {}
+        self._len: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}     # term → {pid: tf}
+        self._total_len = 0
+        self._template_hash: Dict[str, str] = {}
+        self._approvals_since: Optional[str] = None
+        self._refreshed_at = 0.0
+        self._stats = {"queries": 0, "answered": 0, "refreshes": 0, "refresh_ms": 0.0}
+
+    # ---------- 색인 ----------
+    def add(self, pid: str, text: str, **meta):
+        with self._lock:
+            self.remove(pid)
+            tf = Counter(tokenize(text))
+            if not tf:
+                return
+            self.passages[pid] = {"text": text, **meta}
+            self._tf[pid] = tf
+            self._len[pid] = sum(tf.values())
+            self._total_len += self._len[pid]
+            for term, n in tf.items():
+                self._postings.setdefault(term, {})[pid] = n
+
+    def remove(self, pid: str):
+        with self._lock:
+            tf = self._tf.pop(pid, None)
+            if tf is None:
+                return
+            self.passages.pop(pid, None)
+            self._total_len -= self._len.pop(pid)
+            for term in tf:
+                posting = self._postings.get(term)
+                if posting is not None:
+                    posting.pop(pid, None)
+                    if not posting:
+                        del self._postings[term]
+
+    def remove_prefix(self, prefix: str):
+        with self._lock:
+            for pid in [p for p in self._tf if p.startswith(prefix)]:
+                self.remove(pid)
+
+    # ---------- 검색 ----------
+    def _idf(self, df: int) -> float:
+        n = len(self._tf)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, top_k: int = 3, doc_type: Optional[str] = None,
+               viewer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        [{pid, score(0~1), text, source, doc_type, title, ...}] 점수 내림차순. doc_type이 같으면 가산
+        viewers가 있는 문단(승인 문서)은 viewer_id가 그 안에 있을 때만 결과에 포함
+        """
+        q_terms = set(tokenize(query))
+        with self._lock:
+            self._stats["queries"] += 1
+            if not q_terms or not self._tf:
+                return []
+            avgdl = self._total_len / len(self._tf)
+            scores: Dict[str, float] = {}
+            bound = 0.0
+            for term in q_terms:
+                posting = self._postings.get(term)
+                # 기준 점수 = 모든 질의어가 평균 길이 문단에 한 번씩 나올 때 (색인에 없는 질의어도 포함 → 대부분 안 맞으면 낮아짐)
+                idf = self._idf(len(posting) if posting else 1)
+                bound += idf
+                if not posting:
+                    continue
+                for pid, tf in posting.items():
+                    denom = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._len[pid] / avgdl)
+                    scores[pid] = scores.get(pid, 0.0) + idf * tf * (BM25_K1 + 1) / denom
+            out = []
+            for pid, sc in scores.items():
+                meta = self.passages[pid]
+                viewers = meta.get("viewers")
+                if viewers is not None and viewer_id not in viewers:
+                    continue
+                norm = sc / bound if bound else 0.0
+                if doc_type and meta.get("doc_type") == doc_type:
+                    norm *= 1.15
+                out.append({"pid": pid, "score": round(min(norm, 1.0), 3), **meta})
+        out.sort(key=lambda h: -h["score"])
+        return out[:top_k]
+
+    # ---------- 갱신 ----------
+    @property
+    def built(self) -> bool:
+        return self._stats["refreshes"] > 0
+
+    def is_due(self) -> bool:
+        return time.monotonic() - self._refreshed_at >= KNOWLEDGE_REFRESH_SEC
+
+    def refresh(self, templates_loader: Callable[[], List[Dict[str, Any]]],
+                approvals_loader: Callable[[Optional[str]], List[Dict[str, Any]]], force: bool = False) -> bool:
+        """
+        KNOWLEDGE_REFRESH_SEC 지났을 때만 증분 갱신. 갱신했으면 True
+        DB 조회는 인덱스 잠금 밖에서 → 갱신 중에도 검색은 기존 인덱스로 바로 답함
+        """
+        if not force and not self.is_due():
+            return False
+        with self._refresh_lock:
+            if not force and not self.is_due():
+                return False
+            t0 = time.perf_counter()
+            templates = approvals = None
+            try:
+                templates = templates_loader() or []
+            except Exception as e:
+                print(f"⚠️ 지식 인덱스(가이드) 갱신 실패: {e}")
+            try:
+                approvals = approvals_loader(self._approvals_since) or []
+            except Exception as e:
+                print(f"⚠️ 지식 인덱스(승인 문서) 갱신 실패: {e}")
+            with self._lock:
+                if templates is not None:
+                    self._refresh_templates(templates)
+                if approvals is not None:
+                    self._refresh_approvals(approvals)
+                self._refreshed_at = time.monotonic()
+                self._stats["refreshes"] += 1
+                self._stats["refresh_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            return True
+
+    def _refresh_templates(self, templates: List[Dict[str, Any]]):
+        seen = set()
+        for t in templates:
+            doc_type = t.get("type") or ""
+            guide = t.get("guide_md") or ""
+            seen.add(doc_type)
+            digest = hashlib.sha1(guide.encode("utf-8")).hexdigest()
+            if self._template_hash.get(doc_type) == digest:
+                continue
+            self.remove_prefix(f"tpl:{doc_type}:")
+            for i, passage in enumerate(split_passages(guide)):
+                self.add(f"tpl:{doc_type}:{i}", passage, source="guide", doc_type=doc_type, title=f"{doc_type} 가이드")
+            self._template_hash[doc_type] = digest
+        for doc_type in [d for d in self._template_hash if d not in seen]:
+            self.remove_prefix(f"tpl:{doc_type}:")
+            del self._template_hash[doc_type]
+
+    def _refresh_approvals(self, rows: List[Dict[str, Any]]):
+        for r in rows:
+            aid = r.get("approval_id")
+            if not aid or not r.get("confirm_text"):
+                continue
+            self.remove_prefix(f"apr:{aid}:")
+            # 다른 직원의 결재 문서가 보이지 않도록 기안자/결재자만 열람 가능으로 색인
+            viewers = tuple(v for v in (r.get("creator_id"), r.get("assignee")) if v)
+            for i, passage in enumerate(split_passages(r["confirm_text"])):
+                self.add(f"apr:{aid}:{i}", passage, source="approval", doc_type=None,
+                         title=r.get("title") or "승인 문서", viewers=viewers)
+            decided = r.get("decided_at")
+            if decided and (self._approvals_since is None or decided > self._approvals_since):
+                self._approvals_since = decided
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out.update({"passages": len(self._tf), "terms": len(self._postings), "approvals_since": self._approvals_since,
+                    "refreshing": self._refresh_lock.locked()})
+        out["answer_rate"] = round(out["answered"] / out["queries"], 3) if out["queries"] else 0.0
+        return out
+
+# ------------------------------
+# 3) 앱 연동
+# ------------------------------
+_index = KnowledgeIndex()
+_refresh_thread: Optional[threading.Thread] = None
+_refresh_thread_lock = threading.Lock()
+
+def _refresh():
+    try:
+        import db   # 첫 갱신 때 로드 (Supabase 클라이언트는 db가 지연 생성)
+        _index.refresh(db.get_templates, db.get_approved_confirm_texts)
+    except Exception as e:
+        print(f"⚠️ 지식 인덱스 갱신 실패: {e}")
+
+def refresh_in_background(wait: float = 0.0):
+    """갱신 주기가 지났으면 백그라운드 스레드로 갱신 (이미 도는 중이면 새로 띄우지 않음). wait초까지만 기다림"""
+    global _refresh_thread
+    if not _index.is_due():
+        return
+    with _refresh_thread_lock:
+        if _refresh_thread is None or not _refresh_thread.is_alive():
+            _refresh_thread = threading.Thread(target=_refresh, name="knowledge-refresh", daemon=True)
+            _refresh_thread.start()
+        thread = _refresh_thread
+    if wait > 0:
+        thread.join(wait)
+
+def lookup(question: str, doc_type: Optional[str] = None, min_score: Optional[float] = None,
+           viewer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    점수가 기준 이상인 사내 자료 passage 목록 (없으면 [] → 웹 검색/LLM으로)
+    viewer_id: 질문한 직원. 본인이 기안/결재한 승인 문서만 포함 (None이면 가이드만)
+    """
+    if not KNOWLEDGE_ENABLED:
+        return []
+    refresh_in_background(wait=0.0 if _index.built else KNOWLEDGE_FIRST_BUILD_WAIT_SEC)
+    threshold = KNOWLEDGE_MIN_SCORE if min_score is None else min_score
+    hits = [h for h in _index.search(question, top_k=3, doc_type=doc_type, viewer_id=viewer_id) if h["score"] >= threshold]
+    if hits:
+        with _index._lock:
+            _index._stats["answered"] += 1
+    return hits
+
+def render_answer(hits: List[Dict[str, Any]]) -> str:
+    lines = []
+    for h in hits[:2]:
+        label = f"{h['title']}" if h["source"] == "guide" else f"승인 문서: {h['title']}"
+        lines.append(f"• [{label}]\n  {h['text'].strip()}")
+    return "사내 자료에서 찾은 내용:\n" + "\n\n".join(lines)
+
+def get_stats() -> Dict[str, Any]:
+    return _index.stats()
+
+def get_index() -> KnowledgeIndex:
+    return _index
@@ -1,5 +1,6 @@
-import json, time, math
-from typing import Any, Dict, Tuple
+import json, time, math, threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
 SAFE_JSON_PREFIXES = ["```json", "```", "\n", "JSON:", "Output:", "응답:"]
 
@@ -14,13 +15,227 @@ def strip_json_fence(s: str) -> str:
         t = t[:-3].strip()
     return t
 
-def try_parse_json(s: str) -> Tuple[bool, Any]:
-    t = strip_json_fence(s)
+def try_parse_json(s: str, schema: Optional[Dict[str, Any]] = None, op: str = "default") -> Tuple[bool, Any]:
+    """LLM 응답에서 JSON 객체 추출 (앞뒤 설명문/코드펜스/흔한 문법 오류 허용). (성공 여부, 객체)"""
+    if not isinstance(s, str):
+        return False, None
+    ex = JsonExtractor(schema=schema, op=op)
+    ex.feed(s)
+    return ex.close()
+
+# ------------------------------
+# JSON 추출 엔진 (점진 스캔 + 복구 + 스키마 검증)
+# ------------------------------
+# 스키마: {"키": 타입 또는 (타입, ...)} — 필수 키와 값 타입만 검사. object는 아무 타입
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_json_stats: Dict[str, Dict[str, Any]] = {}
+_json_stats_lock = threading.Lock()
+
+def _record_json(op: str, outcome: str, repairs: List[str]):
+    with _json_stats_lock:
+        s = _json_stats.setdefault(op, {"calls": 0, "clean": 0, "repaired": 0, "failed": 0, "schema_failed": 0, "repairs": Counter()})
+        s["calls"] += 1
+        s[outcome] += 1
+        s["repairs"].update(repairs)
+
+def get_json_stats() -> Dict[str, Any]:
+    """op별 JSON 추출 결과: clean(그대로 파싱) / repaired(복구 후 성공) / failed / schema_failed + 복구 종류"""
+    with _json_stats_lock:
+        out = {op: {**s, "repairs": dict(s["repairs"])} for op, s in _json_stats.items()}
+    for s in out.values():
+        s["repair_rate"] = round(s["repaired"] / s["calls"], 3) if s["calls"] else 0.0
+        s["failure_rate"] = round((s["failed"] + s["schema_failed"]) / s["calls"], 3) if s["calls"] else 0.0
+    return out
+
+def matches_schema(obj: Any, schema: Optional[Dict[str, Any]]) -> bool:
+    if not isinstance(obj, dict):
+        return False
+    if not schema:
+        return True
+    obj = normalize_keys(obj)
+    return all(k in obj and (t is object or isinstance(obj[k], t)) for k, t in schema.items())
+
+def _normalize_fragment(frag: str) -> Tuple[str, List[str]]:
+    """작은따옴표 문자열 → 큰따옴표, True/False/None → JSON 리터럴, 닫는 괄호 앞 쉼표 제거"""
+    out: List[str] = []
+    repairs: List[str] = []
+    i, n = 0, len(frag)
+    while i < n:
+        c = frag[i]
+        if c in "\"'":
+            # 문자열 하나를 통째로 복사 (작은따옴표면 큰따옴표로 바꿔 씀)
+            j, buf = i + 1, []
+            while j < n and frag[j] != c:
+                if frag[j] == "\\" and j + 1 < n:
+                    nxt = frag[j + 1]
+                    buf.append(nxt if (c == "'" and nxt == "'") else frag[j:j + 2])
+                    j += 2
+                    continue
+                buf.append('\\"' if (c == "'" and frag[j] == '"') else frag[j])
+                j += 1
+            if c == "'":
+                repairs.append("single_quotes")
+            out.append('"' + "".join(buf) + ('"' if j < n else ""))
+            i = j + 1
+            continue
+        if c.isalpha():
+            j = i
+            while j < n and (frag[j].isalnum() or frag[j] == "_"):
+                j += 1
+            word = frag[i:j]
+            if word in _PY_LITERALS:
+                out.append(_PY_LITERALS[word])
+                repairs.append("python_literals")
+            else:
+                out.append(word)
+            i = j
+            continue
+        if c in "}]":
+            k = len(out) - 1
+            while k >= 0 and out[k].isspace():
+                k -= 1
+            if k >= 0 and out[k] == ",":
+                del out[k]
+                repairs.append("trailing_commas")
+        out.append(c)
+        i += 1
+    return "".join(out), sorted(set(repairs))
+
+def _close_truncated(s: str) -> Tuple[str, List[int]]:
+    """잘린 JSON 끝에 필요한 따옴표/괄호를 붙임. (닫은 문자열, 잘라낼 수 있는 위치들)"""
+    stack: List[str] = []
+    cuts: List[int] = []
+    in_str, esc = False, False
+    for i, c in enumerate(s):
+        if in_str:
+            if esc:
+                esc = False
+            elif c == "\\":
+                esc = True
+            elif c == '"':
+                in_str = False
+            continue
+        if c == '"':
+            in_str = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+            cuts.append(i + 1)
+        elif c in "}]" and stack:
+            stack.pop()
+        elif c == ",":
+            cuts.append(i)
+    tail = s + ('"' if in_str else "")
+    tail = tail.rstrip()
+    if tail.endswith(","):
+        tail = tail[:-1]
+    return tail + "".join(reversed(stack)), cuts
+
+def repair_json(frag: str, truncated: bool = False) -> Tuple[bool, Any, List[str]]:
+    """조각을 복구해서 파싱. (성공 여부, 객체, 적용한 복구 목록)"""
     try:
-        return True, json.loads(t)
-    except Exception:
+        return True, json.loads(frag), []
+    except ValueError:
+        pass
+    fixed, repairs = _normalize_fragment(frag)
+    if not truncated:
+        try:
+            return True, json.loads(fixed), repairs
+        except ValueError:
+            return False, None, repairs
+    # 잘린 응답: 닫는 괄호를 붙여보고, 안 되면 마지막 쉼표/여는 괄호 위치까지 잘라가며 재시도
+    repairs = repairs + ["truncated"]
+    for _ in range(64):
+        closed, cuts = _close_truncated(fixed)
+        try:
+            return True, json.loads(closed), repairs
+        except ValueError:
+            cuts = [c for c in cuts if c < len(fixed)]
+            if not cuts:
+                break
+            fixed = fixed[:cuts[-1]]
+    return False, None, repairs
+
+class JsonExtractor:
+    """
+    스트림/전체 텍스트에서 첫 번째 '균형 잡힌' JSON 객체를 찾는 점진 스캐너
+    - feed(chunk)로 조각을 넣으면 이어서 스캔 (앞서 본 글자는 다시 보지 않음)
+    - 객체가 닫히면 즉시 파싱/복구/스키마 검증 → 실패하면 다음 '{'부터 계속
+    - close()에서 끝까지 닫히지 않은 객체는 잘린 응답으로 보고 복구 시도
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Any]] = None, op: str = "default"):
+        self.schema = schema
+        self.op = op
+        self.result: Any = None
+        self.done = False
+        self._buf: List[str] = []
+        self._text = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._esc = False
+        self._first_parsed: Any = None
+        self._schema_miss = False
+
+    def feed(self, chunk: str) -> bool:
+        """조각 추가. 조건에 맞는 객체를 찾았으면 True"""
+        if self.done or not chunk:
+            return self.done
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self.done:
+            c = text[self._pos]
+            if self._start is None:
+                if c == "{":
+                    self._start, self._depth = self._pos, 1
+            elif self._quote:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == self._quote:
+                    self._quote = None
+            elif c in "\"'":
+                self._quote = c
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._try(text[self._start:self._pos + 1], truncated=False)
+                    if not self.done:
+                        # 이 객체는 버리고 그 안쪽의 다음 '{'부터 다시 찾기
+                        self._pos = self._start
+                        self._start = None
+            self._pos += 1
+        return self.done
+
+    def close(self) -> Tuple[bool, Any]:
+        if not self.done and self._start is not None:
+            self._try(self._text[self._start:], truncated=True)
+        if self.done:
+            return True, self.result
+        _record_json(self.op, "schema_failed" if self._schema_miss else "failed", [])
         return False, None
 
+    def _try(self, frag: str, truncated: bool):
+        ok, obj, repairs = repair_json(frag, truncated=truncated)
+        if not ok:
+            return
+        if not matches_schema(obj, self.schema):
+            self._schema_miss = True
+            return
+        head = self._text[:self._start or 0].strip()
+        tail = "" if truncated else self._text[self._pos + 1:].strip()
+        if head:
+            repairs = repairs + (["fence"] if head in ("```json", "```") else ["preamble"])
+        if tail and tail != "```":
+            repairs = repairs + ["trailing_text"]
+        self.result, self.done = obj, True
+        _record_json(self.op, "repaired" if repairs else "clean", repairs)
+
 def backoff_sleep(attempt: int, base: float = 0.6, cap: float = 8.0):
     # 지수 백오프 + 가드
     time.sleep(min(cap, base * (2 ** attempt)))
@@ -0,0 +1,132 @@
+# mypages/utils_messages.py
+"""
+반려 안내문 / 후속조치 알림 — 템플릿으로 즉시 생성 + (선택) LLM 다듬기
+- 템플릿: templates.message_templates (jsonb, 문서 종류별) → 없으면 아래 기본값
+  예) {"rejection_note": "{creator_name}님, ...{memo}...", "next_step_alert": "..."}
+  컬럼 추가: sql/templates_message_templates.sql (컬럼이 없거나 비어 있으면 기본값만 사용)
+- 사용 가능한 자리표시자: {creator_name} {doc_title} {doc_type} {memo} {due_date}
+- 다듬기: 백그라운드 스레드에서 LLM 호출 → 기한(MESSAGE_POLISH_DEADLINE_SEC) 안에 끝났을 때만 apply 콜백으로 교체
+"""
+import time, string, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from mypages.utils_cache import TTLCache
+from mypages.utils_config import secret, secret_flag
+
+MESSAGE_POLISH_ENABLED = secret_flag("MESSAGE_POLISH_ENABLED", "true")
+MESSAGE_POLISH_DEADLINE_SEC = float(secret("MESSAGE_POLISH_DEADLINE_SEC", "20"))
+MESSAGE_TEMPLATE_TTL_SEC = int(secret("MESSAGE_TEMPLATE_TTL_SEC", "60"))
+
+DEFAULT_MESSAGE_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "*": {
+        "rejection_note": (
+            "{creator_name}님, 요청하신 '{doc_title}' 건은 다음 사유로 반려되었습니다: {memo} "
+            "내용을 보완하여 다시 제출해 주세요."
+        ),
+        "next_step_alert": "'{doc_title}' 요청을 승인했습니다. {due_date}까지 후속 조치를 진행해 주세요.",
+    },
+    "품의": {"next_step_alert": "'{doc_title}' 품의를 승인했습니다. {due_date}까지 집행 및 증빙 제출을 진행해 주세요."},
+    "연차": {"next_step_alert": "{creator_name}님의 연차 신청을 승인했습니다. 인사팀 근태 기록에 반영해 주세요."},
+    "출장": {"next_step_alert": "{creator_name}님의 출장을 승인했습니다. {due_date}까지 출장비 지급 및 정산 준비를 진행해 주세요."},
+}
+
+_stats = {"rendered": 0, "polish_started": 0, "polish_applied": 0, "polish_late": 0, "polish_failed": 0}
+_stats_lock = threading.Lock()
+
+class _Defaults(dict):
+    def __missing__(self, key):
+        return "미정" if key == "due_date" else ""
+
+# ------------------------------
+# 1) 템플릿 렌더링 (즉시)
+# ------------------------------
+_template_cache = TTLCache("message_templates", max_entries=64)
+_formatter = string.Formatter()
+
+def _format_override(template: str, values: Dict[str, str]) -> str:
+    """DB 템플릿은 {이름} 형태만 허용 ({x.attr}/{x[0]}/{0}은 값 대신 내부 표현이 새어 나가므로 오류로 처리)"""
+    for _, field, _, _ in _formatter.parse(template):
+        if field is not None and not field.isidentifier():
+            raise ValueError(f"허용되지 않는 자리표시자: {{{field}}}")
+    return template.format_map(values)
+
+def _load_overrides(doc_type: str, loader: Optional[Callable[[str], Optional[Dict[str, Any]]]]) -> Dict[str, str]:
+    if not doc_type or loader is None:
+        return {}
+    hit, cached = _template_cache.get(doc_type)
+    if hit:
+        return cached
+    try:
+        row = loader(doc_type) or {}
+        # message_templates 컬럼이 아직 없는 DB(마이그레이션 전)면 키 자체가 없음 → 기본 템플릿
+        overrides = row.get("message_templates") or {}
+        overrides = {k: v for k, v in overrides.items() if isinstance(v, str)} if isinstance(overrides, dict) else {}
+    except Exception as e:
+        print(f"⚠️ 메시지 템플릿 조회 실패({doc_type}): {e}")
+        overrides = {}
+    _template_cache.set(doc_type, overrides, MESSAGE_TEMPLATE_TTL_SEC)
+    return overrides
+
+def render_message(kind: str, doc_type: Optional[str], context: Dict[str, Any],
+                   loader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None) -> str:
+    """kind('rejection_note'|'next_step_alert') 메시지를 템플릿으로 생성. 우선순위: DB 템플릿 > 종류별 기본 > 공통 기본"""
+    values = _Defaults({k: str(v).strip() for k, v in context.items() if v is not None and str(v).strip()})
+    values.setdefault("doc_type", doc_type or "")
+    text = None
+    override = _load_overrides(doc_type or "", loader).get(kind)
+    if override:
+        try:
+            text = _format_override(override, values)
+        except Exception as e:
+            # DB 템플릿 오류 (중괄호 짝, {x.attr}/{x[0]} 같은 접근 등) → 기본 템플릿으로
+            print(f"⚠️ 메시지 템플릿 형식 오류({doc_type}/{kind}): {e}")
+    if text is None:
+        template = DEFAULT_MESSAGE_TEMPLATES.get(doc_type or "", {}).get(kind) or DEFAULT_MESSAGE_TEMPLATES["*"][kind]
+        text = template.format_map(values)
+    _count("rendered")
+    return " ".join(text.split())
+
+# ------------------------------
+# 2) 백그라운드 LLM 다듬기 (기한 내 완료 시에만 교체)
+# ------------------------------
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="message-polish")
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+def polish_in_background(generate: Callable[[], str], apply: Callable[[str], Any],
+                         deadline_sec: Optional[float] = None):
+    """generate()로 다듬은 문구를 만들고, 기한 안에 끝나면 apply(문구). 실패/지연이면 템플릿 문구 유지"""
+    if not MESSAGE_POLISH_ENABLED:
+        return None
+    deadline = MESSAGE_POLISH_DEADLINE_SEC if deadline_sec is None else deadline_sec
+    started = time.monotonic()
+    _count("polish_started")
+
+    def _run():
+        try:
+            text = (generate() or "").strip()
+        except Exception as e:
+            print(f"⚠️ 메시지 다듬기 실패: {e}")
+            _count("polish_failed")
+            return
+        if not text or text.startswith("오류"):
+            _count("polish_failed")
+            return
+        if time.monotonic() - started > deadline:
+            _count("polish_late")
+            return
+        try:
+            apply(text)
+            _count("polish_applied")
+        except Exception as e:
+            print(f"⚠️ 다듬은 메시지 반영 실패: {e}")
+            _count("polish_failed")
+
+    return _executor.submit(_run)
+
+def get_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return dict(_stats)
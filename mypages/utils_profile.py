@@ -0,0 +1,143 @@
+# mypages/utils_profile.py
+"""
+시작 프로파일 모드 (COLLABNOTE_STARTUP_PROFILE=1)
+- 스크립트 실행 중 새로 import된 모듈을 트리로 기록 (누적/자기 시간 ms)
+- 프로세스 첫 실행은 time-to-first-render(스크립트 시작 → 첫 화면 완료)도 출력
+- 이후 실행에서 새 모듈을 처음 불러오면(예: 대시보드 첫 진입) 그 트리만 출력
+단독 실행: python -m mypages.utils_profile [모듈 ...]   (새 프로세스에서 cold import 비용 측정)
+"""
+import os, sys, time, builtins, importlib, threading
+from typing import Any, List, Optional
+
+STARTUP_PROFILE = os.getenv("COLLABNOTE_STARTUP_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_MIN_MS = float(os.getenv("COLLABNOTE_PROFILE_MIN_MS", "1"))
+
+class _Node:
+    __slots__ = ("name", "total", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0.0
+        self.children: List["_Node"] = []
+
+    @property
+    def self_ms(self) -> float:
+        return self.total - sum(c.total for c in self.children)
+
+class ImportProfiler:
+    """builtins.__import__를 감싸 처음 로드되는 모듈만 중첩 시간으로 기록 (설치한 스레드만)"""
+
+    def __init__(self):
+        self.root = _Node("<run>")
+        self._stack: List[_Node] = [self.root]
+        self._orig = None
+        self._thread_id: Optional[int] = None
+
+    def install(self):
+        if self._orig is None:
+            self._orig = builtins.__import__
+            self._thread_id = threading.get_ident()
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._orig is not None:
+            builtins.__import__ = self._orig
+            self._orig = None
+
+    def new_run(self):
+        # Streamlit은 실행(rerun)마다 다른 스레드에서 스크립트를 돌리므로 기록 대상 스레드도 갱신
+        self.root = _Node("<run>")
+        self._stack = [self.root]
+        self._thread_id = threading.get_ident()
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != self._thread_id or (level == 0 and name in sys.modules):
+            return self._orig(name, globals, locals, fromlist, level)
+        return self._timed(name, lambda: self._orig(name, globals, locals, fromlist, level))
+
+    def import_module(self, name: str):
+        """importlib.import_module은 builtins.__import__를 거치지 않으므로 직접 기록"""
+        if name in sys.modules or threading.get_ident() != self._thread_id:
+            return importlib.import_module(name)
+        return self._timed(name, lambda: importlib.import_module(name))
+
+    def _timed(self, name: str, load):
+        node = _Node(name)
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+        t0 = time.perf_counter()
+        try:
+            return load()
+        finally:
+            node.total = (time.perf_counter() - t0) * 1000
+            self._stack.pop()
+
+    def total_ms(self) -> float:
+        return sum(c.total for c in self.root.children)
+
+    def format_tree(self, min_ms: float = PROFILE_MIN_MS, max_depth: int = 6) -> str:
+        lines: List[str] = []
+
+        def walk(node: _Node, depth: int):
+            for c in sorted(node.children, key=lambda n: n.total, reverse=True):
+                if c.total < min_ms:
+                    continue
+                lines.append(f"{c.total:9.1f} ms {c.self_ms:9.1f} ms  {'  ' * depth}{c.name}")
+                if depth + 1 < max_depth:
+                    walk(c, depth + 1)
+
+        walk(self.root, 0)
+        header = f"{'누적':>12} {'자기':>12}  모듈 (>= {min_ms:g} ms)"
+        return "\n".join([header] + lines) if lines else "(새로 import된 모듈 없음)"
+
+# ------------------------------
+# app.py 연동
+# ------------------------------
+_profiler: Optional[ImportProfiler] = None
+_run_started: Optional[float] = None
+_first_render_done = False
+
+def start():
+    """app.py 맨 위에서 호출. 프로파일 모드가 아니면 아무것도 안 함"""
+    global _profiler, _run_started
+    if not STARTUP_PROFILE:
+        return
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        _profiler.install()
+    _profiler.new_run()
+    _run_started = time.perf_counter()
+
+def import_module(name: str):
+    """페이지 모듈 지연 import (프로파일 모드면 트리에 기록)"""
+    if _profiler is not None:
+        return _profiler.import_module(name)
+    return importlib.import_module(name)
+
+def finish(label: str = ""):
+    """app.py 맨 끝에서 호출 → 첫 렌더 시간 + 이번 실행의 import 트리 출력"""
+    global _first_render_done
+    if _profiler is None or _run_started is None:
+        return
+    elapsed = (time.perf_counter() - _run_started) * 1000
+    imports = _profiler.total_ms()
+    if not _first_render_done:
+        _first_render_done = True
+        print(f"[startup-profile] time-to-first-render{f' ({label})' if label else ''}: {elapsed:.1f} ms (import {imports:.1f} ms)")
+    elif not _profiler.root.children:
+        return
+    else:
+        print(f"[startup-profile] 실행{f' ({label})' if label else ''}: {elapsed:.1f} ms, 새 import {imports:.1f} ms")
+    print(_profiler.format_tree())
+
+
+if __name__ == "__main__":
+    modules = sys.argv[1:] or ["db", "potens_client", "mypages.inbox", "mypages.compose", "mypages.rejected_requests", "mypages.dashboard"]
+    p = ImportProfiler()
+    p.install()
+    t0 = time.perf_counter()
+    for m in modules:
+        p.import_module(m)
+    p.uninstall()
+    print(f"[startup-profile] {', '.join(modules)}: {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(p.format_tree())
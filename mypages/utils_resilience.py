@@ -0,0 +1,455 @@
+# mypages/utils_resilience.py
+import time, heapq, threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+# ------------------------------
+# 0) 지연 시간 추적 (hedge 지연 계산용)
+# ------------------------------
+class LatencyTracker:
+    """최근 N개의 성공 지연(초)을 보관하고 백분위를 계산"""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            data = sorted(self._samples)
+        if not data:
+            return None
+        idx = min(len(data) - 1, max(0, int(round(p / 100.0 * (len(data) - 1)))))
+        return data[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+# ------------------------------
+# 1) 서킷 브레이커
+# ------------------------------
+class CircuitOpenError(RuntimeError):
+    """브레이커가 열려 있어 호출을 즉시 거절함"""
+
+class CircuitBreaker:
+    """
+    closed → (연속 실패 failure_threshold회) → open → (recovery_timeout초 경과) → half_open
+    half_open에서 시험 호출이 성공하면 closed, 실패하면 다시 open
+    before_call()이 돌려준 probe 여부를 record_success/release_probe에 넘김
+    (열리기 전에 시작한 느린 요청이 나중에 성공해도 open/half_open을 닫지 않도록)
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_inflight = 0
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "half_open_probes": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_call(self) -> bool:
+        """호출 전 확인. 열려 있으면 CircuitOpenError. half_open 시험 호출로 허용됐으면 True"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == "open":
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit open")
+            if self._state == "half_open":
+                if self._half_open_inflight >= self.half_open_max_calls:
+                    self._stats["rejected"] += 1
+                    raise CircuitOpenError(f"{self.name} circuit half-open (probe in flight)")
+                self._half_open_inflight += 1
+                self._stats["half_open_probes"] += 1
+                self._stats["calls"] += 1
+                return True
+            self._stats["calls"] += 1
+            return False
+
+    def record_success(self, probe: bool = False):
+        """closed면 연속 실패 초기화, half_open이면 시험 호출(probe)의 성공만 closed로. open이면 무시"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == "closed":
+                self._failures = 0
+            elif self._state == "half_open" and probe:
+                self._failures = 0
+                self._half_open_inflight = 0
+                self._state = "closed"
+
+    def release_probe(self, probe: bool = True):
+        """결과 없이 끝난 호출 (소비자가 중간에 그만둠 등): half-open 시험 슬롯만 반환, 상태는 그대로"""
+        with self._lock:
+            if probe and self._half_open_inflight > 0:
+                self._half_open_inflight -= 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._stats["failures"] += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._half_open_inflight = 0
+
+    def call(self, fn: Callable[..., Any], *args, is_failure: Optional[Callable[[Exception], bool]] = None, **kwargs) -> Any:
+        """fn 호출을 브레이커로 감쌈. is_failure(e)가 False인 예외는 장애로 치지 않음"""
+        probe = self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success(probe)
+            raise
+        self.record_success(probe)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            out = dict(self._stats)
+            out["state"] = self._state
+            out["consecutive_failures"] = self._failures
+        return out
+
+    def _maybe_half_open(self):
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = "half_open"
+            self._half_open_inflight = 0
+
+# ------------------------------
+# 2) 헤지 요청 (느린 응답 대비 중복 요청, 먼저 성공한 쪽 채택)
+# ------------------------------
+class Hedger:
+    """
+    1차 요청이 delay(최근 p95 기반) 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 성공한 결과를 반환.
+    1차가 delay 전에 실패하면 헤지하지 않고 그 예외를 그대로 던짐 (429/4xx 등 재시도 여부는 브레이커/재시도 정책이 판단).
+    둘 다 실패하면 마지막 예외를 다시 던짐.
+    """
+
+    def __init__(self, name: str, percentile: float = 95.0, min_delay: float = 0.5, max_delay: float = 8.0,
+                 initial_delay: float = 3.0, min_samples: int = 20, max_workers: int = 16, enabled: bool = True):
+        self.name = name
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"hedge-{name}")
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedges_fired": 0, "hedges_skipped": 0, "primary_wins": 0, "hedge_wins": 0,
+                       "primary_failed": 0, "both_failed": 0}
+
+    def delay(self) -> float:
+        if len(self.latency) < self.min_samples:
+            return self.initial_delay
+        p = self.latency.percentile(self.percentile) or self.initial_delay
+        return min(self.max_delay, max(self.min_delay, p))
+
+    def call(self, fn: Callable[[], Any], slot: Optional["_HeldSlot"] = None,
+             try_acquire: Optional[Callable[[], Optional[ContextManager]]] = None) -> Any:
+        """
+        slot: 1차 요청용으로 이미 잡아 둔 슬롯. 반환 책임을 넘겨받아 1차 요청이 실제로 끝날 때 반환
+              (헤지가 먼저 이겨 call이 돌아와도 1차가 도는 동안은 슬롯을 계속 점유 → 동시 실행 상한 유지)
+        try_acquire: 헤지 직전에 호출. 2차 요청용 슬롯(컨텍스트 매니저)을 바로 잡아 반환하거나,
+        못 잡으면 None → 헤지를 건너뛰고 1차만 기다림 (레이트 리밋을 헤지가 우회하지 않도록)
+        """
+        self._count("calls")
+        primary_slot = slot.transfer() if slot is not None else nullcontext()
+        if not self.enabled:
+            return self._timed_in(primary_slot, fn)
+
+        primary = self._executor.submit(self._timed_in, primary_slot, fn)
+        done, _ = wait([primary], timeout=self.delay())
+        if primary in done:
+            # 빨리 끝났으면 성공이든 실패든 그대로 (빠른 실패는 느린 게 아니므로 중복 요청 안 함)
+            return self._finish_primary(primary)
+
+        hedge_slot = try_acquire() if try_acquire is not None else nullcontext()
+        if hedge_slot is None:
+            self._count("hedges_skipped")
+            return self._finish_primary(primary)
+
+        self._count("hedges_fired")
+        hedge = self._executor.submit(self._timed_in, hedge_slot, fn)
+        pending = {primary, hedge}
+        last_exc: Optional[BaseException] = None
+        while pending:
+            done_now, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done_now:
+                if fut.exception() is None:
+                    self._count("hedge_wins" if fut is hedge else "primary_wins")
+                    return fut.result()
+                last_exc = fut.exception()
+        self._count("both_failed")
+        raise last_exc
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+        out["current_delay_sec"] = round(self.delay(), 3)
+        p95 = self.latency.percentile(95.0)
+        out["p95_sec"] = round(p95, 3) if p95 is not None else None
+        return out
+
+    def _finish_primary(self, primary: Future) -> Any:
+        try:
+            result = primary.result()
+        except Exception:
+            self._count("primary_failed")
+            raise
+        self._count("primary_wins")
+        return result
+
+    def _timed_in(self, slot: ContextManager, fn: Callable[[], Any]) -> Any:
+        with slot:
+            return self._timed(fn)
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        result = fn()
+        self.latency.add(time.perf_counter() - t0)
+        return result
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+# ------------------------------
+# 3) 토큰 버킷 + 우선순위 스케줄러 (프로세스 공용)
+# ------------------------------
+class PriorityScheduler:
+    """
+    전역 토큰 버킷(rate/burst) + 동시 실행 상한 + 우선순위 대기열.
+    priorities 앞쪽일수록 먼저 나감 (예: interactive가 background보다 먼저).
+    사용: with scheduler.slot("interactive"): ...요청...
+    """
+
+    def __init__(self, name: str, rate_per_sec: float = 5.0, burst: int = 10, max_concurrency: int = 8,
+                 priorities: tuple = ("interactive", "background")):
+        self.name = name
+        self.rate = rate_per_sec
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.priorities = priorities
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._active = 0
+        self._seq = 0
+        self._waiting: list = []   # heap of (rank, seq)
+        self._cond = threading.Condition()
+        self._delays = {p: deque(maxlen=500) for p in priorities}
+        self._stats = {p: {"admitted": 0, "timeouts": 0} for p in priorities}
+        self._throttled = 0
+
+    def slot(self, priority: str = "interactive", timeout: Optional[float] = None):
+        return _SchedulerSlot(self, priority, timeout)
+
+    def acquire(self, priority: str = "interactive", timeout: Optional[float] = None) -> "_HeldSlot":
+        """슬롯을 기다려 잡은 뒤 반환 (with 종료 시 반환). 잡은 스레드와 다른 스레드에서 반환해야 할 때 (헤지 1차 요청 등)"""
+        self._acquire(priority, timeout)
+        return _HeldSlot(self)
+
+    def try_slot(self, priority: str = "interactive") -> Optional["_HeldSlot"]:
+        """
+        기다리지 않고 지금 바로 슬롯을 잡을 수 있을 때만 잡아서 반환 (대기열이 있거나 토큰/동시성이 없으면 None).
+        헤지처럼 "여유가 있을 때만" 보내는 추가 요청용. with로 감싸면 끝날 때 반환됨
+        """
+        rank = self.priorities.index(priority) if priority in self.priorities else len(self.priorities) - 1
+        priority = self.priorities[rank]
+        with self._cond:
+            self._refill()
+            if self._waiting or self._active >= self.max_concurrency or self._tokens < 1 \
+                    or time.monotonic() < self._blocked_until:
+                return None
+            self._tokens -= 1
+            self._active += 1
+            self._stats[priority]["admitted"] += 1
+            self._delays[priority].append(0.0)
+        return _HeldSlot(self)
+
+    def throttle(self, seconds: float):
+        """업스트림 429 등으로 잠시 전체 송신을 멈춤 (버킷 비움)"""
+        with self._cond:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._throttled += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill()
+            out: Dict[str, Any] = {
+                "active": self._active,
+                "waiting": len(self._waiting),
+                "tokens": round(self._tokens, 2),
+                "throttled": self._throttled,
+                "by_priority": {},
+            }
+            for p in self.priorities:
+                d = sorted(self._delays[p])
+                out["by_priority"][p] = {
+                    **self._stats[p],
+                    "queue_ms_avg": round(sum(d) / len(d) * 1000, 2) if d else 0.0,
+                    "queue_ms_p95": round(d[int(0.95 * (len(d) - 1))] * 1000, 2) if d else 0.0,
+                    "queue_ms_max": round(d[-1] * 1000, 2) if d else 0.0,
+                }
+        return out
+
+    # ---------- 내부 ----------
+    def _refill(self):
+        now = time.monotonic()
+        if now < self._blocked_until:
+            self._last_refill = now
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _acquire(self, priority: str, timeout: Optional[float]):
+        rank = self.priorities.index(priority) if priority in self.priorities else len(self.priorities) - 1
+        priority = self.priorities[rank]
+        t0 = time.monotonic()
+        with self._cond:
+            self._seq += 1
+            me = (rank, self._seq)
+            heapq.heappush(self._waiting, me)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiting[0] == me and self._active < self.max_concurrency and self._tokens >= 1:
+                        heapq.heappop(self._waiting)
+                        self._tokens -= 1
+                        self._active += 1
+                        break
+                    # 토큰이 모자라면 다음 토큰 생성 시점까지, 아니면 슬롯 반환/순서 변경 알림까지 대기
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        wait_for = self._blocked_until - now
+                    elif self._tokens < 1:
+                        wait_for = max((1 - self._tokens) / self.rate, 0.005) if self.rate > 0 else 1.0
+                    else:
+                        wait_for = None
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - t0)
+                        if remaining <= 0:
+                            self._waiting.remove(me)
+                            heapq.heapify(self._waiting)
+                            self._stats[priority]["timeouts"] += 1
+                            self._cond.notify_all()
+                            raise TimeoutError(f"{self.name} scheduler: queue timeout ({priority})")
+                        wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                    self._cond.wait(wait_for)
+            finally:
+                self._cond.notify_all()
+            self._stats[priority]["admitted"] += 1
+            self._delays[priority].append(time.monotonic() - t0)
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+class _SchedulerSlot:
+    def __init__(self, scheduler: PriorityScheduler, priority: str, timeout: Optional[float]):
+        self.scheduler, self.priority, self.timeout = scheduler, priority, timeout
+
+    def __enter__(self):
+        self.scheduler._acquire(self.priority, self.timeout)
+        return self
+
+    def __exit__(self, *exc):
+        self.scheduler._release()
+        return False
+
+class _HeldSlot:
+    """try_slot/acquire로 이미 잡은 슬롯 (with 종료 시 한 번만 반환)"""
+
+    def __init__(self, scheduler: PriorityScheduler):
+        self.scheduler = scheduler
+        self._held = True
+        self._lock = threading.Lock()
+
+    def transfer(self) -> "_HeldSlot":
+        """반환 책임을 새 객체로 넘김 → 이 객체의 with 종료는 아무것도 하지 않음"""
+        with self._lock:
+            if not self._held:
+                raise RuntimeError("slot already released or transferred")
+            self._held = False
+        return _HeldSlot(self.scheduler)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            held, self._held = self._held, False
+        if held:
+            self.scheduler._release()
+        return False
+
+# ------------------------------
+# 4) 싱글 플라이트 (같은 키의 동시 요청은 한 번만 실행하고 결과 공유)
+# ------------------------------
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 호출은 먼저 온 호출(leader)의 결과를 함께 기다림.
+    Streamlit 서버의 여러 스레드(세션) 사이에서 동작. 완료 후에는 key를 비워 다음 호출은 새로 실행.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executed": 0, "coalesced": 0}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._stats["calls"] += 1
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = Future()
+                self._inflight[key] = fut
+                self._stats["executed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._stats)
+            out["inflight"] = len(self._inflight)
+        return out
@@ -1,21 +1,101 @@
 # mypages/utils_search.py
+import json
 import time
 import re
-from typing import List, Dict, Any, Tuple, Optional
-from ddgs import DDGS
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, List, Dict, Any, Tuple, Optional
+from mypages.utils_resilience import SingleFlight
+from mypages.utils_cache import TTLCache, cache_path
+from mypages.utils_config import secret, secret_flag
+from mypages.utils_search_backend import get_backend as get_search_backend
+from mypages.utils_strategy import order_strategies, get_strategy_stats
+
+# 전략 병렬 실행 (SEARCH_PARALLEL=false 면 예전처럼 순차 실행)
+SEARCH_PARALLEL = secret_flag("SEARCH_PARALLEL", "true")
+SEARCH_WAVE_SIZE = int(secret("SEARCH_WAVE_SIZE", "3"))          # 한 번에 띄우는 전략 수 (우선순위 순)
+SEARCH_MAX_WORKERS = int(secret("SEARCH_MAX_WORKERS", "6"))      # 프로세스 전체 DDG 동시 호출 상한
+SEARCH_DEADLINE_SEC = float(secret("SEARCH_DEADLINE_SEC", "8"))  # 질의 하나당 전체 제한 시간
+SEARCH_ERROR_BACKOFF_SEC = 0.8                                      # 오류 뒤 rate limit 완화
+SEARCH_PLAN_CONCURRENCY = int(secret("SEARCH_PLAN_CONCURRENCY", "2"))  # plan_search: 동시에 실행할 재작성 질의 수
+
+# 검색 결과 캐시: 의도(detect_intent)별 TTL(초). 0이면 캐시 안 함
+SEARCH_CACHE_TTLS: Dict[str, int] = {
+    "news": 600, "price": 1800, "shop": 1800,
+    "howto": 86400, "define": 86400, "devdoc": 86400, "academic": 3 * 86400,
+    "spec": 7 * 86400, "wiki": 7 * 86400, "law": 7 * 86400,
+    "default": 3600,
+}
+SEARCH_CACHE_NEGATIVE_TTL = int(secret("SEARCH_CACHE_NEGATIVE_TTL", "300"))   # 결과 0건도 잠깐 캐시
+SEARCH_CACHE_MAX_ENTRIES = int(secret("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+SEARCH_CACHE_MAX_DISK_ENTRIES = int(secret("SEARCH_CACHE_MAX_DISK_ENTRIES", "10000"))
+SEARCH_CACHE_DISK = secret_flag("SEARCH_CACHE_DISK", "true")
 
 # ------------------------------
 # 0) 공통 유틸 (일단 타이틀로 분류시켜봄)
 # ------------------------------
-def _ddg_text(query: str, *, region: Optional[str] = None, timelimit: Optional[str] = None, max_results: int = 8) -> List[Dict[str, Any]]:
-    with DDGS() as ddgs:
-        return list(ddgs.text(
-            keywords=query,
-            region=region,           # 예: 'kr-kr'
-            timelimit=timelimit,     # 'd','w','m','y' 또는 None
-            max_results=max_results,
-            safesearch="moderate"
-        ))
+# 같은 (query, region, timelimit, max_results) 검색이 동시에 들어오면 한 번만 실행하고 결과 공유
+_ddg_flight = SingleFlight("utils_search.ddg")
+
+def _ddg_text_once(query: str, region: Optional[str], timelimit: Optional[str], max_results: int) -> List[Dict[str, Any]]:
+    # 실제 검색은 설정된 백엔드로 (기본 DuckDuckGo, 오프라인은 SEARCH_BACKEND=standin)
+    return get_search_backend().text(query, region=region, timelimit=timelimit, max_results=max_results)
+
+_search_cache = TTLCache(
+    "ddg",
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    db_path=cache_path("search_cache.sqlite3") if SEARCH_CACHE_DISK else None,
+    max_disk_entries=SEARCH_CACHE_MAX_DISK_ENTRIES,
+)
+
+def cached_search(query: str, region: Optional[str], timelimit: Optional[str], max_results: int,
+                  fetch: Callable[[], List[Dict[str, Any]]], intent: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    (query, region, timelimit, max_results) 키로 캐시 조회 → 없으면 fetch() 후 의도별 TTL로 저장
+    - 결과 0건은 SEARCH_CACHE_NEGATIVE_TTL 만큼만 캐시, fetch 예외는 캐시하지 않고 그대로 전파
+    - potens_client.web_search_duckduckgo도 같은 캐시를 씀
+    """
+    intent = intent or detect_intent(query)
+    key = json.dumps([query.strip(), region, timelimit, max_results], ensure_ascii=False)
+    hit, cached = _search_cache.get(key, tag=intent)
+    if hit:
+        return list(cached)
+    hits = list(fetch() or [])
+    ttl = SEARCH_CACHE_TTLS.get(intent, SEARCH_CACHE_TTLS["default"]) if hits else min(
+        SEARCH_CACHE_NEGATIVE_TTL, SEARCH_CACHE_TTLS.get(intent, SEARCH_CACHE_TTLS["default"]))
+    _search_cache.set(key, hits, ttl)
+    return hits
+
+def _ddg_text(query: str, *, region: Optional[str] = None, timelimit: Optional[str] = None, max_results: int = 8,
+              intent: Optional[str] = None, budget: Optional["SearchBudget"] = None) -> List[Dict[str, Any]]:
+    key = (query, region, timelimit, max_results)
+
+    def fetch():
+        denied = []
+
+        def network():
+            # 실제로 네트워크를 타는 리더만 예산 차감 (캐시 히트/같은 검색에 합류한 호출은 차감 없음)
+            if budget is not None and not budget.take():
+                denied.append(True)
+                raise BudgetExhausted(query)
+            return _ddg_text_once(query, region, timelimit, max_results)
+
+        while True:
+            try:
+                return _ddg_flight.do(key, network)
+            except BudgetExhausted:
+                if denied:
+                    raise
+                # 합류했던 다른 질문의 예산이 떨어진 것 → 내 예산으로 다시 시도
+
+    return cached_search(query, region, timelimit, max_results, fetch, intent=intent)
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    return _ddg_flight.stats()
+
+def get_search_cache_stats() -> Dict[str, Any]:
+    """검색 캐시 hit/miss 지표 (의도별 포함)"""
+    return _search_cache.stats()
 
 def _mk_attempt(q: str, hits: List[Dict[str, Any]], note: str) -> Tuple[str, int, str]:
     return (q, len(hits), note)
@@ -27,27 +107,65 @@ def _choose_text(h: Dict[str, Any]) -> Tuple[str, str, str]:
     return title.strip(), url, (text or "").strip()
 
 # ------------------------------
-# 1) 간단 의도 감지 (키워드 기반) -> 테스트용임 LLM응답 전
+# 1) 의도 감지 (가중 키워드, 한 번 스캔) -> 테스트용임 LLM응답 전
 # ------------------------------
-INTENTS = {
-    "price":      re.compile(r"(가격|얼마|비용|cost|price|시세|견적)", re.I),
-    "spec":       re.compile(r"(스펙|사양|제원|spec|규격|성능|벤치|benchmark)", re.I),
-    "define":     re.compile(r"(정의|설명|무엇|what is|뜻|개념)", re.I),
-    "howto":      re.compile(r"(방법|하는 법|튜토리얼|설치|해결|troubleshoot|how to)", re.I),
-    "law":        re.compile(r"(법|법령|조항|규정|고시|법률|시행령|시행규칙)", re.I),
-    "wiki":       re.compile(r"(위키|wikipedia|백과)", re.I),
-    "news":       re.compile(r"(뉴스|보도|속보|최근 이슈|breaking|today|최근)", re.I),
-    "academic":   re.compile(r"(논문|paper|arxiv|학술|cite|레퍼런스)", re.I),
-    "shop":       re.compile(r"(구매|사다|최저가|쇼핑|buy|amazon|쿠팡|11번가|gmarket)", re.I),
-    "devdoc":     re.compile(r"(에러|오류|문법|docs|documentation|api|reference)", re.I),
+# 의도별 (키워드, 가중치). 모든 키워드를 접두사 트리 정규식 하나로 합쳐 질의를 한 번만 훑고,
+# 걸린 키워드의 가중치를 의도별로 더해 순위를 매김 (dict 순서가 아니라 점수로 결정)
+INTENT_KEYWORDS: Dict[str, List[Tuple[str, float]]] = {
+    "price":    [("가격", 1.0), ("얼마", 1.0), ("비용", 0.8), ("cost", 1.0), ("price", 1.0), ("시세", 1.0), ("견적", 1.0)],
+    "spec":     [("스펙", 1.0), ("사양", 1.0), ("제원", 1.0), ("spec", 1.0), ("규격", 1.0), ("성능", 0.8), ("벤치", 1.0), ("benchmark", 1.0)],
+    "define":   [("정의", 1.0), ("설명", 0.7), ("무엇", 0.8), ("what is", 1.0), ("뜻", 1.0), ("개념", 1.0)],
+    "howto":    [("방법", 1.0), ("하는 법", 1.0), ("튜토리얼", 1.0), ("설치", 1.0), ("해결", 0.8), ("troubleshoot", 1.0), ("how to", 1.0)],
+    "law":      [("법", 0.6), ("법령", 1.2), ("조항", 1.0), ("규정", 1.0), ("고시", 0.8), ("법률", 1.2), ("시행령", 1.5), ("시행규칙", 1.5)],
+    "wiki":     [("위키", 1.0), ("wikipedia", 1.0), ("백과", 1.0)],
+    "news":     [("뉴스", 1.0), ("보도", 1.0), ("속보", 1.2), ("최근 이슈", 1.0), ("breaking", 1.0), ("today", 0.5), ("최근", 0.5)],
+    "academic": [("논문", 1.2), ("paper", 1.0), ("arxiv", 1.5), ("학술", 1.0), ("cite", 1.0), ("레퍼런스", 0.8)],
+    "shop":     [("구매", 1.0), ("사다", 0.8), ("최저가", 1.5), ("쇼핑", 1.0), ("buy", 1.0), ("amazon", 1.0), ("쿠팡", 1.0), ("11번가", 1.0), ("gmarket", 1.0)],
+    "devdoc":   [("에러", 1.0), ("오류", 1.0), ("문법", 1.0), ("docs", 1.0), ("documentation", 1.0), ("api", 0.7), ("reference", 0.8)],
 }
+DEFAULT_INTENT = "define"
+SECOND_INTENT_MIN_SHARE = float(secret("SECOND_INTENT_MIN_SHARE", "0.3"))   # 2순위 의도 전략을 섞는 최소 점수 비율
+
+def _trie_pattern(words: List[str]) -> str:
+    """키워드 목록 → 접두사 트리 모양 정규식 (공통 접두사를 한 번만 비교, 같은 위치에서는 가장 긴 키워드가 매칭)"""
+    trie: Dict[str, Any] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+# 키워드(소문자) → (intent, 가중치)
+_INTENT_TABLE: Dict[str, Tuple[str, float]] = {
+    kw.lower(): (intent, w) for intent, kws in INTENT_KEYWORDS.items() for kw, w in kws
+}
+_INTENT_RX = re.compile(_trie_pattern(list(_INTENT_TABLE)), re.I)
+
+def rank_intents(q: str) -> List[Tuple[str, float]]:
+    """의도 분포 [(intent, 비율)] 를 점수 내림차순으로 (동점이면 질의에서 먼저 나온 쪽). 아무것도 없으면 기본 의도"""
+    scores: Dict[str, float] = {}
+    first_pos: Dict[str, int] = {}
+    for m in _INTENT_RX.finditer(q or ""):
+        intent, w = _INTENT_TABLE[m.group(0).lower()]
+        scores[intent] = scores.get(intent, 0.0) + w
+        first_pos.setdefault(intent, m.start())
+    if not scores:
+        return [(DEFAULT_INTENT, 1.0)]
+    total = sum(scores.values())
+    ranked = sorted(scores, key=lambda k: (-scores[k], first_pos[k]))
+    return [(k, round(scores[k] / total, 3)) for k in ranked]
 
 def detect_intent(q: str) -> str:
-    for name, rx in INTENTS.items():
-        if rx.search(q):
-            return name
-    # 기본: 정의/설명 or 일반 검색
-    return "define"
+    return rank_intents(q)[0][0]
 
 # ------------------------------
 # 2) 의도별 전략 프리셋
@@ -147,33 +265,254 @@ def _strategies_for_intent(q_base: str, intent: str) -> List[Tuple[str, Optional
         (q_base + " meaning", None, None, "영문 정의"),
     ]
 
+def _strategies_for_intents(q_base: str, ranked: List[Tuple[str, float]],
+                            origins: Optional[Dict[Tuple, str]] = None) -> List[Tuple[str, Optional[str], Optional[str], str]]:
+    """
+    1순위 의도 전략에 2순위 의도 전략을 번갈아 끼움 (2순위 비율이 SECOND_INTENT_MIN_SHARE 이상일 때만, 중복 제거)
+    의도별 순서는 관측 성공률로 재배치(utils_strategy). origins를 주면 전략 → 출신 의도를 채움 (통계 기록용)
+    """
+    intents = [ranked[0][0]]
+    if len(ranked) >= 2 and ranked[1][1] >= SECOND_INTENT_MIN_SHARE:
+        intents.append(ranked[1][0])
+    lists = [(it, order_strategies(it, _strategies_for_intent(q_base, it))) for it in intents]
+    merged: List[Tuple[str, Optional[str], Optional[str], str]] = []
+    seen = set()
+    for i in range(max(len(lst) for _, lst in lists)):
+        for it, lst in lists:
+            if i < len(lst) and lst[i][:3] not in seen:
+                seen.add(lst[i][:3])
+                merged.append(lst[i])
+                if origins is not None:
+                    origins[lst[i][:3]] = it
+    return merged
+
 # ------------------------------
 # 3) 범용 검색 (의도 감지 → 단계적 축소/완화)
 # ------------------------------
-def search_general_narrow(user_query: str) -> Dict[str, Any]:
-    attempts: List[Tuple[str, int, str]] = []
-    errors:   List[Tuple[str, str]] = []
-    results:  List[Dict[str, Any]] = []
+class BudgetExhausted(RuntimeError):
+    """검색 예산(시간/호출 수) 소진 — 오류가 아니라 중단 신호 (캐시/재시도/백오프 대상 아님)"""
 
-    q_base = (user_query or "").strip()
-    if not q_base:
-        return {"results": [], "attempts": [], "errors": []}
+class SearchBudget:
+    """질문 하나에 쓰는 전체 제한 시간 + 최대 네트워크 호출 수 (여러 search_general_narrow가 공유, 스레드 안전)"""
 
-    intent = detect_intent(q_base)
-    strategies = _strategies_for_intent(q_base, intent)
+    def __init__(self, deadline_sec: float, max_calls: int):
+        self.deadline = time.monotonic() + deadline_sec
+        self.max_calls = max_calls
+        self.calls = 0
+        self.denied = 0
+        self._lock = threading.Lock()
 
-    for q, region, tl, note in strategies:
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.calls >= self.max_calls or time.monotonic() >= self.deadline
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.exhausted:
+                self.denied += 1
+                return False
+            self.calls += 1
+            return True
+
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=max(1, SEARCH_MAX_WORKERS), thread_name_prefix="ddg-search")
+    return _search_pool
+
+def _run_strategy(strategy, intent: str, budget) -> Tuple[List[Dict[str, Any]], float]:
+    q, region, tl, _note = strategy
+    t0 = time.perf_counter()
+    hits = _ddg_text(q, region=region, timelimit=tl, max_results=10, intent=intent, budget=budget)
+    return hits, (time.perf_counter() - t0) * 1000
+
+def _search_sequential(strategies, intent, attempts, errors, outcomes, deadline: float, budget=None):
+    for idx, (q, region, tl, note) in enumerate(strategies):
+        if time.monotonic() >= deadline:
+            break
         try:
-            hits = _ddg_text(q, region=region, timelimit=tl, max_results=10)
+            hits, ms = _run_strategy(strategies[idx], intent, budget)
             attempts.append(_mk_attempt(q, hits, note))
+            outcomes.append((strategies[idx], len(hits), ms))
             if hits:
-                results = hits
-                break
+                return hits, idx
+        except BudgetExhausted:
+            break
         except Exception as e:
             errors.append((q, str(e)))
-            time.sleep(0.8)  # rate limit 완화
+            time.sleep(SEARCH_ERROR_BACKOFF_SEC)  # rate limit 완화
+    return [], None
+
+def _search_waves(strategies, intent, attempts, errors, outcomes, deadline: float, budget=None):
+    """
+    우선순위 순으로 SEARCH_WAVE_SIZE개씩 동시에 실행.
+    앞선 전략이 모두 끝났고(결과 없음/오류) 자신에게 결과가 있는 가장 앞 전략이 나오면 즉시 반환,
+    나머지는 취소(아직 시작 전)하거나 결과를 버림. 기한이 지나면 그때까지 끝난 것 중 가장 앞선 결과.
+    반환: (결과, 이긴 전략의 순번) — 순번 = 순차 실행이었다면 필요했을 시도 횟수 - 1
+    """
+    pool = _get_search_pool()
+    wave = max(1, SEARCH_WAVE_SIZE)
+    errors_before = len(errors)
+    for start in range(0, len(strategies), wave):
+        if start and len(errors) > errors_before:
+            # 직전 웨이브에서 오류가 났으면 잠깐 쉬고 다음 웨이브 (rate limit 완화, 기한 안에서만)
+            time.sleep(max(0.0, min(SEARCH_ERROR_BACKOFF_SEC, deadline - time.monotonic())))
+        errors_before = len(errors)
+        if time.monotonic() >= deadline or (budget is not None and budget.exhausted):
+            break
+        batch = strategies[start:start + wave]
+        futures: Dict[Future, int] = {
+            pool.submit(_run_strategy, strat, intent, budget): i
+            for i, strat in enumerate(batch)
+        }
+        done_hits: Dict[int, List[Dict[str, Any]]] = {}
+        resolved: set = set()
+        winner: Optional[int] = None
+        pending = set(futures)
+        while pending and winner is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            finished, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for f in finished:
+                i = futures[f]
+                q, _region, _tl, note = batch[i]
+                resolved.add(i)
+                try:
+                    hits, ms = f.result()
+                    attempts.append(_mk_attempt(q, hits, note))
+                    outcomes.append((batch[i], len(hits), ms))
+                    if hits:
+                        done_hits[i] = hits
+                except BudgetExhausted:
+                    pass
+                except Exception as e:
+                    errors.append((q, str(e)))
+            # 앞선 전략이 모두 끝난 상태에서 결과가 있는 가장 앞 전략 = 승자
+            for i in range(len(batch)):
+                if i not in resolved:
+                    break
+                if i in done_hits:
+                    winner = i
+                    break
+        for f in pending:
+            f.cancel()
+        if winner is None and done_hits:
+            winner = min(done_hits)   # 기한 초과: 끝난 것 중 가장 앞선 결과
+        if winner is not None:
+            return done_hits[winner], start + winner
+    return [], None
+
+def search_general_narrow(user_query: str, deadline_sec: Optional[float] = None,
+                          budget: Optional[SearchBudget] = None) -> Dict[str, Any]:
+    attempts: List[Tuple[str, int, str]] = []
+    errors:   List[Tuple[str, str]] = []
+
+    q_base = (user_query or "").strip()
+    if not q_base:
+        return {"results": [], "attempts": [], "errors": []}
+
+    ranked = rank_intents(q_base)
+    intent = ranked[0][0]
+    origins: Dict[Tuple, str] = {}
+    strategies = _strategies_for_intents(q_base, ranked, origins)
+    outcomes: List[Tuple[Tuple, int, float]] = []
+    started = time.monotonic()
+    deadline = started + (SEARCH_DEADLINE_SEC if deadline_sec is None else deadline_sec)
+    if budget is not None:
+        deadline = min(deadline, budget.deadline)
+
+    run = _search_waves if SEARCH_PARALLEL else _search_sequential
+    results, winner = run(strategies, intent, attempts, errors, outcomes, deadline, budget)
+    _record_strategy_outcomes(intent, origins, outcomes, winner)
+
+    return {
+        "results": results, "attempts": attempts, "errors": errors, "intent": intent, "intents": ranked,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "timed_out": not results and time.monotonic() >= deadline,
+    }
+
+def _record_strategy_outcomes(intent: str, origins: Dict[Tuple, str], outcomes, winner: Optional[int]):
+    """전략별 성공/지연 + 질문당 첫 결과까지 시도 횟수 기록 (실패해도 검색에는 영향 없음)"""
+    try:
+        stats = get_strategy_stats()
+        for strat, n_hits, ms in outcomes:
+            stats.record(origins.get(strat[:3], intent), strat[3], n_hits > 0, ms)
+        if outcomes:
+            stats.record_question(intent, (winner + 1) if winner is not None else 0, winner is not None)
+    except Exception as e:
+        print(f"⚠️ 검색 전략 통계 기록 실패: {e}")
+
+def _rewrite_key(q: str) -> str:
+    # 대소문자/공백/어순만 다른 재작성은 같은 질의로 봄
+    return " ".join(sorted(q.lower().split()))
+
+_plan_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_plan_pool() -> ThreadPoolExecutor:
+    # 재작성 질의 실행용 (전략 풀과 분리: 같은 풀에서 서로 기다리다 멈추지 않도록)
+    global _plan_pool
+    if _plan_pool is None:
+        with _search_pool_lock:
+            if _plan_pool is None:
+                _plan_pool = ThreadPoolExecutor(max_workers=max(1, SEARCH_PLAN_CONCURRENCY) * 2, thread_name_prefix="search-plan")
+    return _plan_pool
+
+def plan_search(rewrites: List[str], budget: SearchBudget, concurrency: int = None) -> Dict[str, Any]:
+    """
+    재작성 질의 목록을 우선순위 순으로, 예산 안에서 실행 (중복 제거 → concurrency개씩 동시 실행)
+    첫 번째 만족 결과(results 있음)에서 멈춤. 반환: {results, intent, query, tried, complete, calls, elapsed_ms}
+    - tried: [(query, hits, note)] 실제 시도한 전략 기록 (+ 예산 때문에 못 한 재작성은 note='예산 소진')
+    - complete: 결과를 찾았거나, 예산 소진 없이 모든 재작성을 끝까지 시도했으면 True
+    """
+    started = time.monotonic()
+    concurrency = max(1, concurrency or SEARCH_PLAN_CONCURRENCY)
+    queue: List[str] = []
+    seen = set()
+    for q in rewrites:
+        q = (q or "").strip()
+        if q and _rewrite_key(q) not in seen:
+            seen.add(_rewrite_key(q))
+            queue.append(q)
+
+    tried: List[Tuple[str, int, str]] = []
+    found: Optional[Tuple[str, Dict[str, Any]]] = None
+    pool = _get_plan_pool()
+    i = 0
+    while i < len(queue) and found is None and not budget.exhausted:
+        group = queue[i:i + concurrency]
+        i += len(group)
+        futures = [pool.submit(search_general_narrow, q, budget.remaining(), budget) for q in group]
+        datas = []
+        for q, f in zip(group, futures):
+            try:
+                datas.append((q, f.result(timeout=budget.remaining() + 1.0)))
+            except Exception as e:
+                datas.append((q, {"results": [], "attempts": [], "errors": [(q, str(e))]}))
+        for q, d in datas:
+            tried.extend(d.get("attempts") or [])
+            if found is None and d.get("results"):
+                found = (q, d)   # 그룹 안에서는 앞선 재작성 우선
 
-    return {"results": results, "attempts": attempts, "errors": errors, "intent": intent}
+    skipped = queue[i:] if found is None else []
+    tried.extend((q, 0, "예산 소진") for q in skipped)
+    return {
+        "results": found[1]["results"] if found else [],
+        "intent": found[1].get("intent", "") if found else "",
+        "query": found[0] if found else None,
+        "tried": tried,
+        "complete": found is not None or (not skipped and budget.denied == 0 and budget.remaining() > 0),
+        "calls": budget.calls,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+    }
 
 # ------------------------------
 # 4) 스니펫/가격 추출
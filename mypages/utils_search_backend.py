@@ -0,0 +1,50 @@
+# mypages/utils_search_backend.py
+"""
+웹 검색 백엔드 선택 (utils_search, potens_client.web_search_duckduckgo 공용)
+- SEARCH_BACKEND=ddg (기본)            : DuckDuckGo (DDGS 클라이언트 풀, mypages/utils_ddgs.py)
+- SEARCH_BACKEND=standin[:코퍼스.json]  : 오프라인 대역 (tools/search_standin.py, 고정 코퍼스 + 지연 주입)
+새 백엔드는 SearchBackend 형태(text 메서드)만 맞추면 됨
+"""
+import threading
+from typing import Any, Dict, List, Optional, Protocol
+
+from mypages.utils_config import secret
+from mypages.utils_ddgs import get_pool as get_ddgs_pool
+
+SEARCH_BACKEND = secret("SEARCH_BACKEND", "ddg")
+
+class SearchBackend(Protocol):
+    name: str
+
+    def text(self, query: str, region: Optional[str] = None, timelimit: Optional[str] = None,
+             max_results: int = 10) -> List[Dict[str, Any]]:
+        """[{title, href, body}] — region 예: 'kr-kr', timelimit: 'd','w','m','y' 또는 None"""
+        ...
+
+class DDGBackend:
+    name = "ddg"
+
+    def text(self, query: str, region: Optional[str] = None, timelimit: Optional[str] = None,
+             max_results: int = 10) -> List[Dict[str, Any]]:
+        return get_ddgs_pool().text(query, region=region, timelimit=timelimit, max_results=max_results)
+
+def create_backend(spec: str) -> SearchBackend:
+    kind, _, arg = (spec or "ddg").partition(":")
+    if kind == "ddg":
+        return DDGBackend()
+    if kind == "standin":
+        from tools.search_standin import create_standin_backend
+        return create_standin_backend(arg or None)
+    raise ValueError(f"알 수 없는 SEARCH_BACKEND: {spec}")
+
+_backend: Optional[SearchBackend] = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> SearchBackend:
+    """프로세스 공용 검색 백엔드 (SEARCH_BACKEND 설정으로 한 번 결정)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(SEARCH_BACKEND)
+    return _backend
@@ -0,0 +1,141 @@
+# mypages/utils_strategy.py
+"""
+검색 전략 순서 학습 (의도별 bandit)
+- (intent, 전략 note)마다 시도/성공 횟수와 지연을 SQLite에 누적 (프로세스 재시작 후에도 유지)
+- 순서 결정: Thompson sampling — 성공률 Beta(성공+1, 실패+1)에서 뽑은 값 - 지연 벌점으로 정렬
+  시도가 STRATEGY_MIN_TRIES 미만인 전략은 원래 자리 그대로 (자료가 없으면 원래 순서와 똑같음),
+  충분히 시도된 전략끼리만 그들이 차지한 자리 안에서 재배치
+- 질문당 첫 결과까지 시도 횟수(attempts_to_hit)를 기록해 순서 학습 효과를 확인
+- 확인: python -m mypages.utils_strategy dump [intent]
+"""
+import sys, json, time, random, sqlite3, threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mypages.utils_cache import cache_path
+from mypages.utils_config import secret, secret_flag
+
+STRATEGY_BANDIT = secret_flag("STRATEGY_BANDIT", "true")
+STRATEGY_STATS_PATH = secret("STRATEGY_STATS_PATH") or cache_path("search_strategy_stats.sqlite3")
+STRATEGY_MIN_TRIES = int(secret("STRATEGY_MIN_TRIES", "5"))   # 이만큼 시도되기 전까지는 원래 자리 유지
+LATENCY_PENALTY_PER_SEC = 0.05  # 평균 지연 1초당 점수 감점
+
+Strategy = Tuple[str, Optional[str], Optional[str], str]   # (query, region, timelimit, note)
+
+class StrategyStats:
+    def __init__(self, path: str = STRATEGY_STATS_PATH, rng: Optional[random.Random] = None):
+        self.path = path
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS strategy_stats ("
+            " intent TEXT, note TEXT, tries INTEGER, hits INTEGER, latency_ms_total REAL, updated_at REAL,"
+            " PRIMARY KEY (intent, note))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS question_stats ("
+            " intent TEXT PRIMARY KEY, questions INTEGER, answered INTEGER, attempts_to_hit_total INTEGER)"
+        )
+        self._cells: Dict[Tuple[str, str], List[float]] = {
+            (i, n): [t, h, lat] for i, n, t, h, lat in
+            self._db.execute("SELECT intent, note, tries, hits, latency_ms_total FROM strategy_stats")
+        }
+        self._questions: Dict[str, List[int]] = {
+            i: [q, a, t] for i, q, a, t in
+            self._db.execute("SELECT intent, questions, answered, attempts_to_hit_total FROM question_stats")
+        }
+
+    # ---------- 기록 ----------
+    def record(self, intent: str, note: str, hit: bool, latency_ms: float):
+        with self._lock:
+            cell = self._cells.setdefault((intent, note), [0, 0, 0.0])
+            cell[0] += 1
+            cell[1] += int(hit)
+            cell[2] += latency_ms
+            self._db.execute(
+                "INSERT OR REPLACE INTO strategy_stats VALUES (?,?,?,?,?,?)",
+                (intent, note, cell[0], cell[1], cell[2], time.time()),
+            )
+
+    def record_question(self, intent: str, attempts: int, answered: bool):
+        """질문 하나 끝: 결과를 찾았으면 그때까지의 시도 횟수 누적"""
+        with self._lock:
+            q = self._questions.setdefault(intent, [0, 0, 0])
+            q[0] += 1
+            if answered:
+                q[1] += 1
+                q[2] += attempts
+            self._db.execute("INSERT OR REPLACE INTO question_stats VALUES (?,?,?,?)", (intent, *q))
+
+    # ---------- 순서 ----------
+    def order(self, intent: str, strategies: Sequence[Strategy], min_tries: int = STRATEGY_MIN_TRIES) -> List[Strategy]:
+        """
+        Thompson sampling으로 전략 순서 재배치 (동점은 원래 순서)
+        시도가 min_tries 미만인 전략은 원래 자리에 고정, 나머지는 그들이 있던 자리끼리만 바꿈
+        """
+        out = list(strategies)
+        warm = []
+        with self._lock:
+            for idx, s in enumerate(strategies):
+                tries, hits, lat = self._cells.get((intent, s[3]), (0, 0, 0.0))
+                if tries < max(1, min_tries):
+                    continue
+                sample = self._rng.betavariate(hits + 1, tries - hits + 1)
+                avg_sec = lat / tries / 1000
+                warm.append((sample - LATENCY_PENALTY_PER_SEC * avg_sec, -idx, s))
+        slots = sorted(-idx for _, idx, _ in warm)
+        warm.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        for slot, (_, _, s) in zip(slots, warm):
+            out[slot] = s
+        return out
+
+    # ---------- 지표/덤프 ----------
+    def dump(self, intent: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            cells = {k: list(v) for k, v in self._cells.items() if intent is None or k[0] == intent}
+            questions = {k: list(v) for k, v in self._questions.items() if intent is None or k == intent}
+        out: Dict[str, Any] = {}
+        for (i, note), (tries, hits, lat) in sorted(cells.items()):
+            out.setdefault(i, {"strategies": []})["strategies"].append({
+                "note": note,
+                "tries": int(tries),
+                "hits": int(hits),
+                "hit_rate": round(hits / tries, 3) if tries else 0.0,
+                "posterior_mean": round((hits + 1) / (tries + 2), 3),
+                "avg_latency_ms": round(lat / tries, 1) if tries else 0.0,
+            })
+        for i, block in out.items():
+            block["strategies"].sort(key=lambda r: -r["posterior_mean"])
+        for i, (q, a, t) in questions.items():
+            out.setdefault(i, {"strategies": []}).update({
+                "questions": q, "answered": a,
+                "avg_attempts_to_hit": round(t / a, 2) if a else 0.0,
+            })
+        return out
+
+_stats: Optional[StrategyStats] = None
+_stats_lock = threading.Lock()
+
+def get_strategy_stats() -> StrategyStats:
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = StrategyStats()
+    return _stats
+
+def order_strategies(intent: str, strategies: Sequence[Strategy]) -> List[Strategy]:
+    if not STRATEGY_BANDIT:
+        return list(strategies)
+    return get_strategy_stats().order(intent, strategies)
+
+def get_stats(intent: Optional[str] = None) -> Dict[str, Any]:
+    return get_strategy_stats().dump(intent)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "dump":
+        print("usage: python -m mypages.utils_strategy dump [intent]")
+        sys.exit(1)
+    print(json.dumps(get_stats(sys.argv[2] if len(sys.argv) > 2 else None), ensure_ascii=False, indent=2))
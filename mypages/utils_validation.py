@@ -0,0 +1,151 @@
+# mypages/utils_validation.py
+"""
+입력값(filled_fields) 규칙 기반 사전 검증
+- validate_confirm_text(LLM)가 하던 기계적 검사를 규칙으로 처리: 필수 항목 누락/[입력 필요], 날짜 순서, 금액 양수
+- 규칙은 문서 종류별로 추가 가능: @register_rule("출장") def ...(filled, required) -> RuleResult
+- 규칙이 판단하지 못한 항목(undecided)이 있을 때만 LLM 검증이 필요
+"""
+import re, threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PLACEHOLDER = "[입력 필요]"
+
+# ------------------------------
+# 0) 값 파싱
+# ------------------------------
+_DATE_PATTERNS = [
+    re.compile(r"(?P<y>\d{4})\s*[-./년]\s*(?P<m>\d{1,2})\s*[-./월]\s*(?P<d>\d{1,2})\s*일?"),
+    re.compile(r"(?P<m>\d{1,2})\s*월\s*(?P<d>\d{1,2})\s*일"),
+    re.compile(r"^(?P<m>\d{1,2})\s*/\s*(?P<d>\d{1,2})$"),
+]
+
+def parse_date(value: Any, today: Optional[date] = None) -> Optional[date]:
+    """'2025-12-03', '2025.12.3', '2025년 12월 3일', '12월 3일'(올해), '12/3' → date. 못 읽으면 None"""
+    text = str(value or "").strip()
+    for rx in _DATE_PATTERNS:
+        m = rx.search(text)
+        if not m:
+            continue
+        y = int(m.group("y")) if "y" in rx.groupindex else (today or date.today()).year
+        try:
+            return date(y, int(m.group("m")), int(m.group("d")))
+        except ValueError:
+            return None
+    return None
+
+_UNITS = {"억": 100_000_000, "천만": 10_000_000, "백만": 1_000_000, "만": 10_000, "천": 1_000}
+_AMOUNT_TOKEN = re.compile(r"(-?\d+(?:\.\d+)?)\s*(억|천만|백만|만|천)?")
+
+def parse_amount(value: Any) -> Optional[float]:
+    """'1200000', '1,200,000원', '120만원', '1억 2천만', '-5만' → 숫자(원). 못 읽으면 None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value or "").replace(",", "").replace("₩", "").strip()
+    if not text:
+        return None
+    if re.fullmatch(r"(무료|없음|0\s*원?)", text):
+        return 0.0
+    tokens = _AMOUNT_TOKEN.findall(text)
+    # 숫자 이외의 글자가 '원'/단위/공백뿐일 때만 금액으로 인정 (예: '견적서 참고'는 None)
+    rest = _AMOUNT_TOKEN.sub("", text)
+    if not tokens or re.sub(r"[\s원정도약]", "", rest):
+        return None
+    total = 0.0
+    for num, unit in tokens:
+        total += float(num) * _UNITS.get(unit, 1)
+    return total
+
+# ------------------------------
+# 1) 규칙
+# ------------------------------
+class RuleResult:
+    """missing: 누락 항목, problems: 수정 제안 문구, undecided: 규칙으로 판단 못 한 검사 설명"""
+
+    def __init__(self, missing: Optional[List[str]] = None, problems: Optional[List[str]] = None,
+                 undecided: Optional[List[str]] = None):
+        self.missing = missing or []
+        self.problems = problems or []
+        self.undecided = undecided or []
+
+Rule = Callable[[Dict[str, Any], List[str]], RuleResult]
+_RULES: Dict[str, List[Rule]] = {"*": []}
+
+def register_rule(doc_type: str = "*"):
+    """문서 종류별 규칙 등록 데코레이터 ("*"는 모든 종류에 적용)"""
+    def deco(fn: Rule) -> Rule:
+        _RULES.setdefault(doc_type, []).append(fn)
+        return fn
+    return deco
+
+def _is_blank(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and (not v.strip() or PLACEHOLDER in v)) or v in ([], {})
+
+_START_KEYS = ("시작", "출발", "부터")
+_END_KEYS = ("종료", "복귀", "까지", "끝")
+_AMOUNT_KEYS = ("금액", "비용", "예산", "경비", "단가", "가격")
+
+@register_rule("*")
+def required_fields_rule(filled: Dict[str, Any], required: List[str]) -> RuleResult:
+    return RuleResult(missing=[f for f in required if _is_blank(filled.get(f))])
+
+@register_rule("*")
+def date_order_rule(filled: Dict[str, Any], required: List[str]) -> RuleResult:
+    starts = [k for k in filled if any(s in k for s in _START_KEYS)]
+    ends = [k for k in filled if any(s in k for s in _END_KEYS)]
+    if len(starts) != 1 or len(ends) != 1 or _is_blank(filled[starts[0]]) or _is_blank(filled[ends[0]]):
+        return RuleResult()
+    s_key, e_key = starts[0], ends[0]
+    s, e = parse_date(filled[s_key]), parse_date(filled[e_key])
+    if s is None or e is None:
+        return RuleResult(undecided=[f"'{s_key}'({filled[s_key]})와 '{e_key}'({filled[e_key]})의 순서"])
+    if e < s:
+        return RuleResult(problems=[f"'{e_key}'({e.isoformat()})이 '{s_key}'({s.isoformat()})보다 빠릅니다. 날짜를 확인해주세요."])
+    return RuleResult()
+
+@register_rule("*")
+def positive_amount_rule(filled: Dict[str, Any], required: List[str]) -> RuleResult:
+    out = RuleResult()
+    for k, v in filled.items():
+        if not any(a in k for a in _AMOUNT_KEYS) or _is_blank(v):
+            continue
+        amount = parse_amount(v)
+        if amount is None:
+            out.undecided.append(f"'{k}'({v})가 0보다 큰 금액인지")
+        elif amount <= 0:
+            out.problems.append(f"'{k}'이(가) {v}입니다. 0보다 큰 금액을 입력해주세요.")
+    return out
+
+# ------------------------------
+# 2) 검증 + 지표
+# ------------------------------
+_stats = {"calls": 0, "decided_by_rules": 0, "llm_calls": 0}
+_stats_lock = threading.Lock()
+
+def validate_filled(filled: Dict[str, Any], required: List[str], doc_type: Optional[str] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    규칙 검증. ({is_valid, missing, suggestion}, undecided) 반환
+    undecided가 비어 있으면 결과가 확정이고, 있으면 그 항목만 LLM 확인이 필요
+    """
+    filled = filled or {}
+    missing: List[str] = []
+    problems: List[str] = []
+    undecided: List[str] = []
+    for rule in _RULES["*"] + (_RULES.get(doc_type, []) if doc_type else []):
+        r = rule(filled, list(required or []))
+        missing += [m for m in r.missing if m not in missing]
+        problems += r.problems
+        undecided += r.undecided
+    result = {"is_valid": not missing and not problems, "missing": missing, "suggestion": " ".join(problems)}
+    return result, undecided
+
+def record_validation(used_llm: bool):
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["llm_calls" if used_llm else "decided_by_rules"] += 1
+
+def get_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        s = dict(_stats)
+    s["llm_avoided_rate"] = round(s["decided_by_rules"] / s["calls"], 3) if s["calls"] else 0.0
+    return s
@@ -1,37 +1,129 @@
-from ddgs import DDGS
-import os, json, requests
+import os, re, copy, json, time, hashlib, threading, asyncio, requests
 import streamlit as st
-from typing import Optional, List, Dict, Any, Union, Tuple
-from mypages.utils_llm import backoff_sleep, try_parse_json, normalize_keys, validate_keys  # 있으면 
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Optional, List, Dict, Any, Union, Tuple, Iterator, Generator
+from mypages.utils_llm import backoff_sleep, try_parse_json, normalize_keys, validate_keys, get_json_stats  # 있으면 
+from mypages.utils_cache import TTLCache, cache_path
+from mypages.utils_resilience import CircuitBreaker, CircuitOpenError, Hedger, PriorityScheduler, SingleFlight
+from mypages.utils_classifier import predict_doc_type, record_decision as record_doc_type_decision
+from mypages.utils_validation import validate_filled, record_validation, get_stats as get_validation_rule_stats
+from mypages.utils_ddgs import get_stats as get_ddgs_pool_stats
+from mypages.utils_search_backend import get_backend as get_search_backend
+from mypages.utils_config import secret as _secret
 
 # from dotenv import load_dotenv
 
 # load_dotenv()
 
 # ========== Env ==========
-# st.secrets.get()을 사용하여 변수 호출 시 오류 방지
-APP_MODE = st.secrets.get("APP_MODE", "live").lower()
-POTENS_API_STYLE = st.secrets.get("POTENS_API_STYLE", "chat").lower()
-POTENS_API_URL = st.secrets.get("POTENS_API_URL")
-POTENS_API_KEY = st.secrets.get("POTENS_API_KEY")
-SUPABASE_URL = st.secrets.get("SUPABASE_URL")
-SUPABASE_KEY = st.secrets.get("SUPABASE_KEY")
-
-REQUEST_TIMEOUT_CONNECT = int(st.secrets.get("POTENS_TIMEOUT_CONNECT_SEC", "6"))
-REQUEST_TIMEOUT_READ = int(st.secrets.get("POTENS_TIMEOUT_READ_SEC", "12"))
-MAX_RETRIES = int(st.secrets.get("POTENS_MAX_RETRIES", "2"))
+# st.secrets → 환경변수 순으로 조회 (secrets.toml 없이 대역 서버/벤치마크로 실행할 때 환경변수 사용)
+APP_MODE = _secret("APP_MODE", "live").lower()
+POTENS_API_STYLE = _secret("POTENS_API_STYLE", "chat").lower()
+POTENS_API_URL = _secret("POTENS_API_URL")
+POTENS_API_KEY = _secret("POTENS_API_KEY")
+SUPABASE_URL = _secret("SUPABASE_URL")
+SUPABASE_KEY = _secret("SUPABASE_KEY")
+
+REQUEST_TIMEOUT_CONNECT = int(_secret("POTENS_TIMEOUT_CONNECT_SEC", "6"))
+REQUEST_TIMEOUT_READ = int(_secret("POTENS_TIMEOUT_READ_SEC", "12"))
+MAX_RETRIES = int(_secret("POTENS_MAX_RETRIES", "2"))
 
 # 환경 변수가 없을 때 오류를 내도록 명시적인 체크 추가
 if not POTENS_API_URL or not POTENS_API_KEY:
     raise RuntimeError("POTENS_API_URL or POTENS_API_KEY not configured in secrets.toml")
     
 HEADERS = {"Authorization": f"Bearer {POTENS_API_KEY}", "Content-Type": "application/json"}
+
+# ========== HTTP 커넥션 풀 (프로세스 공용) ==========
+# Streamlit 세션/스레드가 모두 같은 세션을 공유 → TCP+TLS 핸드셰이크는 커넥션당 1회만
+# POOL_MAXSIZE는 워커(스레드) 수에 맞춰 잡는다. 기본값: CPU 수 x 4 (최대 32)
+POOL_CONNECTIONS = int(_secret("POTENS_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(_secret("POTENS_POOL_MAXSIZE", str(min(32, (os.cpu_count() or 1) * 4))))
+POOL_BLOCK = str(_secret("POTENS_POOL_BLOCK", "false")).lower() in ("1", "true", "yes")
+
+_http_stats = {"requests": 0, "new_connections": 0, "handshake_ms_total": 0.0, "handshake_ms_max": 0.0}
+_http_stats_lock = threading.Lock()
+
+def _record_handshake(elapsed_ms: float):
+    with _http_stats_lock:
+        _http_stats["new_connections"] += 1
+        _http_stats["handshake_ms_total"] += elapsed_ms
+        _http_stats["handshake_ms_max"] = max(_http_stats["handshake_ms_max"], elapsed_ms)
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        _record_handshake((time.perf_counter() - t0) * 1000)
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # TCP 연결 + TLS 핸드셰이크 전체 시간
+        t0 = time.perf_counter()
+        super().connect()
+        _record_handshake((time.perf_counter() - t0) * 1000)
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _PooledAdapter(HTTPAdapter):
+    """새 커넥션이 열릴 때마다 핸드셰이크 시간을 기록하는 어댑터"""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    """keep-alive 커넥션 풀을 가진 프로세스 공용 세션 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = _PooledAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE,
+                    pool_block=POOL_BLOCK,
+                )
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update(HEADERS)
+                _session = s
+    return _session
+
+def _session_post(url: str, **kwargs) -> requests.Response:
+    with _http_stats_lock:
+        _http_stats["requests"] += 1
+    return _get_session().post(url, **kwargs)
+
+def get_http_stats() -> Dict[str, Any]:
+    """커넥션 재사용/핸드셰이크 카운터 스냅샷"""
+    with _http_stats_lock:
+        stats = dict(_http_stats)
+    stats["reused_connections"] = max(0, stats["requests"] - stats["new_connections"])
+    stats["reuse_ratio"] = round(stats["reused_connections"] / stats["requests"], 3) if stats["requests"] else 0.0
+    stats["handshake_ms_avg"] = round(stats["handshake_ms_total"] / stats["new_connections"], 2) if stats["new_connections"] else 0.0
+    stats["pool_connections"] = POOL_CONNECTIONS
+    stats["pool_maxsize"] = POOL_MAXSIZE
+    return stats
+
 # ========== 공통 호출기 ==========
 def _http_post_json(url: str, payload: dict) -> Tuple[Optional[dict], Optional[str]]:
     """성공 시 (json, None), 실패 시 (None, error_str) 반환"""
     for attempt in range(MAX_RETRIES + 1):
         try:
-            r = requests.post(
+            r = _session_post(
                 url,
                 headers=HEADERS,
                 json=payload,
@@ -50,34 +142,349 @@ def _http_post_json(url: str, payload: dict) -> Tuple[Optional[dict], Optional[s
                 continue
             return None, str(e)
 
+# ========== LLM 응답 캐시 (프로세스 공용) ==========
+# 정규화한 프롬프트 해시 + is_json 으로 키를 만들고, 기능(op)별 TTL(초)을 적용한다. 0이면 캐시 안 함.
+LLM_CACHE_TTLS: Dict[str, int] = {
+    "infer_doc_type": 86400,
+    "analyze_request_and_ask": 3600,
+    "classify_and_analyze": 3600,
+    "generate_confirm_text": 3600,
+    "generate_approval_summary": 86400,
+    "generate_approval_summaries_batch": 86400,
+    "generate_next_step_alert": 86400,
+    "validate_confirm_text": 3600,
+    "generate_rejection_note": 3600,
+    "default": 300,
+}
+_ttl_overrides = _secret("LLM_CACHE_TTLS", {})
+if isinstance(_ttl_overrides, str):   # 환경변수로 줄 때는 JSON 문자열
+    _ttl_overrides = json.loads(_ttl_overrides)
+LLM_CACHE_TTLS.update({k: int(v) for k, v in dict(_ttl_overrides).items()})
+LLM_CACHE_MAX_ENTRIES = int(_secret("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_MAX_DISK_ENTRIES = int(_secret("LLM_CACHE_MAX_DISK_ENTRIES", "5000"))
+LLM_CACHE_DISK = str(_secret("LLM_CACHE_DISK", "true")).lower() in ("1", "true", "yes")
+
+_llm_cache = TTLCache(
+    "llm",
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    db_path=cache_path("llm_cache.sqlite3") if LLM_CACHE_DISK else None,
+    max_disk_entries=LLM_CACHE_MAX_DISK_ENTRIES,
+)
+
+def _llm_cache_key(prompt: str, is_json: bool) -> str:
+    normalized = re.sub(r"\s+", " ", prompt or "").strip()
+    return hashlib.sha256(f"{int(is_json)}|{normalized}".encode("utf-8")).hexdigest()
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """LLM 캐시 hit/miss 지표 (op별 포함)"""
+    return _llm_cache.stats()
+
+# ========== JSON 응답 스키마 (op별 필수 키: 타입) ==========
+# 스키마에 맞지 않으면 파싱 실패와 같이 처리 → 캐시하지 않고 {} 반환 (호출부 폴백 경로로)
+LLM_JSON_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "analyze_request_and_ask": {"filled_fields": dict},
+    "classify_and_analyze": {"doc_type": str, "filled_fields": dict},
+    "generate_approval_summary": {"title": str},
+    "generate_approval_summaries_batch": {"items": list},
+    "validate_confirm_text": {"is_valid": bool},
+    "edit_field": {"key": str, "value": object},
+}
+
+def get_json_parse_stats() -> Dict[str, Any]:
+    """op별 JSON 추출/복구/실패 지표"""
+    return get_json_stats()
+
+# ========== 복원력: 헤지 요청 + 서킷 브레이커 ==========
+# 느린 응답은 p95 지연 뒤 같은 요청을 한 번 더 보내 먼저 성공한 쪽을 쓰고,
+# 연속 실패가 쌓이면 브레이커를 열어 바로 실패 처리 → recovery 후 half-open 시험 호출로 복구 확인
+LLM_REQUEST_TIMEOUT = float(_secret("POTENS_LLM_TIMEOUT_SEC", "20"))
+_llm_breaker = CircuitBreaker(
+    "potens",
+    failure_threshold=int(_secret("POTENS_BREAKER_FAILURES", "5")),
+    recovery_timeout=float(_secret("POTENS_BREAKER_RECOVERY_SEC", "30")),
+)
+_llm_hedger = Hedger(
+    "potens",
+    enabled=str(_secret("POTENS_HEDGE_ENABLED", "true")).lower() in ("1", "true", "yes"),
+    percentile=float(_secret("POTENS_HEDGE_PERCENTILE", "95")),
+    min_delay=float(_secret("POTENS_HEDGE_MIN_DELAY_SEC", "0.5")),
+    max_delay=float(_secret("POTENS_HEDGE_MAX_DELAY_SEC", "8")),
+    initial_delay=float(_secret("POTENS_HEDGE_INITIAL_DELAY_SEC", "3")),
+    max_workers=POOL_MAXSIZE,
+)
+
+# ========== 전역 레이트 리미터 + 우선순위 스케줄러 ==========
+# 모든 세션의 LLM 트래픽이 하나의 토큰 버킷/동시성 상한을 공유 → 429 방지
+# 사용자가 기다리는 대화형 호출(interactive)이 백그라운드 호출(background)보다 먼저 나간다.
+_llm_scheduler = PriorityScheduler(
+    "potens",
+    rate_per_sec=float(_secret("POTENS_RATE_PER_SEC", "5")),
+    burst=int(_secret("POTENS_RATE_BURST", "10")),
+    max_concurrency=int(_secret("POTENS_MAX_CONCURRENCY", "8")),
+    priorities=("interactive", "background"),
+)
+BACKGROUND_OPS = {"generate_approval_summary", "generate_approval_summaries_batch", "generate_next_step_alert", "generate_rejection_note"}
+LLM_QUEUE_TIMEOUT = float(_secret("POTENS_QUEUE_TIMEOUT_SEC", "30"))
+
+def _priority_for(op: str) -> str:
+    return "background" if op in BACKGROUND_OPS else "interactive"
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """대기열 길이/토큰/우선순위별 대기 지연(ms)"""
+    return _llm_scheduler.stats()
+
+def _is_upstream_failure(e: Exception) -> bool:
+    """브레이커에 실패로 셀 예외인지 (4xx 요청 오류는 서버 장애가 아님, 429는 예외)"""
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        code = e.response.status_code
+        return code == 429 or code >= 500
+    return True
+
+def _post_llm_message(prompt: str) -> str:
+    """Potens에 프롬프트 1회 전송 → 'message' 본문 (실패 시 예외)"""
+    response = _session_post(POTENS_API_URL, json={"prompt": prompt}, timeout=LLM_REQUEST_TIMEOUT)
+    if not response.ok:
+        # 오류 발생 시 실제 응답 내용을 확인하기 위해 터미널에 출력
+        print(f"❌ 오류 발생 시점의 API 응답: {response.text}")
+        if response.status_code == 429:
+            _throttle_from(response)
+    response.raise_for_status()
+    return response.json().get('message', '')
+
+def _throttle_from(response: requests.Response):
+    """429 응답이면 Retry-After(없으면 1초) 동안 전체 송신을 멈춤"""
+    try:
+        wait_sec = float(response.headers.get("Retry-After", "1"))
+    except ValueError:
+        wait_sec = 1.0
+    _llm_scheduler.throttle(wait_sec)
+
+def _request_llm_message(prompt: str, op: str = "default") -> str:
+    # 1차 요청은 슬롯을 기다려서 잡고, 헤지(2차)는 토큰이 바로 있을 때만 자기 슬롯으로 보냄 (없으면 헤지 생략)
+    # 슬롯은 각 요청이 실제로 끝날 때 반환 (헤지가 이겨도 1차가 도는 동안은 점유). 브레이커가 막으면 with가 반환
+    priority = _priority_for(op)
+    with _llm_scheduler.acquire(priority, timeout=LLM_QUEUE_TIMEOUT) as slot:
+        return _llm_breaker.call(
+            _llm_hedger.call, lambda: _post_llm_message(prompt),
+            slot=slot,
+            try_acquire=lambda: _llm_scheduler.try_slot(priority),
+            is_failure=_is_upstream_failure,
+        )
+
+# 같은 프롬프트가 동시에 들어오면(동시 접속, 재실행 중 중복 클릭) 요청은 한 번만 보냄
+_llm_flight = SingleFlight("potens")
+_search_flight = SingleFlight("ddg")
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    """중복 요청 합치기(coalesced) 카운터"""
+    return {"llm": _llm_flight.stats(), "search": _search_flight.stats()}
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """서킷 브레이커 상태 + 헤지 발사/승리 횟수 + DDGS 클라이언트 풀(재사용/지연)"""
+    return {"breaker": _llm_breaker.stats(), "hedge": _llm_hedger.stats(), "ddgs_pool": get_ddgs_pool_stats()}
+
 # --- LLM 호출 공통 함수 (최종 수정) ---
-def _call_potens_llm(prompt: str, is_json: bool = False) -> Union[dict, str]:
-    """Potens LLM을 호출하고, 실제 응답 구조에 맞게 결과를 파싱합니다."""
-    payload = {"prompt": prompt}
+def _call_potens_llm(prompt: str, is_json: bool = False, op: str = "default", quiet: bool = False) -> Union[dict, str]:
+    """
+    Potens LLM을 호출하고, 실제 응답 구조에 맞게 결과를 파싱합니다. (op: 캐시 TTL 구분용 기능 이름)
+    quiet=True면 실패를 화면에 띄우지 않고 로그만 남김 (호출부에 폴백 경로가 있을 때)
+    """
+    ttl = LLM_CACHE_TTLS.get(op, LLM_CACHE_TTLS["default"])
+    key = _llm_cache_key(prompt, is_json)
+    if ttl > 0:
+        hit, cached = _llm_cache.get(key, tag=op)
+        if hit:
+            # 메모리 캐시 객체를 호출부가 수정하지 않도록 사본 반환
+            return copy.deepcopy(cached) if is_json else cached
 
+    content = None
     try:
-        response = requests.post(POTENS_API_URL, headers=HEADERS, json=payload, timeout=20)
-        response.raise_for_status()
-        
-        # 1. 실제 응답 데이터 가져오기
-        response_data = response.json()
-        
-        # 2. 'message' 키에서 내용을 추출
-        content = response_data.get('message', '')
-
-        # 3. 만약 내용이 JSON을 감싼 마크다운 코드 블록이라면 순수 JSON만 추출
-        if is_json and content.startswith("```json"):
-            content = content.strip().replace("```json", "").replace("```", "")
-        
-        # 4. 최종 결과 반환
-        return json.loads(content) if is_json else content.strip()
+        # 1. 'message' 내용 가져오기 (스케줄러 + 서킷 브레이커 + 헤지 + 풀 세션)
+        content = _llm_flight.do(_llm_cache_key(prompt, False), lambda: _request_llm_message(prompt, op))
+
+        # 2. JSON이면 설명문/코드블록/문법 오류를 감안해 첫 객체 추출 + 스키마 검증
+        if is_json:
+            ok, result = try_parse_json(content, schema=LLM_JSON_SCHEMAS.get(op), op=op)
+            if not ok:
+                raise ValueError(f"JSON 추출 실패 (op={op})")
+        else:
+            # 3. 최종 결과 (오류 응답은 캐시하지 않음)
+            result = content.strip()
 
     except Exception as e:
-        st.error(f"LLM API 호출 또는 파싱 중 오류: {e}")
-        # 오류 발생 시 실제 응답 내용을 확인하기 위해 터미널에 출력
-        print(f"❌ 오류 발생 시점의 API 응답: {response.text}")
+        if quiet:
+            print(f"⚠️ LLM 호출/파싱 실패 (op={op}): {e}")
+        else:
+            st.error(f"LLM API 호출 또는 파싱 중 오류: {e}")
+        if content is not None:
+            print(f"❌ 파싱 실패한 LLM 응답: {content}")
         return {} if is_json else f"오류: {e}"
 
+    if ttl > 0:
+        _llm_cache.set(key, copy.deepcopy(result) if is_json else result, ttl)
+    return result
+
+# ========== 스트리밍 호출기 ==========
+# {"prompt": ..., "stream": true} 로 요청하고, 서버 응답 형식에 따라 조각을 yield 한다.
+#  - text/event-stream : SSE "data: ..." (JSON이면 message/delta/token 키, "[DONE]"에서 종료)
+#  - application/x-ndjson : 줄마다 {"message": "..."}
+#  - application/json : 스트리밍 미지원 서버 → 전체 message 한 번에
+#  - 그 외 : chunked 텍스트 그대로
+STREAM_READ_TIMEOUT = int(_secret("POTENS_STREAM_READ_TIMEOUT_SEC", "60"))
+
+def _delta_from_event(data: str) -> str:
+    try:
+        obj = json.loads(data)
+    except ValueError:
+        return data
+    if isinstance(obj, dict):
+        for k in ("message", "delta", "token", "content", "text"):
+            if isinstance(obj.get(k), str):
+                return obj[k]
+        return ""
+    return str(obj)
+
+def _iter_stream_response(response: requests.Response) -> Iterator[str]:
+    ctype = response.headers.get("Content-Type", "").lower()
+    if "text/event-stream" in ctype:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            delta = _delta_from_event(data)
+            if delta:
+                yield delta
+    elif "ndjson" in ctype:
+        for line in response.iter_lines(decode_unicode=True):
+            if line.strip():
+                delta = _delta_from_event(line)
+                if delta:
+                    yield delta
+    elif "application/json" in ctype:
+        yield response.json().get("message", "")
+    else:
+        response.encoding = response.encoding or "utf-8"
+        for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+            if chunk:
+                yield chunk
+
+def stream_potens_llm(prompt: str, op: str = "default") -> Generator[str, None, Optional[str]]:
+    """
+    Potens LLM 응답을 토큰(조각) 단위로 yield 합니다. 텍스트 응답 전용.
+    끝까지 받은 전체 텍스트는 _call_potens_llm과 같은 캐시에 저장되어 재호출 시 즉시 반환됩니다.
+    반환값(StopIteration.value): 끝까지 받았으면 전체 텍스트, 오류로 끊겼으면 None
+    """
+    ttl = LLM_CACHE_TTLS.get(op, LLM_CACHE_TTLS["default"])
+    key = _llm_cache_key(prompt, False)
+    if ttl > 0:
+        hit, cached = _llm_cache.get(key, tag=op)
+        if hit:
+            yield cached
+            return cached
+
+    parts: List[str] = []
+    try:
+        # 스트림이 끝날 때까지 스케줄러 슬롯을 잡고 있음 (중간에 멈춰도 with가 반환)
+        with _llm_scheduler.slot(_priority_for(op), timeout=LLM_QUEUE_TIMEOUT):
+            probe = _llm_breaker.before_call()
+            try:
+                with _session_post(
+                    POTENS_API_URL,
+                    json={"prompt": prompt, "stream": True},
+                    timeout=(REQUEST_TIMEOUT_CONNECT, STREAM_READ_TIMEOUT),
+                    stream=True,
+                ) as response:
+                    if response.status_code == 429:
+                        _throttle_from(response)
+                    response.raise_for_status()
+                    for delta in _iter_stream_response(response):
+                        parts.append(delta)
+                        yield delta
+            except GeneratorExit:
+                # 소비자가 중간에 멈춤 → 성공도 장애도 아님: half-open 시험 슬롯만 반환 (브레이커 상태는 그대로)
+                _llm_breaker.release_probe(probe)
+                raise
+            except Exception as e:
+                if _is_upstream_failure(e):
+                    _llm_breaker.record_failure()
+                else:
+                    _llm_breaker.record_success(probe)
+                raise
+            _llm_breaker.record_success(probe)
+    except (CircuitOpenError, TimeoutError, requests.RequestException, ValueError) as e:
+        st.error(f"LLM 스트리밍 호출 중 오류: {e}")
+        if not parts:
+            yield f"오류: {e}"
+        return None
+
+    text = "".join(parts).strip()
+    if ttl > 0 and text:
+        _llm_cache.set(key, text, ttl)
+    return text
+
+# ========== 비동기 호출기 ==========
+# 네트워크 I/O는 공용 세션을 쓰는 스레드 풀에서 돌리고, 호출부는 한 이벤트 루프에서 asyncio.gather로 동시에 기다린다.
+_async_executor: Optional[ThreadPoolExecutor] = None
+_async_executor_lock = threading.Lock()
+
+def _get_async_executor() -> ThreadPoolExecutor:
+    global _async_executor
+    if _async_executor is None:
+        with _async_executor_lock:
+            if _async_executor is None:
+                _async_executor = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix="potens-async")
+    return _async_executor
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+
+def _attach_script_run_ctx(ctx):
+    # 워커 스레드에서도 st.error 등이 현재 세션에 그려지도록 컨텍스트 전달
+    if ctx is None:
+        return
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    except Exception:
+        pass
+
+async def _run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    ctx = _script_run_ctx()
+
+    def _call():
+        _attach_script_run_ctx(ctx)
+        return fn(*args, **kwargs)
+
+    return await loop.run_in_executor(_get_async_executor(), _call)
+
+async def async_call_potens_llm(prompt: str, is_json: bool = False, op: str = "default", quiet: bool = False) -> Union[dict, str]:
+    """_call_potens_llm의 비동기 버전 (같은 커넥션 풀/캐시 사용)"""
+    return await _run_blocking(_call_potens_llm, prompt, is_json, op, quiet)
+
+def run_concurrently(*aws) -> list:
+    """
+    여러 코루틴을 하나의 이벤트 루프에서 동시에 실행하고 결과를 순서대로 반환합니다.
+    예) summary, alert = run_concurrently(agenerate_approval_summary(t), agenerate_next_step_alert(d))
+    """
+    async def _gather():
+        return await asyncio.gather(*aws)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Streamlit 스크립트 스레드에는 루프가 없으므로 바로 실행
+        return asyncio.run(_gather())
+    # 이미 루프가 돌고 있는 스레드라면 별도 스레드에서 실행
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, _gather()).result()
+
 # def _llm_call(
 #     prompt: Optional[str] = None,
 #     messages: Optional[List[Dict[str, str]]] = None,
@@ -125,10 +532,7 @@ def _call_potens_llm(prompt: str, is_json: bool = False) -> Union[dict, str]:
 
 # ========== 기능 함수들 ==========
 # 1) 템플릿 분류
-def infer_doc_type(user_utterance: str, templates: list[dict]) -> str:
-    """
-    사용자의 발화를 분석하여 가장 적합한 문서 종류(type)를 분류합니다.
-    """
+def _infer_doc_type_prompt(user_utterance: str, templates: list[dict]) -> str:
     template_options = [t['type'] for t in templates]
 
     prompt = f"""
@@ -146,10 +550,42 @@ def infer_doc_type(user_utterance: str, templates: list[dict]) -> str:
     - 반드시 '선택 가능 서식'에 있는 이름 중 하나로만 대답해야 합니다.
     - 다른 설명 없이 서식의 이름만 출력하세요.
     """
-    doc_type = _call_potens_llm(prompt)
-    return doc_type.strip()
+    return prompt
 
-def analyze_request_and_ask(user_utterance: str, template: dict) -> dict:
+# 로컬 분류기가 이 확률 이상으로 확신하면 LLM 호출 생략
+DOC_TYPE_LOCAL_THRESHOLD = float(_secret("DOC_TYPE_LOCAL_THRESHOLD", "0.9"))
+
+def fast_doc_type(user_utterance: str, templates: list[dict]) -> Optional[str]:
+    """로컬 n-gram 분류기로 즉시 분류. 확신이 부족하면 None (LLM 필요)"""
+    label, conf = predict_doc_type(user_utterance, [t['type'] for t in templates])
+    if label and conf >= DOC_TYPE_LOCAL_THRESHOLD:
+        record_doc_type_decision(label, None)
+        return label
+    return None
+
+def record_llm_doc_type(user_utterance: str, templates: list[dict], llm_doc_type: str):
+    """LLM이 정한 doc_type을 로컬 예측과 비교해 불일치율 지표에 반영"""
+    label, _ = predict_doc_type(user_utterance, [t['type'] for t in templates])
+    record_doc_type_decision(label, llm_doc_type)
+
+def infer_doc_type(user_utterance: str, templates: list[dict]) -> str:
+    """사용자의 발화를 분석하여 가장 적합한 문서 종류(type)를 분류합니다."""
+    fast = fast_doc_type(user_utterance, templates)
+    if fast:
+        return fast
+    doc_type = _call_potens_llm(_infer_doc_type_prompt(user_utterance, templates), op="infer_doc_type").strip()
+    record_llm_doc_type(user_utterance, templates, doc_type)
+    return doc_type
+
+async def ainfer_doc_type(user_utterance: str, templates: list[dict]) -> str:
+    fast = fast_doc_type(user_utterance, templates)
+    if fast:
+        return fast
+    doc_type = (await async_call_potens_llm(_infer_doc_type_prompt(user_utterance, templates), op="infer_doc_type")).strip()
+    record_llm_doc_type(user_utterance, templates, doc_type)
+    return doc_type
+
+def _analyze_request_and_ask_prompt(user_utterance: str, template: dict) -> str:
     prompt = f"""
     ## 역할
     당신은 회사의 다양한 행정 문서(품의서, 출장계, 기안서 등)를 작성하도록 돕는 AI 어시스턴트입니다.
@@ -197,18 +633,101 @@ def analyze_request_and_ask(user_utterance: str, template: dict) -> dict:
     ## 사용자 발화
     "{user_utterance}"
     """
-    return _call_potens_llm(prompt, is_json=True)
+    return prompt
+
+def analyze_request_and_ask(user_utterance: str, template: dict) -> dict:
+    return _call_potens_llm(_analyze_request_and_ask_prompt(user_utterance, template), is_json=True, op="analyze_request_and_ask")
+
+async def aanalyze_request_and_ask(user_utterance: str, template: dict) -> dict:
+    return await async_call_potens_llm(_analyze_request_and_ask_prompt(user_utterance, template), is_json=True, op="analyze_request_and_ask")
+
+# 2-a) 분류 + 첫 발화 분석을 한 번의 호출로 (compose initial 단계용)
+# 서식별 작성 가이드는 앞부분만 넣음 (서식 수만큼 프롬프트가 길어지므로). 2단계 경로는 고른 서식의 가이드 전체를 넣음
+COMBINED_GUIDE_MAX_CHARS = int(_secret("COMBINED_GUIDE_MAX_CHARS", "600"))
+
+def _classify_and_analyze_prompt(user_utterance: str, templates: list[dict]) -> str:
+    catalog = []
+    for t in templates:
+        entry = {"type": t["type"], "fields": t.get("fields")}
+        guide = (t.get("guide_md") or "").strip()
+        if guide and COMBINED_GUIDE_MAX_CHARS > 0:
+            entry["guide"] = guide[:COMBINED_GUIDE_MAX_CHARS]
+        catalog.append(entry)
+
+    prompt = f"""
+    ## 역할
+    당신은 직원의 요청을 듣고 알맞은 업무 서식을 고른 뒤, 그 서식 작성을 돕는 AI 어시스턴트입니다.
+
+    ## 임무
+    1. 사용자 요청에 가장 알맞은 서식을 아래 '선택 가능 서식' 중 하나 골라 `doc_type`에 넣으세요.
+    2. 고른 서식의 필드 중 사용자의 발화에서 추출 가능한 값은 모두 `filled_fields`에 채우세요.
+       - 숫자, 금액, 날짜, 기간, 인원수 등은 직접 계산하거나 변환해 기록하세요. (예: "100만원" → 1000000)
+    3. 여전히 비어 있는 필드는 `missing_fields`에 나열하고, 각 필드마다 친근하고 정중한 질문을 `ask`에 만드세요.
+
+    ## 선택 가능 서식 (type, 필드 목록, 작성 가이드 요약)
+    {json.dumps(catalog, ensure_ascii=False)}
+    - `guide`가 있으면 서식 선택과 값 채우기/질문 작성에 참고하세요.
+
+    ## 출력 규칙
+    - 출력은 반드시 **순수 JSON**만 반환하세요. 설명 문장은 포함하지 마세요.
+    - `doc_type`은 반드시 '선택 가능 서식'의 type 중 하나와 정확히 같아야 합니다.
+    - `ask`의 각 항목은 {{ "key": "필드명", "question": "자연스러운 질문" }} 형식입니다.
+    - 날짜는 ISO8601 형식("YYYY-MM-DD") 권장.
+
+    ## 출력 예시
+    {{
+      "doc_type": "품의",
+      "filled_fields": {{ "금액": "1200000", "사유": "장비 구매" }},
+      "missing_fields": ["근거", "기한"],
+      "ask": [
+        {{ "key": "근거", "question": "이 품의의 근거가 되는 자료가 있으신가요?" }},
+        {{ "key": "기한", "question": "언제까지 필요하신가요?" }}
+      ]
+    }}
+
+    ## 사용자 발화
+    "{user_utterance}"
+    """
+    return prompt
+
+def _validate_classify_and_analyze(res: Any, templates: list[dict]) -> Optional[dict]:
+    """통합 응답 스키마 검증. 통과하면 정규화된 dict, 아니면 None"""
+    if not isinstance(res, dict):
+        return None
+    obj = normalize_keys(res)
+    doc_type = str(obj.get("doc_type") or "").strip()
+    if doc_type not in {t["type"] for t in templates}:
+        return None
+    filled = obj.get("filled_fields", {})
+    missing = obj.get("missing_fields", [])
+    ask = obj.get("ask", [])
+    if not isinstance(filled, dict) or not isinstance(missing, list) or not isinstance(ask, list):
+        return None
+    return {"doc_type": doc_type, "filled_fields": filled, "missing_fields": missing, "ask": ask}
+
+def _checked_classify_and_analyze(res: Any, templates: list[dict]) -> Optional[dict]:
+    # 실패는 화면에 띄우지 않음 (호출부가 2단계 경로로 조용히 폴백) → 로그로만 추적
+    checked = _validate_classify_and_analyze(res, templates)
+    if checked is None:
+        print(f"⚠️ classify_and_analyze 응답 검증 실패 → 2단계 경로로 폴백: {str(res)[:200]}")
+    return checked
+
+def classify_and_analyze(user_utterance: str, templates: list[dict]) -> Optional[dict]:
+    """
+    infer_doc_type + analyze_request_and_ask 를 한 번의 LLM 왕복으로 처리합니다.
+    반환: {"doc_type", "filled_fields", "missing_fields", "ask"} / 검증 실패 시 None (호출부에서 2단계 경로로 폴백)
+    """
+    if not templates:
+        return None
+    res = _call_potens_llm(_classify_and_analyze_prompt(user_utterance, templates), is_json=True, op="classify_and_analyze", quiet=True)
+    return _checked_classify_and_analyze(res, templates)
+
+async def aclassify_and_analyze(user_utterance: str, templates: list[dict]) -> Optional[dict]:
+    if not templates:
+        return None
+    res = await async_call_potens_llm(_classify_and_analyze_prompt(user_utterance, templates), is_json=True, op="classify_and_analyze", quiet=True)
+    return _checked_classify_and_analyze(res, templates)
 
-def web_search_duckduckgo(query: str, max_results: int = 3) -> list[dict]:
-    """DuckDuckGo에서 웹검색 결과를 가져옵니다."""
-    try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            return results
-    except Exception as e:
-        print(f"❌ 검색 오류: {e}")
-        return []
-    
 # def infer_doc_type_and_fields(user_utterance: str, templates: List[dict]) -> dict:
 #     """
 #     우리 함수 호환: {"doc_type": str, "required": [str]}
@@ -282,7 +801,7 @@ def web_search_duckduckgo(query: str, max_results: int = 3) -> list[dict]:
 #         ]
 #     }
 
-def generate_confirm_text(filled_data: dict, template_type: str) -> str:
+def _confirm_text_prompt(filled_data: dict, template_type: str) -> str:
     prompt = f"""
     ## 역할
     당신은 회사 행정 문서를 정리해 대표에게 전달하는 비즈니스 보고서 작성자입니다.
@@ -309,11 +828,20 @@ def generate_confirm_text(filled_data: dict, template_type: str) -> str:
 
     **추가로 필요한 정보:** 출장 목적
     """
-    return _call_potens_llm(prompt)
+    return prompt
 
+def generate_confirm_text(filled_data: dict, template_type: str) -> str:
+    return _call_potens_llm(_confirm_text_prompt(filled_data, template_type), op="generate_confirm_text")
+
+async def agenerate_confirm_text(filled_data: dict, template_type: str) -> str:
+    return await async_call_potens_llm(_confirm_text_prompt(filled_data, template_type), op="generate_confirm_text")
+
+def stream_confirm_text(filled_data: dict, template_type: str) -> Generator[str, None, Optional[str]]:
+    """generate_confirm_text의 스트리밍 버전 (조각을 이어 붙이면 전체 보고서, 끊기면 반환값 None)"""
+    return stream_potens_llm(_confirm_text_prompt(filled_data, template_type), op="generate_confirm_text")
 
 # 4) 승인용 요약(LLM담당자)
-def generate_approval_summary(confirm_text: str) -> dict:
+def _approval_summary_prompt(confirm_text: str) -> str:
     prompt = f"""
     ## 역할
     당신은 요약 전문가입니다. 당신의 임무는 업무 보고서를 읽고, 바쁜 경영진을 위해 핵심만 요약하는 것입니다.
@@ -334,10 +862,107 @@ def generate_approval_summary(confirm_text: str) -> dict:
       "points": ["문자열", "문자열", "문자열"]
     }}
     """
-    return _call_potens_llm(prompt, is_json=True)
+    return prompt
+
+def generate_approval_summary(confirm_text: str) -> dict:
+    return _call_potens_llm(_approval_summary_prompt(confirm_text), is_json=True, op="generate_approval_summary")
+
+async def agenerate_approval_summary(confirm_text: str) -> dict:
+    return await async_call_potens_llm(_approval_summary_prompt(confirm_text), is_json=True, op="generate_approval_summary")
+
+# 4-1) 승인용 요약 일괄 생성 (프롬프트 변경/과거 데이터 백필용)
+# N건을 한 프롬프트에 번호를 붙여 넣고 {"items": [{"index", "title", "summary", "points"}]} 로 받는다.
+# 항목별로 검증해서 빠진/잘못된 항목만 청크를 반으로 나눠 재시도 → 1건까지 줄면 단건 프롬프트로 처리
+SUMMARY_BATCH_SIZE = int(_secret("SUMMARY_BATCH_SIZE", "8"))
+SUMMARY_BATCH_CONCURRENCY = int(_secret("SUMMARY_BATCH_CONCURRENCY", "4"))
+
+def _approval_summaries_batch_prompt(confirm_texts: list[str]) -> str:
+    reports = "\n\n".join(f"### 보고서 {i}\n{t}" for i, t in enumerate(confirm_texts))
+    prompt = f"""
+    ## 역할
+    당신은 요약 전문가입니다. 여러 건의 업무 보고서를 읽고, 바쁜 경영진을 위해 각각 핵심만 요약합니다.
+
+    ## 원본 보고서 ({len(confirm_texts)}건, 0번부터 번호)
+    {reports}
+
+    ## 임무
+    보고서마다 아래 키를 가진 항목을 하나씩 만들어 `items` 리스트에 넣으세요. (보고서끼리 내용을 섞지 마세요)
+    - `index`: 보고서 번호 (정수)
+    - `title`: 보고서의 핵심 내용을 담은 짧고 강력한 제목 (예: "프로젝트 A 장비 구매 건").
+    - `summary`: 한두 문장으로 된 요약.
+    - `points`: 의사결정에 가장 중요한 핵심 포인트 3가지를 담은 리스트.
+
+    ## JSON 출력 형식
+    {{
+      "items": [
+        {{ "index": 0, "title": "문자열", "summary": "문자열", "points": ["문자열", "문자열", "문자열"] }}
+      ]
+    }}
+    """
+    return prompt
+
+def _valid_summary(item: Any) -> bool:
+    return isinstance(item, dict) and isinstance(item.get("title"), str) and item["title"].strip() != "" \
+        and isinstance(item.get("summary", ""), str)
+
+def _summarize_chunk(chunk: list[tuple[int, str]], on_done=None) -> Dict[int, dict]:
+    """[(전역 번호, 본문)] → {전역 번호: 요약}. 실패한 항목은 반씩 나눠 재시도"""
+    if len(chunk) == 1:
+        idx, text = chunk[0]
+        res = generate_approval_summary(text)
+        if on_done:
+            on_done(1)
+        return {idx: res} if _valid_summary(res) else {}
+
+    res = _call_potens_llm(_approval_summaries_batch_prompt([t for _, t in chunk]), is_json=True,
+                           op="generate_approval_summaries_batch")
+    out: Dict[int, dict] = {}
+    for item in (res.get("items") if isinstance(res, dict) else None) or []:
+        local = item.get("index") if isinstance(item, dict) else None
+        if isinstance(local, str) and local.strip().isdigit():
+            local = int(local)
+        if isinstance(local, int) and 0 <= local < len(chunk) and _valid_summary(item):
+            out[chunk[local][0]] = {k: item[k] for k in ("title", "summary", "points") if k in item}
+    if on_done and out:
+        on_done(len(out))
+
+    failed = [c for c in chunk if c[0] not in out]
+    if failed:
+        print(f"⚠️ 요약 일괄 처리: {len(failed)}/{len(chunk)}건 재시도")
+        mid = (len(failed) + 1) // 2
+        for part in (failed[:mid], failed[mid:]):
+            if part:
+                out.update(_summarize_chunk(part, on_done))
+    return out
+
+def generate_approval_summaries_batch(confirm_texts: list[str], batch_size: Optional[int] = None,
+                                      on_progress=None) -> list[Optional[dict]]:
+    """
+    여러 보고서의 승인용 요약을 한 번에 생성합니다. 반환 순서 = 입력 순서 (끝내 실패한 항목은 None)
+    청크는 동시에 실행되고, 실제 호출은 전역 스케줄러(background 우선순위)가 속도를 제한합니다.
+    on_progress(완료 건수, 전체 건수)
+    """
+    size = max(1, batch_size or SUMMARY_BATCH_SIZE)
+    indexed = list(enumerate(confirm_texts))
+    chunks = [indexed[i:i + size] for i in range(0, len(indexed), size)]
+    total, done = len(indexed), [0]
+    lock = threading.Lock()
+
+    def _on_done(n: int):
+        with lock:
+            done[0] += n
+            current = done[0]
+        if on_progress:
+            on_progress(current, total)
+
+    results: Dict[int, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, SUMMARY_BATCH_CONCURRENCY), thread_name_prefix="summary-batch") as pool:
+        for part in pool.map(lambda c: _summarize_chunk(c, _on_done), chunks):
+            results.update(part)
+    return [results.get(i) for i in range(total)]
 
 # 5) 후속조치 알림(LLM담당자)
-def generate_next_step_alert(approved_data: dict) -> str:
+def _next_step_alert_prompt(approved_data: dict) -> str:
     prompt = f"""
     ## 상황
     '{approved_data.get('creator_name', '담당 직원')}'이(가) 제출한 '{approved_data.get('type', '요청')}' 요청이 방금 승인되었습니다.
@@ -356,10 +981,19 @@ def generate_next_step_alert(approved_data: dict) -> str:
     - 출장 경비 보고서 승인을 완료했습니다. **12월 20일까지** 회계팀에 김민준 님의 출장비 지급해야 합니다.
     - 연차 신청을 승인했습니다. 인사팀 근태 기록에 반영해 주세요.
     """
-    return _call_potens_llm(prompt)
+    return prompt
+
+def generate_next_step_alert(approved_data: dict, quiet: bool = False) -> str:
+    # quiet=True: 백그라운드 스레드에서 다듬을 때 (실패해도 화면에 띄우지 않고 템플릿 문구 유지)
+    return _call_potens_llm(_next_step_alert_prompt(approved_data), op="generate_next_step_alert", quiet=quiet)
+
+async def agenerate_next_step_alert(approved_data: dict) -> str:
+    return await async_call_potens_llm(_next_step_alert_prompt(approved_data), op="generate_next_step_alert")
 
 # 6) 컨펌 텍스트 검증(LLM담당자)
-def validate_confirm_text(confirm_text: str, required_fields: list) -> dict:
+def _validate_confirm_text_prompt(confirm_text: str, required_fields: list, checks: Optional[list] = None) -> str:
+    # checks: 규칙 검증이 판단하지 못한 항목만 LLM에 맡길 때 (나머지는 이미 확인됨)
+    focus = "" if not checks else "\n    ## 확인할 항목 (나머지는 이미 확인됨, 아래 항목만 판단)\n" + "\n".join(f"    - {c}" for c in checks) + "\n"
     prompt = f"""
     ## 역할
     당신은 매우 꼼꼼한 행정 문서 검수관입니다.
@@ -374,7 +1008,7 @@ def validate_confirm_text(confirm_text: str, required_fields: list) -> dict:
 
     ## 필수 항목 목록
     {required_fields}
-
+    {focus}
     ## 출력 규칙
     - 본문에 `[입력 필요]` 또는 필수 항목 값이 비어 있으면 `missing`에 해당 항목명을 넣으세요.
     - 논리적 오류가 있으면 `suggestion`에 수정 제안을 넣으세요.
@@ -389,14 +1023,52 @@ def validate_confirm_text(confirm_text: str, required_fields: list) -> dict:
       "suggestion": "수정 제안 문구 또는 빈 문자열"
     }}
     """
-    return _call_potens_llm(prompt, is_json=True)
+    return prompt
 
+def _merge_validation(rule_result: dict, llm_result: Any) -> dict:
+    if not isinstance(llm_result, dict) or not llm_result:
+        return rule_result   # LLM 실패 시 규칙 결과만
+    missing = rule_result["missing"] + [m for m in llm_result.get("missing") or [] if m not in rule_result["missing"]]
+    suggestion = " ".join(x for x in (rule_result["suggestion"], str(llm_result.get("suggestion") or "")) if x)
+    return {"is_valid": rule_result["is_valid"] and bool(llm_result.get("is_valid")) and not missing,
+            "missing": missing, "suggestion": suggestion}
+
+def _rule_precheck(required_fields: list, filled_fields: Optional[dict], doc_type: Optional[str]):
+    """(확정 결과 또는 None, 규칙 결과, LLM에 맡길 항목). filled_fields가 없으면 예전처럼 전부 LLM"""
+    if filled_fields is None:
+        record_validation(used_llm=True)
+        return None, None, None
+    result, undecided = validate_filled(filled_fields, required_fields, doc_type)
+    # 이미 무효이거나 규칙이 모두 판단했으면 LLM 호출 불필요
+    if not undecided or not result["is_valid"]:
+        record_validation(used_llm=False)
+        return result, result, None
+    record_validation(used_llm=True)
+    return None, result, undecided
+
+def validate_confirm_text(confirm_text: str, required_fields: list, filled_fields: Optional[dict] = None,
+                          doc_type: Optional[str] = None) -> dict:
+    """{is_valid, missing, suggestion}. filled_fields를 주면 규칙 검증 먼저, 규칙이 못 정한 항목만 LLM 확인"""
+    done, rule_result, checks = _rule_precheck(required_fields, filled_fields, doc_type)
+    if done is not None:
+        return done
+    res = _call_potens_llm(_validate_confirm_text_prompt(confirm_text, required_fields, checks), is_json=True, op="validate_confirm_text")
+    return _merge_validation(rule_result, res) if rule_result else res
+
+async def avalidate_confirm_text(confirm_text: str, required_fields: list, filled_fields: Optional[dict] = None,
+                                 doc_type: Optional[str] = None) -> dict:
+    done, rule_result, checks = _rule_precheck(required_fields, filled_fields, doc_type)
+    if done is not None:
+        return done
+    res = await async_call_potens_llm(_validate_confirm_text_prompt(confirm_text, required_fields, checks), is_json=True, op="validate_confirm_text")
+    return _merge_validation(rule_result, res) if rule_result else res
+
+def get_validation_stats() -> Dict[str, Any]:
+    """규칙 검증으로 LLM 호출을 피한 비율"""
+    return get_validation_rule_stats()
 
 # 7) 반려 안내문(LLM담당자)
-def generate_rejection_note(rejection_memo: str, creator_name: str, doc_title: str) -> str:
-    """
-    대표가 남긴 반려 메모를 바탕으로 직원에게 보낼 안내문 초안을 생성합니다.
-    """
+def _rejection_note_prompt(rejection_memo: str, creator_name: str, doc_title: str) -> str:
     prompt = f"""
     ## 역할
     당신은 감정적이지 않고 명확하게 의사를 전달하는 중간 관리자입니다.
@@ -421,15 +1093,31 @@ def generate_rejection_note(rejection_memo: str, creator_name: str, doc_title: s
     입력 메모: "예산 초과. 100만원 이하로 다시."
     출력 안내문: {creator_name}님, 요청하신 '{doc_title}' 건은 예산 초과 사유로 반려되었습니다. 대표님께서 100만원 이하로 예산을 재조정하여 다시 제출해달라고 요청하셨습니다.
     """
-    return _call_potens_llm(prompt)
+    return prompt
+
+def generate_rejection_note(rejection_memo: str, creator_name: str, doc_title: str, quiet: bool = False) -> str:
+    """대표가 남긴 반려 메모를 바탕으로 직원에게 보낼 안내문 초안을 생성합니다. (quiet: 백그라운드 다듬기용)"""
+    return _call_potens_llm(_rejection_note_prompt(rejection_memo, creator_name, doc_title), op="generate_rejection_note",
+                            quiet=quiet)
+
+async def agenerate_rejection_note(rejection_memo: str, creator_name: str, doc_title: str) -> str:
+    return await async_call_potens_llm(_rejection_note_prompt(rejection_memo, creator_name, doc_title), op="generate_rejection_note")
 
+def _ddgs_text(query: str, max_results: int) -> list[dict]:
+    # 설정된 검색 백엔드 (SEARCH_BACKEND, mypages/utils_search_backend.py)
+    return get_search_backend().text(query, max_results=max_results)
 
 def web_search_duckduckgo(query: str, max_results: int = 3) -> list[dict]:
     """DuckDuckGo에서 웹검색 결과를 가져옵니다."""
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            return results
+        from mypages.utils_search import cached_search   # utils_search._ddg_text와 같은 결과 캐시 공유
+        return cached_search(
+            query, None, None, max_results,
+            lambda: _search_flight.do((query, max_results), lambda: _ddgs_text(query, max_results)),
+        )
     except Exception as e:
         print(f"❌ 검색 오류: {e}")
-        return []
\ No newline at end of file
+        return []
+
+async def aweb_search_duckduckgo(query: str, max_results: int = 3) -> list[dict]:
+    return await _run_blocking(web_search_duckduckgo, query, max_results)
@@ -0,0 +1,7 @@
+-- templates.message_templates: 문서 종류별 반려 안내문/후속조치 알림 템플릿 (mypages/utils_messages.py)
+-- 예) {"rejection_note": "{creator_name}님, '{doc_title}' 건은 {memo} 사유로 반려되었습니다.",
+--      "next_step_alert": "'{doc_title}' 승인 — {due_date}까지 후속 조치를 진행해 주세요."}
+-- 자리표시자: {creator_name} {doc_title} {doc_type} {memo} {due_date}
+-- 컬럼이 없거나 값이 null이면 앱은 기본 템플릿을 씀 (이 마이그레이션 전에도 동작)
+alter table public.templates
+    add column if not exists message_templates jsonb;
@@ -0,0 +1,9 @@
+# tests/conftest.py
+# 저장소 루트를 import 경로에 추가하고, 로컬 캐시(SQLite/JSON) 경로를 테스트마다 임시 폴더로 돌림
+import os, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+os.environ.setdefault("COLLABNOTE_CACHE_DIR", tempfile.mkdtemp(prefix="collabnote-tests-"))
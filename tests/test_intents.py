@@ -0,0 +1,47 @@
+# tests/test_intents.py
+import pytest
+
+from mypages.utils_search import _INTENT_RX, DEFAULT_INTENT, detect_intent, rank_intents
+
+
+def test_no_keyword_falls_back_to_default_intent():
+    assert rank_intents("양자컴퓨터") == [(DEFAULT_INTENT, 1.0)]
+    assert rank_intents("") == [(DEFAULT_INTENT, 1.0)]
+
+@pytest.mark.parametrize("query, intent", [
+    ("아이폰 16 프로 얼마야?", "price"),
+    ("갤럭시 S25 울트라 스펙", "spec"),
+    ("근로기준법 시행령 연차 조항", "law"),
+    ("pandas KeyError 오류 해결", "devdoc"),
+    ("파이썬 설치 방법", "howto"),
+    ("LLM 요약 논문 arxiv", "academic"),
+    ("로지텍 MX Keys 최저가 쿠팡", "shop"),
+    ("오늘 환율 뉴스", "news"),
+])
+def test_top_intent(query, intent):
+    assert detect_intent(query) == intent
+    assert rank_intents(query)[0][0] == intent
+
+def test_keywords_match_case_insensitively():
+    assert detect_intent("MacBook Air PRICE") == "price"
+    assert detect_intent("What Is ERP") == "define"
+
+def test_shares_sum_to_one_and_are_sorted():
+    ranked = rank_intents("맥북 가격이랑 스펙, 구매 방법")
+    shares = [s for _, s in ranked]
+    assert shares == sorted(shares, reverse=True)
+    assert sum(shares) == pytest.approx(1.0, abs=0.01)
+    assert {i for i, _ in ranked} == {"price", "spec", "shop", "howto"}
+
+def test_ties_go_to_the_intent_mentioned_first():
+    assert [i for i, _ in rank_intents("가격 스펙")] == ["price", "spec"]
+    assert [i for i, _ in rank_intents("스펙 가격")] == ["spec", "price"]
+
+def test_weights_decide_order_not_keyword_count():
+    # law: 시행령(1.5) > price: 비용(0.8)
+    assert rank_intents("출장 비용 시행령")[0][0] == "law"
+
+def test_longest_keyword_wins_at_the_same_position():
+    # '법령'(1.2)이 '법'(0.6)으로, '최근 이슈'가 '최근'으로 잘리지 않아야 함
+    assert [m.group(0) for m in _INTENT_RX.finditer("법령 시행규칙")] == ["법령", "시행규칙"]
+    assert [m.group(0) for m in _INTENT_RX.finditer("최근 이슈 정리")] == ["최근 이슈"]
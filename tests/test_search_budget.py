@@ -0,0 +1,55 @@
+# tests/test_search_budget.py
+import threading, time
+
+import pytest
+
+from mypages import utils_search
+from mypages.utils_search import BudgetExhausted, SearchBudget, _ddg_text
+
+HIT = [{"title": "t", "href": "https://example.com", "body": "b"}]
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_once(query, region, timelimit, max_results):
+        calls.append(query)
+        release.wait(2)
+        return HIT
+
+    monkeypatch.setattr(utils_search, "_ddg_text_once", fake_once)
+    return calls, release
+
+def test_cache_hit_is_not_charged(backend):
+    calls, release = backend
+    release.set()
+    first, second = SearchBudget(10, 5), SearchBudget(10, 5)
+    assert _ddg_text("budget cache hit test", budget=first, intent="default") == HIT
+    assert _ddg_text("budget cache hit test", budget=second, intent="default") == HIT
+    assert calls == ["budget cache hit test"]
+    assert (first.calls, second.calls) == (1, 0)
+
+def test_coalesced_call_is_charged_only_to_leader(backend, monkeypatch):
+    calls, release = backend
+    monkeypatch.setitem(utils_search.SEARCH_CACHE_TTLS, "default", 0)
+    budgets = [SearchBudget(10, 5), SearchBudget(10, 5)]
+    threads = [threading.Thread(target=_ddg_text, args=("budget coalesce test",), kwargs={"budget": b, "intent": "default"})
+               for b in budgets]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == ["budget coalesce test"]
+    assert sorted(b.calls for b in budgets) == [0, 1]
+
+def test_exhausted_budget_stops_network_calls(backend):
+    calls, release = backend
+    release.set()
+    budget = SearchBudget(10, 0)
+    with pytest.raises(BudgetExhausted):
+        _ddg_text("budget exhausted test", budget=budget, intent="default")
+    assert calls == [] and budget.denied == 1
@@ -0,0 +1,76 @@
+# tests/test_search_cache.py
+import pytest
+
+from mypages import utils_cache, utils_search
+from mypages.utils_cache import TTLCache
+from mypages.utils_search import SEARCH_CACHE_NEGATIVE_TTL, SEARCH_CACHE_TTLS, cached_search
+
+HIT = [{"title": "t", "href": "https://example.com", "body": "b"}]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(utils_cache, "time", c)
+    monkeypatch.setattr(utils_search, "_search_cache", TTLCache("ddg-test"))
+    return c
+
+def _fetcher(result):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return result
+    return fetch, calls
+
+def _search(query, fetch, intent=None):
+    return cached_search(query, "kr-kr", None, 8, fetch, intent=intent)
+
+@pytest.mark.parametrize("query, intent", [("오늘 환율 뉴스", "news"), ("갤럭시 S25 울트라 스펙", "spec")])
+def test_ttl_follows_detected_intent(clock, query, intent):
+    fetch, calls = _fetcher(HIT)
+    assert _search(query, fetch) == HIT
+    clock.now += SEARCH_CACHE_TTLS[intent] - 1
+    assert _search(query, fetch) == HIT and len(calls) == 1
+    clock.now += 2
+    assert _search(query, fetch) == HIT and len(calls) == 2
+    assert utils_search._search_cache.stats()["by_tag"][intent] == {"hits": 1, "misses": 2}
+
+def test_empty_results_use_the_shorter_negative_ttl(clock):
+    fetch, calls = _fetcher([])
+    assert _search("양자컴퓨터 논문", fetch, intent="academic") == []
+    clock.now += SEARCH_CACHE_NEGATIVE_TTL - 1
+    assert _search("양자컴퓨터 논문", fetch, intent="academic") == [] and len(calls) == 1
+    clock.now += 2
+    _search("양자컴퓨터 논문", fetch, intent="academic")
+    assert len(calls) == 2
+
+def test_negative_ttl_never_exceeds_intent_ttl(clock, monkeypatch):
+    monkeypatch.setitem(SEARCH_CACHE_TTLS, "news", 60)
+    fetch, calls = _fetcher([])
+    _search("오늘 뉴스", fetch, intent="news")
+    clock.now += 61
+    _search("오늘 뉴스", fetch, intent="news")
+    assert len(calls) == 2
+
+def test_zero_ttl_disables_caching_and_errors_are_not_cached(clock, monkeypatch):
+    monkeypatch.setitem(SEARCH_CACHE_TTLS, "price", 0)
+    fetch, calls = _fetcher(HIT)
+    _search("아이폰 가격", fetch, intent="price")
+    _search("아이폰 가격", fetch, intent="price")
+    assert len(calls) == 2
+
+    def boom():
+        raise RuntimeError("ddg down")
+
+    with pytest.raises(RuntimeError):
+        _search("파이썬 설치 방법", boom, intent="howto")
+    fetch, calls = _fetcher(HIT)
+    assert _search("파이썬 설치 방법", fetch, intent="howto") == HIT and len(calls) == 1
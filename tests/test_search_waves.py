@@ -0,0 +1,36 @@
+# tests/test_search_waves.py
+import time
+
+from mypages import utils_search
+from mypages.utils_search import _search_waves
+
+HIT = [{"title": "t", "href": "https://example.com", "body": "b"}]
+
+
+def _run(monkeypatch, results):
+    """results[질의] = 'error' | 결과 리스트 — 웨이브 사이 백오프(sleep) 횟수와 함께 반환"""
+    sleeps = []
+    monkeypatch.setattr(utils_search, "SEARCH_WAVE_SIZE", 2)
+    monkeypatch.setattr(utils_search.time, "sleep", sleeps.append)
+
+    def fake_run(strategy, intent, budget):
+        out = results[strategy[0]]
+        if out == "error":
+            raise RuntimeError(f"{strategy[0]} failed")
+        return out, 1.0
+
+    monkeypatch.setattr(utils_search, "_run_strategy", fake_run)
+    strategies = [(q, "kr-kr", None, q) for q in results]
+    attempts, errors, outcomes = [], [], []
+    found = _search_waves(strategies, "default", attempts, errors, outcomes, time.monotonic() + 5)
+    return found, errors, sleeps
+
+def test_backoff_only_after_wave_with_errors(monkeypatch):
+    found, errors, sleeps = _run(monkeypatch, {"a": "error", "b": [], "c": [], "d": [], "e": HIT})
+    assert found == (HIT, 4)
+    assert len(errors) == 1
+    assert len(sleeps) == 1            # 1웨이브 오류 뒤에만 쉼, 오류 없던 2웨이브 뒤에는 바로 진행
+
+def test_no_backoff_without_errors(monkeypatch):
+    found, errors, sleeps = _run(monkeypatch, {"a": [], "b": [], "c": HIT})
+    assert found == (HIT, 2) and errors == [] and sleeps == []
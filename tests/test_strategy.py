@@ -0,0 +1,41 @@
+# tests/test_strategy.py
+import random
+
+from mypages.utils_strategy import StrategyStats
+
+STRATEGIES = [(f"q{i}", None, None, f"s{i}") for i in range(5)]
+
+
+def _stats(tmp_path, seed: int = 0) -> StrategyStats:
+    return StrategyStats(str(tmp_path / "stats.sqlite3"), rng=random.Random(seed))
+
+def _notes(order):
+    return [s[3] for s in order]
+
+def test_cold_start_keeps_original_order(tmp_path):
+    stats = _stats(tmp_path)
+    for seed in range(20):
+        stats._rng.seed(seed)
+        assert stats.order("price", STRATEGIES) == STRATEGIES
+
+def test_strategies_below_min_tries_keep_their_slots(tmp_path):
+    stats = _stats(tmp_path)
+    for _ in range(4):
+        stats.record("price", "s4", hit=True, latency_ms=10)
+    assert stats.order("price", STRATEGIES, min_tries=5) == STRATEGIES
+
+def test_warm_strategies_reorder_within_their_slots(tmp_path):
+    stats = _stats(tmp_path)
+    for _ in range(30):
+        stats.record("price", "s1", hit=False, latency_ms=10)
+        stats.record("price", "s3", hit=True, latency_ms=10)
+    assert _notes(stats.order("price", STRATEGIES, min_tries=5)) == ["s0", "s3", "s2", "s1", "s4"]
+    assert stats.order("news", STRATEGIES, min_tries=5) == STRATEGIES    # 의도별로 따로 학습
+
+def test_stats_survive_restart(tmp_path):
+    stats = _stats(tmp_path)
+    stats.record("price", "s2", hit=True, latency_ms=100)
+    stats.record_question("price", attempts=3, answered=True)
+    dump = _stats(tmp_path).dump("price")["price"]
+    assert dump["strategies"][0]["note"] == "s2" and dump["strategies"][0]["tries"] == 1
+    assert dump["avg_attempts_to_hit"] == 3.0
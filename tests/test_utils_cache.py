@@ -0,0 +1,76 @@
+# tests/test_utils_cache.py
+import pytest
+
+from mypages import utils_cache
+from mypages.utils_cache import TTLCache, cache_path
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(utils_cache, "time", c)
+    return c
+
+@pytest.fixture
+def db_path(request):
+    return cache_path(f"{request.node.name}.sqlite3")
+
+def test_entries_expire_after_ttl(clock, db_path):
+    cache = TTLCache("t", db_path=db_path)
+    cache.set("k", {"v": 1}, ttl=10)
+    assert cache.get("k") == (True, {"v": 1})
+    clock.now += 11
+    assert cache.get("k") == (False, None)
+    assert cache.stats()["mem_entries"] == 0 and cache.stats()["disk_entries"] == 0
+    cache.set("zero", 1, ttl=0)         # ttl<=0은 저장 안 함
+    assert cache.get("zero") == (False, None)
+
+def test_memory_lru_evicts_least_recently_used(clock):
+    cache = TTLCache("t", max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")                      # a를 최근 사용으로
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1) and cache.get("c") == (True, 3)
+    assert cache.stats()["evictions"] == 1
+
+def test_memory_miss_reads_from_sqlite(clock, db_path):
+    TTLCache("t", max_entries=1, db_path=db_path).set("k", ["x"], ttl=60)
+    fresh = TTLCache("t", db_path=db_path)      # 재시작한 프로세스
+    assert fresh.get("k") == (True, ["x"])
+    assert fresh.get("k") == (True, ["x"])      # 디스크 hit 뒤에는 메모리로 올라옴
+    stats = fresh.stats()
+    assert (stats["hits_disk"], stats["hits_mem"]) == (1, 1)
+    assert TTLCache("other", db_path=db_path).get("k") == (False, None)   # 이름(ns)별로 분리
+
+def test_disk_keeps_most_recently_accessed(clock, db_path):
+    cache = TTLCache("t", max_entries=1, db_path=db_path, max_disk_entries=2)
+    cache.set("a", 1, ttl=60)
+    clock.now += 1
+    cache.set("b", 2, ttl=60)
+    clock.now += 1
+    cache.get("a")                      # 디스크에서 a 접근 → b가 가장 오래됨
+    clock.now += 1
+    cache.set("c", 3, ttl=60)
+    fresh = TTLCache("t", db_path=db_path)
+    assert fresh.get("b") == (False, None)
+    assert fresh.get("a") == (True, 1) and fresh.get("c") == (True, 3)
+
+def test_stats_by_tag(clock):
+    cache = TTLCache("t")
+    cache.set("k", 1, ttl=60)
+    cache.get("k", tag="price")
+    cache.get("missing", tag="price")
+    cache.get("missing", tag="news")
+    cache.get("k")
+    stats = cache.stats()
+    assert stats["by_tag"] == {"price": {"hits": 1, "misses": 1}, "news": {"hits": 0, "misses": 1}}
+    assert stats["hit_rate"] == 0.5
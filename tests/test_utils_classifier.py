@@ -0,0 +1,71 @@
+# tests/test_utils_classifier.py
+import pytest
+
+from mypages import utils_classifier
+from mypages.utils_classifier import DocTypeClassifier
+
+TRAIN = {
+    "출장": ["다음 주 부산 출장 가요", "대전 지사 출장 신청", "서울 본사 출장 일정 잡아줘", "광주 고객사 출장 다녀옵니다",
+           "제주 출장 교통비 신청"],
+    "연차": ["금요일 연차 쓸게요", "다음 달 연차 신청합니다", "월요일 하루 연차 사용", "여름 휴가로 연차 3일",
+           "오후 반차 연차 신청"],
+    "품의": ["노트북 구매 품의 올립니다", "사무용품 구매 품의", "모니터 두 대 구매 요청", "소프트웨어 라이선스 구매 품의",
+           "회의실 의자 구매 품의서"],
+}
+
+
+def _samples(per_class: int = 5):
+    return [(t, label) for label, texts in TRAIN.items() for t in texts[:per_class]]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils_classifier, "MODEL_PATH", str(tmp_path / "nb.json"))
+    monkeypatch.setattr(utils_classifier, "SAMPLES_PATH", str(tmp_path / "samples.sqlite3"))
+    monkeypatch.setattr(utils_classifier, "_model", None)
+    monkeypatch.setattr(utils_classifier, "_model_mtime", None)
+    return tmp_path
+
+def test_confident_prediction_on_separable_data():
+    model = DocTypeClassifier().fit(_samples())
+    label, prob = model.predict("부산 출장 신청할게요", allowed=list(TRAIN))
+    assert label == "출장" and prob > 0.8
+    assert model.predict("노트북 구매하고 싶어요", allowed=list(TRAIN))[0] == "품의"
+
+def test_probabilities_are_calibrated_over_allowed_classes():
+    model = DocTypeClassifier().fit(_samples())
+    ranked = model.predict_proba("부산 출장 신청할게요", allowed=list(TRAIN) + ["회의록"])
+    assert abs(sum(p for _, p in ranked) - 1.0) < 1e-9
+    assert "회의록" in dict(ranked)                      # 학습 안 된 종류도 후보로 남음
+    # 아는 종류가 하나뿐이면 1.0이 아니고, 모델도 준비되지 않은 것으로 봄
+    only = DocTypeClassifier().fit([(t, "출장") for t in TRAIN["출장"]])
+    assert only.predict("출장", allowed=["출장", "연차"])[1] < 1.0
+    assert not only.is_ready_for(["출장", "연차"])
+    # 긴 문장이라도 겹치는 n-gram 때문에 0/1로 쏠리지 않음
+    long_text = " ".join(TRAIN["출장"])
+    assert model.predict(long_text, allowed=list(TRAIN))[1] < 0.9999
+
+def test_abstains_until_every_allowed_class_has_enough_samples(store, monkeypatch):
+    monkeypatch.setattr(utils_classifier, "MIN_SAMPLES_PER_CLASS", 5)
+    assert utils_classifier.predict_doc_type("부산 출장", allowed=list(TRAIN)) == (None, 0.0)   # 모델 없음
+
+    utils_classifier.retrain(_samples(per_class=4))
+    assert utils_classifier.predict_doc_type("부산 출장", allowed=list(TRAIN)) == (None, 0.0)
+
+    utils_classifier.retrain(_samples())
+    assert utils_classifier.predict_doc_type("부산 출장", allowed=list(TRAIN) + ["회의록"]) == (None, 0.0)
+    label, prob = utils_classifier.predict_doc_type("부산 출장 신청", allowed=list(TRAIN))
+    assert label == "출장" and prob > 0.5
+
+def test_retrain_round_trips_through_sample_store(store):
+    for text, label in _samples():
+        utils_classifier.record_sample(text, label)
+    utils_classifier.record_sample("", "출장")           # 빈 발화/종류는 저장 안 함
+    utils_classifier.record_sample("내용", "")
+    assert len(utils_classifier.load_samples()) == 15
+
+    info = utils_classifier.retrain()
+    assert info["samples"] == 15 and info["classes"] == {"출장": 5, "연차": 5, "품의": 5}
+    loaded = DocTypeClassifier.load(info["path"])
+    fresh = DocTypeClassifier().fit(_samples())
+    assert loaded.to_dict() == fresh.to_dict()
+    assert utils_classifier.get_model().predict("월요일 연차", allowed=list(TRAIN))[0] == "연차"
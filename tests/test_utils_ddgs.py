@@ -0,0 +1,116 @@
+# tests/test_utils_ddgs.py
+import inspect, threading, time
+
+import pytest
+
+from mypages import utils_ddgs, utils_search
+from mypages.utils_ddgs import DDGSPool
+from mypages.utils_search_backend import DDGBackend
+
+HIT = {"title": "t", "href": "https://example.com", "body": "b"}
+
+
+class FakeDDGS:
+    """ddgs 9.x DDGS.text와 같은 규칙: 질의는 위치 인자, 나머지는 키워드 (keywords=만 넘기면 TypeError)"""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+
+    def text(self, query, *, region="us-en", safesearch="moderate", timelimit=None, max_results=10, backend="auto"):
+        assert isinstance(region, str)
+        self.calls.append((query, region, timelimit, max_results))
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError("ddg error")
+        return [dict(HIT, title=query)]
+
+def _pool(**kwargs) -> DDGSPool:
+    made = []
+
+    def factory():
+        made.append(FakeDDGS())
+        return made[-1]
+
+    pool = DDGSPool(factory=factory, **kwargs)
+    pool.made = made
+    return pool
+
+def test_text_passes_query_positionally_and_drops_unset_options():
+    pool = _pool()
+    assert pool.text("파이썬", max_results=3) == [dict(HIT, title="파이썬")]
+    assert pool.text("뉴스", region="kr-kr", timelimit="d")[0]["title"] == "뉴스"
+    assert pool.made[0].calls == [("파이썬", "us-en", None, 3), ("뉴스", "kr-kr", "d", 10)]
+    with pytest.raises(TypeError):
+        FakeDDGS().text(keywords="파이썬")      # 예전 호출 방식은 실패해야 함
+
+def test_pool_call_matches_installed_ddgs_signature():
+    ddgs = pytest.importorskip("ddgs")
+    inspect.signature(ddgs.DDGS._search).bind(None, "text", "파이썬", region="kr-kr", safesearch="moderate",
+                                              timelimit="d", max_results=8)
+
+def test_web_search_goes_through_pool(monkeypatch):
+    # 회귀: 캐시 → 싱글 플라이트 → DDG 백엔드 → 풀까지 실제 경로로 검색이 되는지 (예전에는 TypeError)
+    pool = _pool()
+    monkeypatch.setattr(utils_ddgs, "_pool", pool)
+    monkeypatch.setattr(utils_search, "get_search_backend", lambda: DDGBackend())
+    monkeypatch.setitem(utils_search.SEARCH_CACHE_TTLS, "default", 0)
+    hits = utils_search._ddg_text("ddgs regression query", region="kr-kr", max_results=5, intent="default")
+    assert hits == [dict(HIT, title="ddgs regression query")]
+    assert pool.stats()["checkouts"] == 1
+
+def test_clients_are_reused_then_recycled_after_max_uses():
+    pool = _pool(max_uses=2)
+    for i in range(5):
+        pool.text(f"q{i}")
+    stats = pool.stats()
+    assert stats["created"] == 3 and stats["recycled"]["max_uses"] == 2
+    assert stats["reuse_rate"] == 0.4
+
+def test_clients_are_recycled_after_max_age():
+    pool = _pool(max_age=0.05)
+    pool.text("a")
+    pool.text("b")
+    time.sleep(0.06)
+    pool.text("c")
+    assert pool.stats()["created"] == 2 and pool.stats()["recycled"]["max_age"] == 1
+
+def test_slow_clients_are_recycled_by_median_latency(monkeypatch):
+    monkeypatch.setattr(utils_ddgs, "DDGS_SLOW_WINDOW", 3)
+    slow = FakeDDGS(latency=0.03)
+    made = []
+    pool = DDGSPool(slow_ms=20, factory=lambda: made.append(slow if not made else FakeDDGS()) or made[-1])
+    for i in range(3):
+        pool.text(f"q{i}")
+    pool.text("fast")
+    assert pool.stats()["recycled"]["slow"] == 1
+    assert made[-1].calls[-1][0] == "fast" and len(made) == 2
+
+def test_client_is_dropped_after_error():
+    clients = [FakeDDGS(fail=True), FakeDDGS()]
+    pool = DDGSPool(factory=lambda: clients.pop(0))
+    with pytest.raises(RuntimeError):
+        pool.text("a")
+    assert pool.text("b")[0]["title"] == "b"
+    stats = pool.stats()
+    assert stats["recycled"]["error"] == 1 and stats["created"] == 2 and stats["live"] == 1
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    pool = _pool(size=1)
+    release, entered = threading.Event(), threading.Event()
+
+    def hold():
+        with pool.client():
+            entered.set()
+            release.wait(2)
+
+    t = threading.Thread(target=hold)
+    t.start()
+    entered.wait(2)
+    with pytest.raises(TimeoutError):
+        with pool.client(timeout=0.05):
+            pass
+    release.set()
+    t.join()
+    assert pool.stats()["acquire_timeouts"] == 1
@@ -0,0 +1,99 @@
+# tests/test_utils_jobs.py
+import threading, time
+
+from mypages.utils_jobs import JobQueue
+
+
+def _status(q: JobQueue, job_id: int) -> str:
+    return q._conn().execute("SELECT status FROM jobs WHERE id=?", (job_id,)).fetchone()[0]
+
+def _wait_until(cond, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_job_runs_and_is_marked_done(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    seen = []
+    q.register("echo", lambda p: seen.append(p["n"]))
+    job_id = q.enqueue("echo", {"n": 1})
+    assert q.run_once()
+    assert seen == [1]
+    assert _status(q, job_id) == "done"
+    assert not q.run_once()
+
+def test_failed_job_is_retried_then_fails_with_callback(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.sqlite3"), max_attempts=2, retry_base=0.0)
+    failures = []
+
+    def boom(p):
+        raise ValueError("nope")
+
+    q.register("boom", boom, on_failure=lambda p, err: failures.append(err))
+    job_id = q.enqueue("boom", {})
+    assert q.drain(timeout=2)
+    assert _status(q, job_id) == "failed"
+    assert failures == ["ValueError: nope"]
+
+def test_drain_waits_for_jobs_running_on_another_worker(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    release = threading.Event()
+    worker = JobQueue(path)
+    worker.register("slow", lambda p: release.wait(5))
+    q = JobQueue(path)
+    job_id = q.enqueue("slow", {})
+    t = threading.Thread(target=worker.run_once)
+    t.start()
+    _wait_until(lambda: _status(q, job_id) == "running")
+
+    assert not q.drain(timeout=0.2)     # 대기열은 비었지만 아직 실행 중
+    release.set()
+    assert q.drain(timeout=2)
+    t.join()
+    assert _status(q, job_id) == "done"
+
+def test_slow_worker_cannot_overwrite_result_after_losing_lease(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    release = threading.Event()
+    failures = []
+
+    def slow_then_fail(p):
+        release.wait(5)
+        raise RuntimeError("late failure")
+
+    slow = JobQueue(path, lease=0.1, max_attempts=1)
+    slow.register("job", slow_then_fail, on_failure=lambda p, err: failures.append(err))
+    fast = JobQueue(path, lease=0.1)
+    fast.register("job", lambda p: None)
+
+    job_id = fast.enqueue("job", {})
+    t = threading.Thread(target=slow.run_once)
+    t.start()
+    _wait_until(lambda: _status(fast, job_id) == "running")
+    time.sleep(0.15)                     # 리스 만료 → 다른 워커가 다시 가져감
+    assert fast.run_once()
+    assert _status(fast, job_id) == "done"
+
+    release.set()
+    t.join()
+    assert _status(fast, job_id) == "done"
+    assert failures == []      # 리스를 잃은 워커는 실패 처리도 하지 않음
+
+def test_expired_lease_with_no_attempts_left_is_failed_not_rerun(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    runs, failures = [], []
+    q = JobQueue(path, lease=0.05, max_attempts=2)
+    q.register("crash", lambda p: runs.append(p), on_failure=lambda p, err: failures.append((p, err)))
+    job_id = q.enqueue("crash", {"n": 1})
+    for _ in range(2):
+        # 워커가 작업 도중 죽음 (OOM 등): 점유만 하고 결과를 남기지 못함
+        job, expired = q._claim()
+        assert job is not None and job[0] == job_id and expired == []
+        time.sleep(0.06)
+
+    assert q.run_once()                 # 시도를 다 쓴 만료 작업 → 실행하지 않고 실패 처리
+    assert runs == []
+    assert _status(q, job_id) == "failed"
+    assert failures and failures[0][0] == {"n": 1} and "리스 만료" in failures[0][1]
+    assert not q.run_once()
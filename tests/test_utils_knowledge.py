@@ -0,0 +1,98 @@
+# tests/test_utils_knowledge.py
+import threading, time
+
+from mypages import utils_knowledge
+from mypages.utils_knowledge import KnowledgeIndex, split_passages, tokenize
+
+GUIDE = """# 출장비
+출장비 한도는 1일 15만원이며 숙박비는 실비로 정산합니다.
+
+# 연차
+연차는 사용 3일 전까지 신청합니다."""
+
+APPROVAL = {"approval_id": "a1", "title": "부산 출장 품의", "confirm_text": "부산 지사 방문 법인카드 사용 승인",
+            "decided_at": "2025-01-02T00:00:00", "creator_id": "kim", "assignee": "lee"}
+
+
+def _index(templates=None, approvals=None) -> KnowledgeIndex:
+    idx = KnowledgeIndex()
+    idx.refresh(lambda: templates or [], lambda since: approvals or [], force=True)
+    return idx
+
+def test_tokenize_strips_josa_and_question_noise():
+    assert tokenize("출장비가 얼마야?") == tokenize("출장비")
+    assert tokenize("MacBook 1.5") == ["macbook", "1.5"]
+
+def test_split_passages_keeps_heading_context():
+    assert split_passages(GUIDE) == [
+        "출장비: 출장비 한도는 1일 15만원이며 숙박비는 실비로 정산합니다.",
+        "연차: 연차는 사용 3일 전까지 신청합니다.",
+    ]
+
+def test_search_ranks_matching_passage_with_normalized_score():
+    idx = _index(templates=[{"type": "출장보고서", "guide_md": GUIDE}])
+    hits = idx.search("출장비 한도가 얼마야?")
+    assert hits[0]["pid"] == "tpl:출장보고서:0"
+    assert 0.6 <= hits[0]["score"] <= 1.0
+    assert all(h["score"] < 0.6 for h in idx.search("사내 식당 메뉴 알려줘"))
+
+def test_refresh_reindexes_only_changed_or_removed_guides():
+    templates = [{"type": "출장보고서", "guide_md": GUIDE}, {"type": "회의록", "guide_md": "참석자와 결정 사항을 적습니다."}]
+    idx = _index(templates=templates)
+    assert idx.search("참석자 결정")[0]["pid"] == "tpl:회의록:0"
+
+    templates = [{"type": "출장보고서", "guide_md": "출장비는 실비 정산합니다."}]
+    idx.refresh(lambda: templates, lambda since: [], force=True)
+    assert sorted(idx.passages) == ["tpl:출장보고서:0"]
+    assert idx.search("참석자 결정") == []
+
+def test_refresh_fetches_approvals_since_last_decided_at():
+    idx = _index(approvals=[APPROVAL])
+    seen = []
+    idx.refresh(lambda: [], lambda since: seen.append(since) or [], force=True)
+    assert seen == ["2025-01-02T00:00:00"]
+
+def test_approval_passages_are_visible_only_to_creator_and_assignee():
+    idx = _index(approvals=[APPROVAL])
+    assert idx.search("부산 법인카드", viewer_id="kim")
+    assert idx.search("부산 법인카드", viewer_id="lee")
+    assert idx.search("부산 법인카드", viewer_id="park") == []
+    assert idx.search("부산 법인카드") == []
+
+def test_search_is_not_blocked_by_slow_refresh():
+    idx = _index(templates=[{"type": "출장보고서", "guide_md": GUIDE}])
+    release = threading.Event()
+
+    def slow_templates():
+        release.wait(5)
+        return []
+
+    t = threading.Thread(target=idx.refresh, args=(slow_templates, lambda since: []), kwargs={"force": True})
+    t.start()
+    t0 = time.perf_counter()
+    hits = idx.search("출장비 한도")
+    assert time.perf_counter() - t0 < 0.5
+    assert hits and hits[0]["pid"] == "tpl:출장보고서:0"     # 갱신 중에도 기존 인덱스로 답함
+    release.set()
+    t.join()
+
+def test_lookup_refreshes_in_background(monkeypatch):
+    idx = KnowledgeIndex()
+    release = threading.Event()
+
+    def slow_refresh():
+        release.wait(5)
+        idx.refresh(lambda: [{"type": "출장보고서", "guide_md": GUIDE}], lambda since: [], force=True)
+
+    monkeypatch.setattr(utils_knowledge, "_index", idx)
+    monkeypatch.setattr(utils_knowledge, "_refresh", slow_refresh)
+    monkeypatch.setattr(utils_knowledge, "_refresh_thread", None)
+    monkeypatch.setattr(utils_knowledge, "KNOWLEDGE_ENABLED", True)
+    monkeypatch.setattr(utils_knowledge, "KNOWLEDGE_FIRST_BUILD_WAIT_SEC", 0.05)
+
+    t0 = time.perf_counter()
+    assert utils_knowledge.lookup("출장비 한도") == []      # 첫 색인이 늦으면 잠깐만 기다리고 빈 결과
+    assert time.perf_counter() - t0 < 1.0
+    release.set()
+    utils_knowledge._refresh_thread.join(2)
+    assert utils_knowledge.lookup("출장비 한도")[0]["pid"] == "tpl:출장보고서:0"
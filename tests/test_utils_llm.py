@@ -0,0 +1,55 @@
+# tests/test_utils_llm.py
+from mypages.utils_llm import JsonExtractor, repair_json, try_parse_json
+
+
+def test_repair_json_clean_object_needs_no_repair():
+    ok, obj, repairs = repair_json('{"a": 1}')
+    assert ok and obj == {"a": 1} and repairs == []
+
+def test_repair_json_fixes_python_literals_quotes_and_trailing_commas():
+    ok, obj, repairs = repair_json("{'a': True, 'b': None, 'c': [1, 2,],}")
+    assert ok
+    assert obj == {"a": True, "b": None, "c": [1, 2]}
+    assert "trailing_commas" in repairs
+
+def test_repair_json_closes_truncated_object():
+    ok, obj, repairs = repair_json('{"title": "승인", "items": [1, 2', truncated=True)
+    assert ok
+    assert obj["title"] == "승인"
+    assert "truncated" in repairs
+
+def test_repair_json_gives_up_on_garbage():
+    ok, obj, _ = repair_json("{not json at all")
+    assert not ok and obj is None
+
+def test_try_parse_json_skips_preamble_and_fence():
+    text = '설명입니다.\n```json\n{"key": "금액", "value": "1000"}\n```'
+    ok, obj = try_parse_json(text, schema={"key": str, "value": object})
+    assert ok and obj == {"key": "금액", "value": "1000"}
+
+def test_try_parse_json_picks_first_object_matching_schema():
+    text = '예시: {"foo": 1} 실제: {"is_valid": true}'
+    ok, obj = try_parse_json(text, schema={"is_valid": bool})
+    assert ok and obj == {"is_valid": True}
+
+def test_try_parse_json_reports_schema_mismatch():
+    ok, obj = try_parse_json('{"is_valid": "yes"}', schema={"is_valid": bool}, op="test_schema")
+    assert not ok and obj is None
+
+def test_extractor_finds_object_split_across_chunks():
+    ex = JsonExtractor()
+    assert not ex.feed('응답: {"title": "승')
+    assert not ex.feed('인 요청", "summary": "요')
+    assert ex.feed('약"} 끝')
+    assert ex.close() == (True, {"title": "승인 요청", "summary": "요약"})
+
+def test_extractor_ignores_braces_inside_strings():
+    ex = JsonExtractor()
+    ex.feed('{"text": "중괄호 } 포함", "n": 1}')
+    assert ex.close() == (True, {"text": "중괄호 } 포함", "n": 1})
+
+def test_extractor_recovers_truncated_stream_on_close():
+    ex = JsonExtractor()
+    ex.feed('{"title": "제목", "summary": "잘린')
+    ok, obj = ex.close()
+    assert ok and obj["title"] == "제목"
@@ -0,0 +1,61 @@
+# tests/test_utils_messages.py
+import threading
+
+import pytest
+
+from mypages import utils_messages
+from mypages.utils_messages import polish_in_background, render_message
+
+CTX = {"creator_name": "김철수", "doc_title": "부산 출장", "memo": "영수증 누락", "due_date": None}
+
+
+def _loader(templates):
+    return lambda doc_type: {"type": doc_type, "message_templates": templates}
+
+def test_db_template_wins_over_defaults():
+    text = render_message("rejection_note", "출장-db", CTX, loader=_loader({"rejection_note": "{creator_name}: {memo}"}))
+    assert text == "김철수: 영수증 누락"
+
+def test_doc_type_default_then_common_default():
+    assert render_message("next_step_alert", "연차", CTX) == "김철수님의 연차 신청을 승인했습니다. 인사팀 근태 기록에 반영해 주세요."
+    # due_date가 없으면 '미정'
+    assert render_message("next_step_alert", "기타", CTX) == "'부산 출장' 요청을 승인했습니다. 미정까지 후속 조치를 진행해 주세요."
+
+def test_missing_column_or_failing_loader_uses_defaults():
+    expected = render_message("next_step_alert", "품의", CTX)
+    assert render_message("next_step_alert", "품의", CTX, loader=lambda t: {"type": t}) == expected
+
+    def broken(doc_type):
+        raise RuntimeError("db down")
+
+    assert render_message("next_step_alert", "품의-broken", CTX, loader=broken).startswith("'부산 출장'")
+
+@pytest.mark.parametrize("bad", ["{creator_name", "{0}", "{creator_name.upper}", "{memo[0]}", "{memo!z}"])
+def test_bad_db_template_falls_back_to_default(bad):
+    text = render_message("rejection_note", f"bad-{bad}", CTX, loader=_loader({"rejection_note": bad}))
+    assert text.startswith("김철수님, 요청하신 '부산 출장' 건은 다음 사유로 반려되었습니다: 영수증 누락")
+
+def test_polish_applied_within_deadline():
+    applied = []
+    polish_in_background(lambda: " 다듬은 문구 ", applied.append, deadline_sec=5).result(2)
+    assert applied == ["다듬은 문구"]
+
+def test_polish_after_deadline_is_dropped():
+    applied, release = [], threading.Event()
+    before = utils_messages.get_stats()["polish_late"]
+
+    def slow():
+        release.wait(2)
+        return "늦은 문구"
+
+    fut = polish_in_background(slow, applied.append, deadline_sec=0.05)
+    threading.Timer(0.1, release.set).start()
+    fut.result(3)
+    assert applied == []
+    assert utils_messages.get_stats()["polish_late"] == before + 1
+
+@pytest.mark.parametrize("generate", [lambda: "오류: timeout", lambda: "", lambda: 1 / 0])
+def test_polish_failure_keeps_template(generate):
+    applied = []
+    polish_in_background(generate, applied.append, deadline_sec=5).result(2)
+    assert applied == []
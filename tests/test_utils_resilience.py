@@ -0,0 +1,223 @@
+# tests/test_utils_resilience.py
+import threading, time
+
+import pytest
+
+from mypages.utils_resilience import CircuitBreaker, CircuitOpenError, Hedger, PriorityScheduler, SingleFlight
+
+
+def _wait_until(cond, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def _half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    breaker.before_call()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    return breaker
+
+def test_release_probe_frees_the_probe_without_closing():
+    breaker = _half_open_breaker()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()           # 시험 호출은 하나만
+    breaker.release_probe()             # 결과 없이 끝남 (스트림 중단 등)
+    assert breaker.state == "half_open"
+    breaker.before_call()               # 다음 시험 호출 가능
+
+def test_hedge_win_keeps_primary_slot_until_primary_finishes():
+    sched = PriorityScheduler("test", rate_per_sec=1000, burst=100, max_concurrency=2)
+    hedger = Hedger("test", initial_delay=0.05)
+    lock = threading.Lock()
+    inflight, peak = [0], [0]
+
+    def request(slow: bool):
+        with lock:
+            inflight[0] += 1
+            peak[0] = max(peak[0], inflight[0])
+        time.sleep(0.3 if slow else 0.01)
+        with lock:
+            inflight[0] -= 1
+        return "ok"
+
+    def one_call():
+        attempts = iter([True, False])     # 1차는 느리고 헤지는 빠름 → 헤지가 이김
+        with sched.acquire() as slot:
+            return hedger.call(lambda: request(next(attempts)), slot=slot, try_acquire=sched.try_slot)
+
+    for _ in range(3):      # 헤지가 이겨 돌아온 직후 다음 호출 (이전 1차는 아직 실행 중)
+        assert one_call() == "ok"
+    assert hedger.stats()["hedge_wins"] >= 1
+    assert peak[0] <= sched.max_concurrency
+    _wait_until(lambda: sched.stats()["active"] == 0)
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()            # 성공하면 연속 실패 초기화
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_half_open_probe_success_closes_and_failure_reopens():
+    breaker = _half_open_breaker()
+    assert breaker.before_call() is True
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.before_call() is True
+    breaker.record_success(probe=True)
+    assert breaker.state == "closed"
+    assert breaker.before_call() is False
+
+def test_slow_success_from_before_trip_does_not_close():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    slow = breaker.before_call()        # 느린 요청 시작 (closed)
+    breaker.before_call()
+    breaker.record_failure()            # 다른 요청 실패로 open
+    breaker.record_success(slow)        # 느린 요청이 뒤늦게 성공
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.record_success(slow)        # half_open에서도 시험 호출이 아니면 무시
+    assert breaker.state == "half_open"
+
+def test_breaker_call_counts_only_upstream_failures():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+
+    def bad_request():
+        raise ValueError("4xx")
+
+    with pytest.raises(ValueError):
+        breaker.call(bad_request, is_failure=lambda e: not isinstance(e, ValueError))
+    assert breaker.state == "closed"
+    with pytest.raises(RuntimeError):
+        breaker.call(lambda: (_ for _ in ()).throw(RuntimeError("5xx")))
+    assert breaker.state == "open"
+
+def test_hedge_fires_only_after_delay():
+    hedger = Hedger("test", initial_delay=0.2)
+    calls = []
+
+    def fast():
+        calls.append(time.monotonic())
+        return "ok"
+
+    assert hedger.call(fast) == "ok"
+    assert len(calls) == 1
+    stats = hedger.stats()
+    assert stats["hedges_fired"] == 0 and stats["primary_wins"] == 1
+
+def test_early_primary_failure_is_reraised_without_hedge():
+    hedger = Hedger("test", initial_delay=0.2)
+    calls = []
+
+    def boom():
+        calls.append(1)
+        raise RuntimeError("fail fast")
+
+    with pytest.raises(RuntimeError, match="fail fast"):
+        hedger.call(boom)
+    assert calls == [1]
+    assert hedger.stats()["primary_failed"] == 1 and hedger.stats()["hedges_fired"] == 0
+
+def test_first_success_wins_when_hedged():
+    hedger = Hedger("test", initial_delay=0.05)
+    attempts = iter([("primary", 0.5), ("hedge", 0.01)])
+
+    def request():
+        name, delay = next(attempts)
+        time.sleep(delay)
+        return name
+
+    t0 = time.monotonic()
+    assert hedger.call(request) == "hedge"
+    assert time.monotonic() - t0 < 0.4
+    assert hedger.stats()["hedge_wins"] == 1
+
+def test_hedge_skipped_without_free_slot_and_both_failed_reraises():
+    hedger = Hedger("test", initial_delay=0.05)
+
+    def slow_fail():
+        time.sleep(0.1)
+        raise RuntimeError("slow fail")
+
+    with pytest.raises(RuntimeError):
+        hedger.call(slow_fail, try_acquire=lambda: None)
+    assert hedger.stats()["hedges_skipped"] == 1
+    with pytest.raises(RuntimeError):
+        hedger.call(slow_fail)
+    assert hedger.stats()["both_failed"] == 1
+
+def _run_concurrently(flight: SingleFlight, key, fn, n: int = 5):
+    results, errors = [], []
+
+    def caller():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+def test_singleflight_runs_identical_concurrent_calls_once():
+    flight = SingleFlight("test")
+    release, runs = threading.Event(), []
+
+    def fn():
+        runs.append(1)
+        release.wait(2)
+        return "shared"
+
+    threads, results, errors = _run_concurrently(flight, "k", fn)
+    _wait_until(lambda: flight.stats()["calls"] == 5)
+    release.set()
+    for t in threads:
+        t.join()
+    assert runs == [1]
+    assert results == ["shared"] * 5 and errors == []
+    assert flight.stats()["executed"] == 1 and flight.stats()["coalesced"] == 4
+
+def test_singleflight_exception_reaches_every_waiter():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fn():
+        release.wait(2)
+        raise RuntimeError("upstream down")
+
+    threads, results, errors = _run_concurrently(flight, "k", fn)
+    _wait_until(lambda: flight.stats()["calls"] == 5)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == []
+    assert len(errors) == 5 and all(str(e) == "upstream down" for e in errors)
+
+def test_singleflight_frees_key_after_completion():
+    flight = SingleFlight("test")
+    runs = []
+    assert flight.do("k", lambda: runs.append(1) or len(runs)) == 1
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: runs.append(1) or len(runs)) == 2     # 끝난 뒤에는 새로 실행
+    assert flight.stats()["inflight"] == 0 and flight.stats()["coalesced"] == 0
+
+def test_singleflight_different_keys_run_independently():
+    flight = SingleFlight("test")
+    assert [flight.do(k, lambda k=k: k * 2) for k in (1, 2, 3)] == [2, 4, 6]
+    assert flight.stats()["executed"] == 3
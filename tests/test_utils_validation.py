@@ -0,0 +1,60 @@
+# tests/test_utils_validation.py
+from datetime import date
+
+import pytest
+
+from mypages.utils_validation import PLACEHOLDER, parse_amount, parse_date, validate_filled
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-12-03", date(2025, 12, 3)),
+    ("2025.12.3", date(2025, 12, 3)),
+    ("2025년 12월 3일", date(2025, 12, 3)),
+    ("12월 3일", date(2024, 12, 3)),
+    ("12/3", date(2024, 12, 3)),
+    ("다음 주쯤", None),
+    ("2025-02-30", None),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text, today=date(2024, 6, 1)) == expected
+
+@pytest.mark.parametrize("value, expected", [
+    ("1200000", 1_200_000),
+    ("1,200,000원", 1_200_000),
+    ("120만원", 1_200_000),
+    ("1억 2천만", 120_000_000),
+    ("-5만", -50_000),
+    ("무료", 0),
+    (300, 300),
+    ("견적서 참고", None),
+])
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+def test_missing_and_placeholder_fields_are_reported():
+    result, undecided = validate_filled({"사유": "장비 구매", "금액": PLACEHOLDER}, ["사유", "금액", "기한"])
+    assert not result["is_valid"]
+    assert result["missing"] == ["금액", "기한"]
+    assert undecided == []
+
+def test_end_date_before_start_date_is_a_problem():
+    result, _ = validate_filled({"시작일": "2025-12-10", "종료일": "2025-12-03"}, ["시작일", "종료일"])
+    assert not result["is_valid"]
+    assert "종료일" in result["suggestion"]
+
+def test_non_positive_amount_is_a_problem():
+    result, _ = validate_filled({"금액": "0원"}, ["금액"])
+    assert not result["is_valid"]
+    assert "0보다 큰 금액" in result["suggestion"]
+
+def test_unreadable_values_are_left_to_the_llm():
+    result, undecided = validate_filled({"시작일": "다음 주 월요일", "종료일": "그 주 금요일", "예상비용": "견적 후 확정"},
+                                        ["시작일", "종료일", "예상비용"])
+    assert result["is_valid"]
+    assert len(undecided) == 2
+
+def test_valid_document_passes_without_llm():
+    filled = {"출장지": "부산", "시작일": "2025-12-03", "종료일": "2025-12-04", "예상비용": "40만원"}
+    result, undecided = validate_filled(filled, list(filled), "출장")
+    assert result == {"is_valid": True, "missing": [], "suggestion": ""}
+    assert undecided == []
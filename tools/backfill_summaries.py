@@ -0,0 +1,68 @@
+# tools/backfill_summaries.py
+"""
+approvals.title/summary 일괄 재생성 (요약 프롬프트 변경, 과거 데이터 이관 후)
+- 기간(로컬 날짜, 양 끝 포함) 안의 승인 요청을 N건씩 묶어 generate_approval_summaries_batch로 처리
+- 진행 상황은 stderr, 최종 결과는 stdout(JSON)
+
+실행: python -m tools.backfill_summaries --start 2025-01-01 --end 2025-03-31 [--only-missing] [--dry-run]
+"""
+import sys, json, time, argparse
+from typing import Any, Dict, List, Optional
+
+PLACEHOLDER_TITLES = ("", "제목없음")
+
+def _progress(start: float):
+    def report(done: int, total: int):
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        print(f"\r[{done}/{total}] {done / total * 100:5.1f}%  {rate:.1f}건/s  ETA {eta:.0f}s",
+              end="" if done < total else "\n", file=sys.stderr, flush=True)
+    return report
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description="승인 요청 제목/요약 백필")
+    ap.add_argument("--start", required=True, help="시작 날짜 YYYY-MM-DD (포함)")
+    ap.add_argument("--end", required=True, help="끝 날짜 YYYY-MM-DD (포함)")
+    ap.add_argument("--tz-hours", type=int, default=9, help="날짜 경계 기준 시간대 (기본 KST)")
+    ap.add_argument("--only-missing", action="store_true", help="제목이 비었거나 '제목없음'인 건만")
+    ap.add_argument("--batch-size", type=int, help="한 프롬프트에 넣을 건수 (기본: SUMMARY_BATCH_SIZE)")
+    ap.add_argument("--dry-run", action="store_true", help="생성만 하고 DB에는 쓰지 않음")
+    args = ap.parse_args(argv)
+
+    import db, potens_client
+
+    rows = [r for r in db.get_approvals_between(args.start, args.end, args.tz_hours) if r.get("confirm_text")]
+    if args.only_missing:
+        rows = [r for r in rows if (r.get("title") or "").strip() in PLACEHOLDER_TITLES]
+    print(f"대상 {len(rows)}건 ({args.start} ~ {args.end})", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    summaries = potens_client.generate_approval_summaries_batch(
+        [r["confirm_text"] for r in rows], batch_size=args.batch_size, on_progress=_progress(t0),
+    ) if rows else []
+
+    updated, failed = 0, []
+    for row, res in zip(rows, summaries):
+        if not res:
+            failed.append(row["approval_id"])
+            continue
+        if not args.dry_run:
+            db.update_approval_summary(row["approval_id"], res.get("title", "제목없음"), res.get("summary", ""))
+        updated += 1
+
+    result = {
+        "targets": len(rows),
+        "updated": 0 if args.dry_run else updated,
+        "generated": updated,
+        "failed": failed,
+        "elapsed_sec": round(time.perf_counter() - t0, 2),
+        "dry_run": args.dry_run,
+        "scheduler": potens_client.get_scheduler_stats(),
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2, default=str))
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
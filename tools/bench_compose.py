@@ -0,0 +1,380 @@
+# tools/bench_compose.py
+"""
+문서 작성(compose) 흐름 E2E 벤치마크 — Streamlit 없이 단계별 지연 측정
+mypages/compose.py의 run_compose_page를 Streamlit 대역(FakeStreamlit)으로 그대로 실행해
+initial → gathering → confirm → submit 단계별 + 호출 함수(op:*)별 p50/p95/p99(ms)를 JSON으로 출력합니다.
+Supabase/Potens는 대역 사용. LLM 속도 제한은 --rate-per-sec으로 정하고 결과 config.rate_limit에 기록
+(앱 기본 5/s로 두면 단계 지연이 대부분 리미터 대기 시간이 됨). --baseline 으로 이전 결과와 비교
+
+실행: python -m tools.bench_compose --iterations 20 --latency-ms 200 --out bench.json
+"""
+import os, sys, json, time, tempfile, argparse
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.potens_standin import FaultInjector, echo_responder, start_standin
+
+# ------------------------------
+# 0) 시나리오 (첫 발화 + LLM이 채울 값 + 이어지는 답변)
+# ------------------------------
+SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "utterance": "다음 주 세미나 장비 구매로 120만원 품의 올리고 싶어요",
+        "doc_type": "품의",
+        "filled": {"금액": "1200000", "사유": "세미나 장비 구매"},
+        "answers": {"근거": "견적서 첨부", "기한": "2025-12-10", "승인선": "김대표"},
+    },
+    {
+        "utterance": "12월 24일부터 26일까지 연차 쓰겠습니다",
+        "doc_type": "연차",
+        "filled": {"시작일": "2025-12-24", "종료일": "2025-12-26"},
+        "answers": {"사유": "가족 여행"},
+    },
+    {
+        "utterance": "부산 고객사 미팅 출장 신청합니다",
+        "doc_type": "출장",
+        "filled": {"출장지": "부산"},
+        "answers": {"시작일": "2025-12-03", "종료일": "2025-12-04", "목적": "고객사 미팅", "예상비용": "400000"},
+    },
+]
+
+REPORT_TEXT = (
+    "### {doc_type} 보고\n"
+    "본 보고서는 **{doc_type}** 건에 대한 승인 요청입니다.  \n"
+    "주요 내용은 아래 입력값을 기준으로 정리되었습니다.  \n"
+    "{lines}\n"
+    "상기 내용을 바탕으로 승인을 요청드립니다."
+)
+
+def _find_scenario(prompt: str) -> Optional[Dict[str, Any]]:
+    return next((s for s in SCENARIOS if s["utterance"] in prompt), None)
+
+def scenario_responder(prompt: str) -> str:
+    """프롬프트 종류를 알아보고 시나리오에 맞는 결정적 응답을 반환 (대역 서버용)"""
+    sc = _find_scenario(prompt)
+    if "선택 가능 서식 (type," in prompt and sc:
+        return json.dumps(_analysis(sc, with_type=True), ensure_ascii=False)
+    if "'선택 가능 서식'" in prompt and sc:
+        return sc["doc_type"]
+    if "## 문서 템플릿" in prompt and sc:
+        return json.dumps(_analysis(sc), ensure_ascii=False)
+    if "비즈니스 보고서 작성자" in prompt:
+        sc = next((s for s in SCENARIOS if f"## 문서 종류\n    {s['doc_type']}\n" in prompt), SCENARIOS[0])
+        lines = "\n".join(f"- {k}: **{v}**" for k, v in {**sc["filled"], **sc["answers"]}.items())
+        return REPORT_TEXT.format(doc_type=sc["doc_type"], lines=lines)
+    if "요약 전문가" in prompt:
+        return json.dumps({"title": "승인 요청", "summary": "핵심 요약입니다."}, ensure_ascii=False)
+    return echo_responder(prompt)
+
+def _analysis(sc: Dict[str, Any], with_type: bool = False) -> Dict[str, Any]:
+    out = {
+        "filled_fields": sc["filled"],
+        "missing_fields": list(sc["answers"]),
+        "ask": [{"key": k, "question": f"{k}을(를) 알려주세요."} for k in sc["answers"]],
+    }
+    if with_type:
+        out = {"doc_type": sc["doc_type"], **out}
+    return out
+
+# ------------------------------
+# 1) 측정 도구
+# ------------------------------
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def measure(self, stage: str, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.samples[stage].append((time.perf_counter() - t0) * 1000)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: _summarize(v) for stage, v in self.samples.items()}
+
+def _percentile(sorted_vals: List[float], p: float) -> float:
+    # nearest-rank
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+def _summarize(vals: List[float]) -> Dict[str, float]:
+    s = sorted(vals)
+    return {
+        "n": len(s),
+        "mean_ms": round(sum(s) / len(s), 3) if s else 0.0,
+        "p50_ms": round(_percentile(s, 50), 3),
+        "p95_ms": round(_percentile(s, 95), 3),
+        "p99_ms": round(_percentile(s, 99), 3),
+        "max_ms": round(s[-1], 3) if s else 0.0,
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """단계별 p50/p95/p99 변화율(%) — 양수면 느려진 것"""
+    out = {}
+    for stage, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        out[stage] = {
+            key: (round((cur[key] - base[key]) / base[key] * 100, 1) if base.get(key) else None)
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        }
+    return out
+
+# ------------------------------
+# 2) compose 페이지 구동 (mypages/compose.py의 run_compose_page를 그대로 실행)
+# ------------------------------
+class _Rerun(Exception):
+    """st.rerun() — 스크립트 재실행 요청 (한 번의 사용자 입력 처리가 끝난 지점)"""
+
+class _SessionState(dict):
+    __getattr__ = dict.get
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+class _Placeholder:
+    """st.empty() 대역: 첫 markdown 시각을 기록 (스트리밍 첫 토큰 지연 측정)"""
+
+    def __init__(self, owner: "FakeStreamlit"):
+        self.owner = owner
+
+    def markdown(self, *args, **kwargs):
+        if self.owner.first_paint is None:
+            self.owner.first_paint = time.perf_counter()
+
+    def caption(self, *args, **kwargs):
+        pass
+
+    def empty(self):
+        pass
+
+class FakeStreamlit:
+    """
+    compose가 쓰는 Streamlit API만 흉내 내는 대역 (화면 출력은 버림)
+    - chat_input: 이번 실행에 넣을 사용자 입력 (한 번 읽으면 소진)
+    - button: clicks에 있는 라벨만 눌린 것으로 처리
+    - rerun: _Rerun 예외로 이번 실행 종료
+    """
+
+    def __init__(self):
+        self.session_state = _SessionState()
+        self.pending_input: Optional[str] = None
+        self.clicks: set = set()
+        self.first_paint: Optional[float] = None
+
+    def chat_input(self, *args, **kwargs) -> Optional[str]:
+        value, self.pending_input = self.pending_input, None
+        return value
+
+    def button(self, label: str, *args, **kwargs) -> bool:
+        return label in self.clicks
+
+    def rerun(self):
+        raise _Rerun()
+
+    def spinner(self, *args, **kwargs):
+        return nullcontext()
+
+    def columns(self, spec, *args, **kwargs):
+        return [nullcontext() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+    def empty(self) -> _Placeholder:
+        return _Placeholder(self)
+
+    def text_input(self, *args, **kwargs) -> str:
+        return ""
+
+    def _noop(self, *args, **kwargs):
+        return None
+
+    header = markdown = info = success = error = warning = text_area = write = caption = _noop
+
+def _run_page(compose, fake: FakeStreamlit, user: Dict[str, Any], user_input: Optional[str] = None,
+              click: Optional[str] = None) -> bool:
+    """run_compose_page 1회 실행 (= Streamlit 스크립트 실행 1번). st.rerun()으로 끝났으면 True"""
+    fake.pending_input = user_input
+    fake.clicks = {click} if click else set()
+    try:
+        compose.run_compose_page(user)
+    except _Rerun:
+        return True
+    return False
+
+def _timed_ops(timer: StageTimer, targets: List[Tuple[Any, str]]):
+    """compose가 부르는 함수를 시간 측정 래퍼로 감쌈 (실제 함수 호출은 그대로)"""
+    for obj, name in targets:
+        fn = getattr(obj, name)
+
+        def wrapper(*args, _fn=fn, _name=name, **kwargs):
+            return timer.measure(f"op:{_name}", _fn, *args, **kwargs)
+
+        setattr(obj, name, wrapper)
+
+def _stream_timed(fake: FakeStreamlit, timer: StageTimer, fn):
+    """stream_confirm_text: 첫 조각이 화면에 그려진 시각까지를 confirm_first_token으로 기록"""
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        fake.first_paint = None
+        text = yield from fn(*args, **kwargs)
+        if fake.first_paint is not None:
+            timer.samples["confirm_first_token"].append((fake.first_paint - t0) * 1000)
+        timer.samples["op:stream_confirm_text"].append((time.perf_counter() - t0) * 1000)
+        return text
+    return wrapper
+
+SUBMIT_BUTTON = "🚀 승인 요청 제출"
+MAX_GATHERING_TURNS = 20
+
+def run_flow(sc: Dict[str, Any], user: Dict[str, Any], timer: StageTimer, fake: FakeStreamlit):
+    """시나리오 1건: 첫 발화 → 질문마다 답변 → 확인(보고서 렌더) → 제출 버튼"""
+    from mypages import compose
+
+    fake.session_state.clear()
+    t_flow = time.perf_counter()
+    _run_page(compose, fake, user)                       # 첫 화면
+
+    timer.measure("initial", _run_page, compose, fake, user, sc["utterance"])
+    state = fake.session_state["compose_state"]
+    if state["stage"] == "initial":
+        raise RuntimeError(f"initial 단계 실패: {state['chat_history'][-1]['content']}")
+
+    turn = 0
+    while state["stage"] == "gathering":
+        turn += 1
+        if turn > MAX_GATHERING_TURNS:
+            raise RuntimeError(f"gathering이 끝나지 않음: last_asked={state.get('last_asked')!r}")
+        answer = sc["answers"].get(state.get("last_asked"), "해당 없음")
+        t0 = time.perf_counter()
+        _run_page(compose, fake, user, answer)
+        ms = (time.perf_counter() - t0) * 1000
+        timer.samples["gathering_turn"].append(ms)
+        timer.samples[f"gathering_turn_{turn}"].append(ms)
+
+    timer.measure("confirm", _run_page, compose, fake, user)          # 보고서 생성 + 렌더
+    timer.measure("submit", _run_page, compose, fake, user, None, SUBMIT_BUTTON)
+    if not fake.session_state.get("last_submit_success"):
+        raise RuntimeError("제출 실패")
+    timer.samples["total"].append((time.perf_counter() - t_flow) * 1000)
+
+def install(fake: FakeStreamlit, timer: StageTimer, path: str):
+    """compose 모듈의 st를 대역으로 바꾸고, 호출 함수에 op별 시간 측정 래퍼를 씌움"""
+    import db, potens_client
+    from mypages import compose
+
+    compose.st = fake
+    _timed_ops(timer, [
+        (db, "get_templates"), (db, "get_templates_by_type"), (db, "get_rag_context"),
+        (db, "create_draft"), (db, "submit_draft"),
+        (potens_client, "fast_doc_type"),
+        (compose, "classify_and_analyze"), (compose, "infer_doc_type"), (compose, "analyze_request_and_ask"),
+    ])
+    compose.stream_confirm_text = _stream_timed(fake, timer, potens_client.stream_confirm_text)
+    if path == "two-step":
+        # 통합 호출 검증 실패 시의 폴백 경로(infer_doc_type + analyze_request_and_ask)를 측정
+        compose.classify_and_analyze = lambda *a, **k: None
+
+# ------------------------------
+# 3) 실행
+# ------------------------------
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description="compose 흐름 단계별 지연 벤치마크")
+    ap.add_argument("--iterations", type=int, default=10, help="시나리오 전체 반복 횟수")
+    ap.add_argument("--warmup", type=int, default=1, help="측정에서 제외할 초기 반복 횟수")
+    ap.add_argument("--path", choices=["two-step", "combined"], default="combined",
+                    help="combined: 앱 기본 경로(로컬 분류기 + classify_and_analyze) / two-step: 통합 호출 실패 시 폴백 경로")
+    ap.add_argument("--cache", action="store_true", help="LLM 응답 캐시 사용 (기본: 끔 → 매번 대역 서버 호출)")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="대역 서버 응답 지연")
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--token-delay", type=float, default=0.0, help="스트리밍 토큰 간 지연(초)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rate-per-sec", type=float, default=1000.0,
+                    help="LLM 호출 속도 제한 (기본 1000: 리미터 대기 제외. 앱 설정대로 재려면 --rate-per-sec 5)")
+    ap.add_argument("--burst", type=int, help="토큰 버킷 크기 (기본: POTENS_RATE_BURST)")
+    ap.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    ap.add_argument("--out", help="결과 JSON 저장 경로 (없으면 stdout)")
+    args = ap.parse_args(argv)
+
+    # 대역 설정은 db/potens_client import 전에 환경변수로 주입
+    os.environ.setdefault("COLLABNOTE_CACHE_DIR", tempfile.mkdtemp(prefix="bench-compose-"))
+    os.environ["SUPABASE_URL"] = "standin://"
+    server = start_standin(
+        responder=scenario_responder,
+        token_delay=args.token_delay,
+        faults=FaultInjector(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed),
+    )
+    os.environ["POTENS_API_URL"] = server.url
+    os.environ.setdefault("POTENS_API_KEY", "standin")
+    os.environ["POTENS_RATE_PER_SEC"] = str(args.rate_per_sec)
+    if args.burst:
+        os.environ["POTENS_RATE_BURST"] = str(args.burst)
+
+    import db, potens_client
+    from mypages.utils_jobs import get_queue
+    db.start_job_workers()   # 앱(app.py)처럼 프로세스 내 요약 워커 실행
+    if not args.cache:
+        for op in potens_client.LLM_CACHE_TTLS:
+            potens_client.LLM_CACHE_TTLS[op] = 0
+
+    db.register_profile("벤치 직원", "bench-staff@example.com", "staff", "bench")
+    db.register_profile("벤치 대표", "bench-rep@example.com", "rep", "bench")
+    user = db.supabase.table("profiles").select("*").eq("email", "bench-staff@example.com").execute().data[0]
+
+    # 측정 래퍼는 하나의 timer에 기록 → 워밍업 뒤 비움
+    timer = StageTimer()
+    fake = FakeStreamlit()
+    install(fake, timer, args.path)
+    for _ in range(args.warmup):
+        for sc in SCENARIOS:
+            run_flow(sc, user, timer, fake)
+    timer.samples.clear()
+
+    t0 = time.perf_counter()
+    for _ in range(args.iterations):
+        for sc in SCENARIOS:
+            run_flow(sc, user, timer, fake)
+    wall = time.perf_counter() - t0
+    get_queue().drain(timeout=60)   # 제출 후 백그라운드 요약까지 끝난 뒤 지표 수집
+
+    result: Dict[str, Any] = {
+        "config": {
+            **{k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+            "rate_limit": {
+                "rate_per_sec": potens_client._llm_scheduler.rate,
+                "burst": potens_client._llm_scheduler.burst,
+                "max_concurrency": potens_client._llm_scheduler.max_concurrency,
+            },
+        },
+        "flows": args.iterations * len(SCENARIOS),
+        "wall_sec": round(wall, 3),
+        "stages": timer.summary(),
+        "client": {
+            "http": potens_client.get_http_stats(),
+            "llm_cache": potens_client.get_llm_cache_stats(),
+            "json_parse": potens_client.get_json_parse_stats(),
+            "resilience": potens_client.get_resilience_stats(),
+            "scheduler": potens_client._llm_scheduler.stats(),
+            "jobs": get_queue().stats(),
+        },
+        "standin": server.stats(),
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["vs_baseline_pct"] = compare(result, json.load(f))
+    server.shutdown()
+
+    text = json.dumps(result, ensure_ascii=False, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
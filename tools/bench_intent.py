@@ -0,0 +1,133 @@
+# tools/bench_intent.py
+"""
+의도 감지 마이크로 벤치마크 — 예전 방식(정규식 10개 순차, 첫 매칭) vs 한 번 스캔 가중 점수(rank_intents)
+- 실제 직원 질문 형태의 말뭉치로 질의당 지연(µs)과 두 방식의 1순위 의도가 달라지는 질의를 출력
+- 2순위 의도가 섞이는(멀티 의도) 질의 비율도 함께 보고
+
+실행: python -m tools.bench_intent --rounds 2000 [--corpus queries.txt] [--out bench_intent.json]
+"""
+import re, sys, json, time, argparse
+from typing import Any, Dict, List, Optional
+
+from mypages.utils_search import rank_intents, SECOND_INTENT_MIN_SHARE
+
+# 예전 detect_intent (dict 순서대로 첫 매칭) — 비교 기준
+LEGACY_INTENTS = {
+    "price":      re.compile(r"(가격|얼마|비용|cost|price|시세|견적)", re.I),
+    "spec":       re.compile(r"(스펙|사양|제원|spec|규격|성능|벤치|benchmark)", re.I),
+    "define":     re.compile(r"(정의|설명|무엇|what is|뜻|개념)", re.I),
+    "howto":      re.compile(r"(방법|하는 법|튜토리얼|설치|해결|troubleshoot|how to)", re.I),
+    "law":        re.compile(r"(법|법령|조항|규정|고시|법률|시행령|시행규칙)", re.I),
+    "wiki":       re.compile(r"(위키|wikipedia|백과)", re.I),
+    "news":       re.compile(r"(뉴스|보도|속보|최근 이슈|breaking|today|최근)", re.I),
+    "academic":   re.compile(r"(논문|paper|arxiv|학술|cite|레퍼런스)", re.I),
+    "shop":       re.compile(r"(구매|사다|최저가|쇼핑|buy|amazon|쿠팡|11번가|gmarket)", re.I),
+    "devdoc":     re.compile(r"(에러|오류|문법|docs|documentation|api|reference)", re.I),
+}
+
+def legacy_detect_intent(q: str) -> str:
+    for name, rx in LEGACY_INTENTS.items():
+        if rx.search(q):
+            return name
+    return "define"
+
+# 문서 작성 중 직원들이 실제로 물어본 질문 형태
+CORPUS: List[str] = [
+    "아이폰 16 프로 가격",
+    "아이폰 스펙 가격",
+    "맥북 프로 M4 스펙 성능 비교 가격",
+    "갤럭시 S25 울트라 사양",
+    "델 모니터 27인치 최저가",
+    "로지텍 MX Keys 쿠팡 구매",
+    "사무용 의자 견적 얼마",
+    "세미나 장비 렌탈 비용",
+    "근로기준법 연차 규정",
+    "근로기준법 시행령 연차 유급휴가 조항",
+    "출장비 지급 기준 법령",
+    "법인카드 사용 규정 설명",
+    "전자세금계산서 발행 방법",
+    "파이썬 설치 방법",
+    "윈도우 11 프린터 드라이버 설치 오류 해결 방법",
+    "엑셀 VLOOKUP 사용법 튜토리얼",
+    "판다스 문법 오류 해결 방법",
+    "streamlit api reference",
+    "supabase docs row level security",
+    "how to reset vpn password",
+    "what is zero trust network",
+    "ERP 뜻",
+    "품의서 개념 정의",
+    "결재선이 무엇인가요",
+    "오늘 환율 뉴스",
+    "최근 반도체 수출 속보",
+    "최근 이슈 AI 규제",
+    "LLM 요약 논문 arxiv",
+    "RAG 학술 레퍼런스",
+    "위키 백과 양자컴퓨터",
+    "양자컴퓨터",
+    "GPU 서버 벤치마크 성능",
+    "NAS 시놀로지 제원 가격 비교",
+    "회의실 예약 시스템 도입 비용 방법",
+    "연차 신청 방법",
+    "출장 숙박비 한도 규정",
+    "노트북 구매 품의 가격 스펙",
+    "4대보험 요율 고시",
+    "개인정보보호법 위반 사례 뉴스",
+    "AWS EC2 price per hour",
+]
+
+def _bench(fn, corpus: List[str], rounds: int) -> Dict[str, float]:
+    per_query: List[float] = []
+    for q in corpus:
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            fn(q)
+        per_query.append((time.perf_counter() - t0) / rounds * 1e6)
+    per_query.sort()
+    return {
+        "mean_us": round(sum(per_query) / len(per_query), 2),
+        "p50_us": round(per_query[len(per_query) // 2], 2),
+        "max_us": round(per_query[-1], 2),
+    }
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description="의도 감지 마이크로 벤치마크")
+    ap.add_argument("--rounds", type=int, default=2000, help="질의당 반복 횟수")
+    ap.add_argument("--corpus", help="질의 목록 파일 (한 줄에 하나, 없으면 내장 말뭉치)")
+    ap.add_argument("--out", help="결과 JSON 저장 경로 (없으면 stdout)")
+    args = ap.parse_args(argv)
+
+    corpus = CORPUS
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8") as f:
+            corpus = [line.strip() for line in f if line.strip()]
+
+    changed = []
+    multi = 0
+    for q in corpus:
+        ranked = rank_intents(q)
+        if len(ranked) > 1 and ranked[1][1] >= SECOND_INTENT_MIN_SHARE:
+            multi += 1
+        old = legacy_detect_intent(q)
+        if old != ranked[0][0]:
+            changed.append({"query": q, "legacy": old, "ranked": ranked})
+
+    result = {
+        "queries": len(corpus),
+        "rounds": args.rounds,
+        "legacy": _bench(legacy_detect_intent, corpus, args.rounds),
+        "single_pass": _bench(rank_intents, corpus, args.rounds),
+        "multi_intent_rate": round(multi / len(corpus), 3) if corpus else 0.0,
+        "top_intent_changed": changed,
+    }
+    out = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(out)
+        print(f"저장: {args.out}", file=sys.stderr)
+    else:
+        print(out)
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
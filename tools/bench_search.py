@@ -0,0 +1,123 @@
+# tools/bench_search.py
+"""
+answer_any_question 처리량 벤치마크 — 네트워크 없이 (검색: 대역 코퍼스, LLM: Potens 대역 서버, DB: 메모리 대역)
+질문 목록을 --concurrency 스레드로 반복 실행해 초당 처리량(qps), 질문당 지연 p50/p95/p99,
+답변 출처(knowledge/search/llm/partial) 분포, 질문당 검색 호출 수를 JSON으로 출력합니다.
+
+실행: python -m tools.bench_search --iterations 5 --concurrency 4 --search-latency-ms 150 --out bench_search.json
+"""
+import os, sys, json, time, tempfile, argparse, threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from tools.potens_standin import FaultInjector, echo_responder, start_standin
+from tools.bench_compose import _percentile
+
+# 직원들이 문서 작성 중 물어본 질문 형태 (사내 가이드로 답할 것 / 웹 검색 / 못 찾는 것 섞음)
+QUESTIONS: List[str] = [
+    "아이폰 16 프로 얼마야?",
+    "맥북 에어 가격 알려줘",
+    "갤럭시 S25 울트라 스펙",
+    "델 U2724D 모니터 최저가",
+    "로지텍 MX Keys S 가격",
+    "근로기준법 연차 규정",
+    "공무원 출장비 기준 법령",
+    "파이썬 설치 방법",
+    "pandas KeyError 오류 해결",
+    "streamlit api reference",
+    "양자컴퓨터가 뭐야",
+    "ERP 뜻",
+    "오늘 환율 뉴스",
+    "LLM 요약 논문 arxiv",
+    "시놀로지 DS923+ 가격",
+    "출장비 한도가 얼마야?",
+    "연차는 며칠 전에 신청해?",
+    "사내 식당 메뉴 알려줘",
+]
+
+def _run_one(compose, q: str, deadline: Optional[float], max_calls: Optional[int]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    res = compose.answer_any_question_planned(q, deadline_sec=deadline, max_calls=max_calls)
+    return {"q": q, "ms": (time.perf_counter() - t0) * 1000, "source": res["source"], "calls": res["calls"]}
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    ap = argparse.ArgumentParser(description="answer_any_question 오프라인 처리량 벤치마크")
+    ap.add_argument("--iterations", type=int, default=3, help="질문 목록 반복 횟수")
+    ap.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 질문 수")
+    ap.add_argument("--corpus", help="검색 대역 코퍼스 JSON (기본: tools/fixtures/search_corpus.json)")
+    ap.add_argument("--search-latency-ms", type=float, default=100.0, help="검색 대역 질의당 지연")
+    ap.add_argument("--search-jitter-ms", type=float, default=0.0)
+    ap.add_argument("--llm-latency-ms", type=float, default=300.0, help="Potens 대역 응답 지연")
+    ap.add_argument("--deadline-sec", type=float, help="질문당 제한 시간 (기본: ANSWER_DEADLINE_SEC)")
+    ap.add_argument("--max-calls", type=int, help="질문당 최대 검색 호출 수 (기본: ANSWER_MAX_CALLS)")
+    ap.add_argument("--cache", action="store_true", help="검색 결과 캐시 사용 (기본: 끔 → 매번 대역 호출)")
+    ap.add_argument("--no-knowledge", action="store_true", help="사내 자료 인덱스 건너뛰기")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="결과 JSON 저장 경로 (없으면 stdout)")
+    args = ap.parse_args(argv)
+
+    # 대역 설정은 관련 모듈 import 전에 환경변수로 주입
+    os.environ.setdefault("COLLABNOTE_CACHE_DIR", tempfile.mkdtemp(prefix="bench-search-"))
+    os.environ["SUPABASE_URL"] = "standin://"
+    os.environ["SEARCH_BACKEND"] = f"standin:{args.corpus}" if args.corpus else "standin"
+    os.environ["SEARCH_STANDIN_LATENCY_MS"] = str(args.search_latency_ms)
+    os.environ["SEARCH_STANDIN_JITTER_MS"] = str(args.search_jitter_ms)
+    os.environ["SEARCH_STANDIN_SEED"] = str(args.seed)
+    os.environ["SEARCH_CACHE_DISK"] = "false"
+    if args.no_knowledge:
+        os.environ["KNOWLEDGE_ENABLED"] = "false"
+    server = start_standin(
+        responder=echo_responder,
+        faults=FaultInjector(latency_ms=args.llm_latency_ms, seed=args.seed),
+    )
+    os.environ["POTENS_API_URL"] = server.url
+    os.environ.setdefault("POTENS_API_KEY", "standin")
+
+    from mypages import compose, utils_search, utils_knowledge
+    from mypages.utils_search_backend import get_backend
+    if not args.cache:
+        for intent in utils_search.SEARCH_CACHE_TTLS:
+            utils_search.SEARCH_CACHE_TTLS[intent] = 0
+
+    jobs = QUESTIONS * args.iterations
+    lock = threading.Lock()
+    rows: List[Dict[str, Any]] = []
+
+    def work(q: str):
+        r = _run_one(compose, q, args.deadline_sec, args.max_calls)
+        with lock:
+            rows.append(r)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency), thread_name_prefix="bench-search") as pool:
+        list(pool.map(work, jobs))
+    wall = time.perf_counter() - t0
+
+    latencies = sorted(r["ms"] for r in rows)
+    result: Dict[str, Any] = {
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "questions": len(rows),
+        "wall_sec": round(wall, 3),
+        "qps": round(len(rows) / wall, 2) if wall else 0.0,
+        "latency_ms": {p: round(_percentile(latencies, q), 1) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+        "sources": dict(Counter(r["source"] for r in rows)),
+        "avg_search_calls": round(sum(r["calls"] for r in rows) / len(rows), 2) if rows else 0.0,
+        "search_backend": get_backend().stats(),
+        "search_cache": utils_search.get_search_cache_stats(),
+        "knowledge": utils_knowledge.get_stats(),
+        "llm_standin": server.stats(),
+    }
+    server.shutdown()
+
+    text = json.dumps(result, ensure_ascii=False, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return result
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,276 @@
+# tools/potens_standin.py
+"""
+로컬 Potens 대역 서버 (오프라인 테스트/벤치마크용)
+- 계약: POST {"prompt": ...} -> {"message": ...}
+- {"stream": true} 이면 SSE(text/event-stream)로 토큰 단위 전송
+- 모드
+  * echo   : 프롬프트 해시 기반 결정적 응답 (기본)
+  * replay : JSONL 카세트({"prompt", "message"} 한 줄씩)에서 같은 프롬프트의 응답을 그대로 반환
+  * record : 실제 Potens(--upstream)로 전달하고 프롬프트/응답 쌍을 카세트에 추가
+- 장애 주입: --latency-ms/--jitter-ms, --error-rate(500), --rate-429 (모두 --seed로 재현 가능)
+실행: python -m tools.potens_standin --mode replay --cassette potens_cassette.jsonl --port 8765
+"""
+import os, re, json, time, random, hashlib, argparse, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+Responder = Callable[[str], str]
+
+def echo_responder(prompt: str) -> str:
+    """기본 응답: 프롬프트 해시 기반의 결정적 텍스트"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+    return f"### 로컬 응답\n요청 해시 **{digest}** 에 대한 결정적 응답입니다."
+
+def prompt_key(prompt: str) -> str:
+    # potens_client 캐시와 같은 정규화 (공백 차이는 같은 프롬프트로 취급)
+    normalized = re.sub(r"\s+", " ", prompt or "").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+# ------------------------------
+# 카세트 (JSONL 기록/재생)
+# ------------------------------
+class Cassette:
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._items: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    prompt = row.get("prompt")
+                    message = row.get("message", row.get("response"))
+                    if isinstance(prompt, str) and isinstance(message, str):
+                        self._items[prompt_key(prompt)] = message
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def lookup(self, prompt: str) -> Optional[str]:
+        return self._items.get(prompt_key(prompt))
+
+    def append(self, prompt: str, message: str):
+        with self._lock:
+            self._items[prompt_key(prompt)] = message
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"prompt": prompt, "message": message}, ensure_ascii=False) + "\n")
+
+def replay_responder(cassette: Cassette, on_miss: Optional[Responder] = None) -> Responder:
+    """카세트에 있으면 기록된 응답, 없으면 on_miss (없으면 KeyError → 404)"""
+    def respond(prompt: str) -> str:
+        hit = cassette.lookup(prompt)
+        if hit is not None:
+            return hit
+        if on_miss is None:
+            raise KeyError("prompt not in cassette")
+        return on_miss(prompt)
+    return respond
+
+def record_responder(cassette: Cassette, upstream_url: str, api_key: str, timeout: float = 60.0) -> Responder:
+    """실제 Potens로 전달하고 응답을 카세트에 기록"""
+    session = requests.Session()
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+
+    def respond(prompt: str) -> str:
+        r = session.post(upstream_url, headers=headers, json={"prompt": prompt}, timeout=timeout)
+        r.raise_for_status()
+        message = r.json().get("message", "")
+        cassette.append(prompt, message)
+        return message
+    return respond
+
+# ------------------------------
+# 장애/지연 주입 (seed 고정 시 요청 순서대로 재현)
+# ------------------------------
+class FaultInjector:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                 rate_429: float = 0.0, retry_after: float = 1.0, seed: Optional[int] = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """(지연 초, 주입할 상태 코드 또는 None)"""
+        with self._lock:
+            delay = (self.latency_ms + self._rng.uniform(0, self.jitter_ms)) / 1000.0
+            roll = self._rng.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, None
+
+def _tokenize(text: str):
+    # 공백을 보존하며 단어 단위로 쪼갬 (토큰 스트리밍 흉내)
+    buf = ""
+    for ch in text:
+        buf += ch
+        if ch in " \n":
+            yield buf
+            buf = ""
+    if buf:
+        yield buf
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 헤더/본문을 따로 쓰므로 Nagle을 끄지 않으면 keep-alive 연결에서 지연 ACK(~40ms)가 끼어듦
+    disable_nagle_algorithm = True
+    server: "StandinServer"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send_json(self, status: int, obj: dict):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_stream(self, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for tok in _tokenize(text):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            event = "data: " + json.dumps({"delta": tok}, ensure_ascii=False) + "\n\n"
+            self._write_chunk(event.encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/__stats":
+            return self._send_json(200, self.server.stats())
+        return self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(n) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": "invalid json"})
+        prompt = str(payload.get("prompt", ""))
+
+        delay, status = self.server.faults.draw()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            self.server.count("injected_429")
+            body = json.dumps({"error": "rate limited"}).encode("utf-8")
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.server.faults.retry_after))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if status:
+            self.server.count("injected_errors")
+            return self._send_json(status, {"error": "injected failure"})
+
+        try:
+            text = self.server.respond(prompt)
+        except KeyError as e:
+            self.server.count("misses")
+            return self._send_json(404, {"error": str(e)})
+        except Exception as e:
+            self.server.count("upstream_errors")
+            return self._send_json(502, {"error": str(e)})
+        self.server.count("served")
+        if payload.get("stream"):
+            return self._send_stream(text)
+        return self._send_json(200, {"message": text})
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr: Tuple[str, int], responder: Optional[Responder] = None,
+                 token_delay: float = 0.0, faults: Optional[FaultInjector] = None, verbose: bool = False):
+        super().__init__(addr, StandinHandler)
+        self.responder = responder or echo_responder
+        self.token_delay = token_delay
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+        self._counts = {"requests": 0, "served": 0, "misses": 0, "injected_errors": 0, "injected_429": 0, "upstream_errors": 0}
+        self._counts_lock = threading.Lock()
+
+    def respond(self, prompt: str) -> str:
+        self.count("requests")
+        return self.responder(prompt)
+
+    def count(self, key: str):
+        with self._counts_lock:
+            self._counts[key] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return dict(self._counts)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+def start_standin(port: int = 0, responder: Optional[Responder] = None, **kwargs) -> StandinServer:
+    """백그라운드 스레드로 대역 서버 시작 (port=0이면 빈 포트 자동 선택). server.url 로 주소 확인"""
+    server = StandinServer(("127.0.0.1", port), responder=responder, **kwargs)
+    threading.Thread(target=server.serve_forever, name="potens-standin", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="로컬 Potens 대역 서버")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--mode", choices=["echo", "replay", "record"], default="echo")
+    ap.add_argument("--cassette", default="potens_cassette.jsonl", help="기록/재생용 JSONL 파일")
+    ap.add_argument("--on-miss", choices=["error", "echo"], default="error", help="replay 모드에서 기록에 없는 프롬프트 처리")
+    ap.add_argument("--upstream", default=os.getenv("POTENS_API_URL"), help="record 모드에서 전달할 실제 Potens URL")
+    ap.add_argument("--api-key", default=os.getenv("POTENS_API_KEY"))
+    ap.add_argument("--token-delay", type=float, default=0.02, help="스트리밍 토큰 간 지연(초)")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    ap.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    cassette = Cassette(args.cassette)
+    if args.mode == "replay":
+        responder = replay_responder(cassette, echo_responder if args.on_miss == "echo" else None)
+    elif args.mode == "record":
+        if not args.upstream or not args.api_key:
+            ap.error("record 모드에는 --upstream 과 --api-key (또는 POTENS_API_URL/POTENS_API_KEY) 가 필요합니다.")
+        responder = record_responder(cassette, args.upstream, args.api_key)
+    else:
+        responder = echo_responder
+
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_429, args.retry_after, args.seed)
+    srv = StandinServer(("127.0.0.1", args.port), responder=responder, token_delay=args.token_delay,
+                        faults=faults, verbose=args.verbose)
+    print(f"Potens stand-in ({args.mode}, cassette={len(cassette)} items) listening on {srv.url}")
+    srv.serve_forever()
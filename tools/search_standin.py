@@ -0,0 +1,80 @@
+# tools/search_standin.py
+"""
+오프라인 웹 검색 대역 백엔드 (테스트/벤치마크용)
+- 고정 코퍼스(JSON: {"documents": [{title, href, body, region?, age_days?}]})에서 단어 겹침으로 검색
+- site:도메인 필터, region(문서에 region이 있을 때만), timelimit(age_days 기준) 지원
+- 지연 주입: SEARCH_STANDIN_LATENCY_MS / SEARCH_STANDIN_JITTER_MS (질의마다 sleep)
+사용: SEARCH_BACKEND=standin  또는  SEARCH_BACKEND=standin:/path/corpus.json
+"""
+import os, re, json, time, random, threading
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "search_corpus.json")
+TIMELIMIT_DAYS = {"d": 1, "w": 7, "m": 31, "y": 365}
+MIN_COVERAGE = 0.5   # 질의 단어 중 이 비율 이상이 문서에 있어야 결과로 인정
+
+_SITE = re.compile(r"\bsite:(\S+)", re.I)
+_WORD = re.compile(r"[\w₩$]+", re.U)
+
+class StandinSearchBackend:
+    name = "standin"
+
+    def __init__(self, documents: List[Dict[str, Any]], latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 seed: Optional[int] = None):
+        self.documents = documents
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._haystacks = [f"{d.get('title', '')} {d.get('body', '')}".lower() for d in documents]
+        self._stats = {"queries": 0, "hits": 0, "empty": 0}
+
+    def _sleep(self):
+        with self._lock:
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def text(self, query: str, region: Optional[str] = None, timelimit: Optional[str] = None,
+             max_results: int = 10) -> List[Dict[str, Any]]:
+        self._sleep()
+        sites = [s.lower().rstrip("/") for s in _SITE.findall(query or "")]
+        words = {w.lower() for w in _WORD.findall(_SITE.sub(" ", query or ""))}
+        max_age = TIMELIMIT_DAYS.get(timelimit or "")
+        scored = []
+        for i, (doc, hay) in enumerate(zip(self.documents, self._haystacks)):
+            if sites and not any(s in doc.get("href", "").lower() for s in sites):
+                continue
+            if region and doc.get("region") and doc["region"] != region:
+                continue
+            if max_age is not None and doc.get("age_days", 0) > max_age:
+                continue
+            matched = sum(1 for w in words if w in hay)
+            if words and matched / len(words) >= MIN_COVERAGE:
+                scored.append((-matched, i))
+        scored.sort()
+        hits = [
+            {"title": self.documents[i]["title"], "href": self.documents[i]["href"], "body": self.documents[i]["body"]}
+            for _, i in scored[:max_results]
+        ]
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["hits" if hits else "empty"] += 1
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, documents=len(self.documents))
+
+def load_corpus(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    with open(path or DEFAULT_CORPUS, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["documents"] if isinstance(data, dict) else data
+
+def create_standin_backend(corpus_path: Optional[str] = None) -> StandinSearchBackend:
+    return StandinSearchBackend(
+        load_corpus(corpus_path),
+        latency_ms=float(os.getenv("SEARCH_STANDIN_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("SEARCH_STANDIN_JITTER_MS", "0")),
+        seed=int(os.getenv("SEARCH_STANDIN_SEED", "0")),
+    )
@@ -0,0 +1,164 @@
+# tools/supabase_standin.py
+"""
+메모리 기반 Supabase 대역 클라이언트 (오프라인 테스트/벤치마크용)
+db.py에서 쓰는 쿼리 빌더 일부만 흉내냅니다:
+  table().select/insert/update/delete + eq/in_/gte/lt/order/limit/single + execute()
+사용: SUPABASE_URL=standin:// 로 설정하면 db.py가 이 클라이언트를 사용
+"""
+import copy, uuid, threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# 테이블별 기본키 컬럼 (insert 시 자동 생성)
+PRIMARY_KEYS = {
+    "profiles": "user_id",
+    "drafts": "draft_id",
+    "approvals": "approval_id",
+    "todos": "todo_id",
+    "notifications": "notification_id",
+    "templates": "template_id",
+}
+
+DEFAULT_TEMPLATES = [
+    {"type": "품의", "fields": ["금액", "사유", "근거", "기한", "승인선"],
+     "guide_md": "- 금액은 원 단위로 적습니다.\n- 근거에는 견적서/계약서 등 첨부 자료를 적습니다."},
+    {"type": "연차", "fields": ["시작일", "종료일", "사유"],
+     "guide_md": "- 연차는 최소 3일 전에 신청합니다."},
+    {"type": "출장", "fields": ["출장지", "시작일", "종료일", "목적", "예상비용"],
+     "guide_md": "- 출장비 한도는 1일 15만원입니다.\n- 숙박비는 영수증 기준 실비 정산합니다."},
+]
+
+class APIError(Exception):
+    pass
+
+class _Response:
+    def __init__(self, data: Any):
+        self.data = data
+
+class _Query:
+    def __init__(self, client: "StandinClient", table: str):
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns: Optional[List[str]] = None
+        self._payload: Any = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._single = False
+
+    # ---------- 동작 ----------
+    def select(self, columns: str = "*"):
+        self._op = "select"
+        cols = [c.strip() for c in columns.split(",")]
+        self._columns = None if cols == ["*"] else cols
+        return self
+
+    def insert(self, data: Any):
+        self._op, self._payload = "insert", data
+        return self
+
+    def update(self, data: Dict[str, Any]):
+        self._op, self._payload = "update", data
+        return self
+
+    def delete(self):
+        self._op = "delete"
+        return self
+
+    # ---------- 필터/정렬 ----------
+    def eq(self, col: str, val: Any):
+        self._filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def in_(self, col: str, vals: List[Any]):
+        vals = list(vals)
+        self._filters.append(lambda r: r.get(col) in vals)
+        return self
+
+    def gte(self, col: str, val: Any):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) >= val)
+        return self
+
+    def lt(self, col: str, val: Any):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) < val)
+        return self
+
+    def order(self, col: str, desc: bool = False):
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def single(self):
+        self._single = True
+        return self
+
+    def execute(self) -> _Response:
+        return self._client._execute(self)
+
+class StandinClient:
+    def __init__(self, seed_templates: bool = True, latency: float = 0.0):
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.latency = latency
+        if seed_templates:
+            for t in DEFAULT_TEMPLATES:
+                self.table("templates").insert(dict(t)).execute()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def _execute(self, q: _Query) -> _Response:
+        if self.latency:
+            import time
+            time.sleep(self.latency)
+        with self._lock:
+            rows = self._tables.setdefault(q._table, [])
+            if q._op == "insert":
+                items = q._payload if isinstance(q._payload, list) else [q._payload]
+                out = []
+                for item in items:
+                    row = copy.deepcopy(item)
+                    pk = PRIMARY_KEYS.get(q._table, "id")
+                    row.setdefault(pk, str(uuid.uuid4()))
+                    row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+                    rows.append(row)
+                    out.append(copy.deepcopy(row))
+                return _Response(out)
+
+            matched = [r for r in rows if all(f(r) for f in q._filters)]
+            if q._op == "update":
+                for r in matched:
+                    r.update(copy.deepcopy(q._payload))
+                return _Response(copy.deepcopy(matched))
+            if q._op == "delete":
+                self._tables[q._table] = [r for r in rows if r not in matched]
+                return _Response(copy.deepcopy(matched))
+
+            for col, desc in reversed(q._order):
+                matched.sort(key=lambda r: (r.get(col) is None, r.get(col) or ""), reverse=desc)
+            if q._limit is not None:
+                matched = matched[:q._limit]
+            data = [
+                {k: copy.deepcopy(v) for k, v in r.items() if q._columns is None or k in q._columns}
+                for r in matched
+            ]
+            if q._single:
+                if len(data) != 1:
+                    raise APIError(f"single() expected 1 row, got {len(data)}")
+                return _Response(data[0])
+            return _Response(data)
+
+_shared: Optional[StandinClient] = None
+_shared_lock = threading.Lock()
+
+def create_standin_client() -> StandinClient:
+    """프로세스 공용 대역 클라이언트 (모든 세션이 같은 메모리 DB를 봄)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = StandinClient()
+        return _shared